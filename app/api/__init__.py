@@ -1,12 +1,15 @@
 import asyncio
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
 from starlette.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.v1.routers import instrument
-from app.database.db import get_async_session
+from app.api.v1.routers import aggregate, instrument
+from app.cache.backends import get_two_tier_backend
+from app.database.db import database, get_async_session
+from app.observability.metrics import registry
 
 router = APIRouter()
 
@@ -15,6 +18,11 @@ router.include_router(
     prefix="/v1",
     tags=["Instrument | v1"],
 )
+router.include_router(
+    aggregate.router,
+    prefix="/v1",
+    tags=["Instrument aggregates | v1"],
+)
 
 
 @router.get(
@@ -40,4 +48,29 @@ async def health_check(
         ],
     )
 
-    return {"status": "OK"}
+    status = {
+        "status": "OK",
+        "pool": database.engine.sync_engine.pool.status(),
+    }
+    if database.replica_engines:
+        status["replica_pools"] = [
+            engine.sync_engine.pool.status()
+            for engine in database.replica_engines
+        ]
+    backend = get_two_tier_backend()
+    if backend is not None:
+        status["cache"] = dict(backend.stats)
+    return status
+
+
+@router.get(
+    path="/metrics",
+    tags=["healthz"],
+    response_class=PlainTextResponse,
+)
+async def metrics() -> PlainTextResponse:
+    """Get metrics of the worker process in the Prometheus text format."""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4",
+    )
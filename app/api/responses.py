@@ -0,0 +1,43 @@
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+from pydantic import BaseModel
+from starlette.responses import Response
+
+from app.cache.stale import RESPONSE_PARAM
+
+
+def render_model(
+    func: Callable[..., Awaitable[Any]],
+) -> Callable[..., Awaitable[Any]]:
+    """
+    Render model returned by the cached handler into the response.
+
+    Pages of trusted rows are dumped by pydantic with only the fields
+    set, and returned as a response, so that FastAPI neither validates
+    nor serializes them once more. Routes must set response_model=None,
+    keeping the schema in responses. Headers set by the cache decorator
+    are kept, responses returned by it, e.g. 304, are passed through.
+    """
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = await func(*args, **kwargs)
+        if not isinstance(result, BaseModel):
+            return result
+        rendered = Response(
+            result.model_dump_json(exclude_unset=True),
+            media_type="application/json",
+        )
+        response: Response = kwargs.get(RESPONSE_PARAM)
+        if response is not None:
+            rendered.headers.update(
+                {
+                    name: value
+                    for name, value in response.headers.items()
+                    if name != "content-length"
+                },
+            )
+        return rendered
+
+    return wrapper
@@ -0,0 +1,33 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+
+from app.cache.decorator import cached
+from app.schemas.instrument import (
+    DailyInstrumentAggregateOut,
+    InstrumentWithDateFilters,
+)
+from app.schemas.pagination import CountedPage
+from app.services.aggregate import DailyInstrumentAggregateService
+
+router = APIRouter(
+    prefix="/instrument/aggregates",
+    default_response_class=ORJSONResponse,
+)
+
+
+@router.get(
+    "",
+    response_model=CountedPage[DailyInstrumentAggregateOut],
+)
+@cached()
+async def get_daily_aggregates(
+    filters_query: Annotated[InstrumentWithDateFilters, Query()],
+    service: DailyInstrumentAggregateService = Depends(
+        DailyInstrumentAggregateService,
+    ),
+) -> CountedPage[DailyInstrumentAggregateOut]:
+    return await service.get_aggregates(
+        **filters_query.model_dump(exclude_unset=True),
+    )
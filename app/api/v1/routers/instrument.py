@@ -1,25 +1,41 @@
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query
-from fastapi_cache.decorator import cache
-from fastapi_pagination import Page
+from fastapi.responses import ORJSONResponse
+from fastapi_pagination.api import pagination_ctx
+from starlette.responses import StreamingResponse
 
+from app.api.responses import render_model
+from app.cache.decorator import cached
 from app.schemas.instrument import (
-    InstrumentOut,
+    ExportFormat,
+    InstrumentProjectionOut,
     InstrumentDateResponse,
-    InstrumentFilters,
-    InstrumentWithDateFilters,
+    InstrumentExportFilters,
+    PricePointOut,
+    PriceSeriesFilters,
+    ProjectedInstrumentFilters,
+    ProjectedInstrumentWithDateFilters,
 )
+from app.schemas.pagination import CountedPage, KeysetPage
 from app.services.instrument import InstrumentService
 
-router = APIRouter(prefix="/instrument")
+router = APIRouter(
+    prefix="/instrument",
+    default_response_class=ORJSONResponse,
+)
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
 
 
 @router.get(
     "/get_last_trading_days",
     response_model=list[InstrumentDateResponse],
 )
-@cache()
+@cached()
 async def get_last_trading_days(
     num_dates: int,
     service: InstrumentService = Depends(InstrumentService),
@@ -29,13 +45,16 @@ async def get_last_trading_days(
 
 @router.get(
     "/get_dynamics",
-    response_model=Page[InstrumentOut],
+    response_model=None,
+    responses={200: {"model": CountedPage[InstrumentProjectionOut]}},
+    dependencies=[Depends(pagination_ctx(CountedPage[InstrumentProjectionOut]))],
 )
-@cache()
+@render_model
+@cached()
 async def get_dynamics(
-    filters_query: Annotated[InstrumentWithDateFilters, Query()],
+    filters_query: Annotated[ProjectedInstrumentWithDateFilters, Query()],
     service: InstrumentService = Depends(InstrumentService),
-) -> Page[InstrumentOut]:
+) -> CountedPage[InstrumentProjectionOut]:
     return await service.get_dynamics(
         **filters_query.model_dump(
             exclude_unset=True,
@@ -43,15 +62,93 @@ async def get_dynamics(
     )
 
 
+@router.get(
+    "/get_dynamics_by_cursor",
+    response_model=None,
+    responses={200: {"model": KeysetPage[InstrumentProjectionOut]}},
+    dependencies=[Depends(pagination_ctx(KeysetPage[InstrumentProjectionOut]))],
+)
+@render_model
+@cached()
+async def get_dynamics_by_cursor(
+    filters_query: Annotated[ProjectedInstrumentWithDateFilters, Query()],
+    service: InstrumentService = Depends(InstrumentService),
+) -> KeysetPage[InstrumentProjectionOut]:
+    return await service.get_dynamics_by_cursor(
+        **filters_query.model_dump(
+            exclude_unset=True,
+        ),
+    )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+)
+async def export_dynamics(
+    filters_query: Annotated[InstrumentExportFilters, Query()],
+    service: InstrumentService = Depends(InstrumentService),
+) -> StreamingResponse:
+    return StreamingResponse(
+        service.export_dynamics(
+            filters_query.format,
+            **filters_query.model_dump(
+                exclude_unset=True,
+                exclude={"format"},
+            ),
+        ),
+        media_type=EXPORT_MEDIA_TYPES[filters_query.format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="dynamics.{filters_query.format}"'
+            ),
+        },
+    )
+
+
+@router.get(
+    "/get_price_series",
+    response_model=CountedPage[PricePointOut],
+)
+@cached()
+async def get_price_series(
+    filters_query: Annotated[PriceSeriesFilters, Query()],
+    service: InstrumentService = Depends(InstrumentService),
+) -> CountedPage[PricePointOut]:
+    return await service.get_price_series(
+        **filters_query.model_dump(exclude_unset=True),
+    )
+
+
 @router.get(
     "/get_trading_results",
-    response_model=Page[InstrumentOut],
+    response_model=None,
+    responses={200: {"model": CountedPage[InstrumentProjectionOut]}},
+    dependencies=[Depends(pagination_ctx(CountedPage[InstrumentProjectionOut]))],
 )
-@cache()
+@render_model
+@cached()
 async def get_trading_results(
-    filters_query: Annotated[InstrumentFilters, Query()],
+    filters_query: Annotated[ProjectedInstrumentFilters, Query()],
     service: InstrumentService = Depends(InstrumentService),
-) -> Page[InstrumentOut]:
+) -> CountedPage[InstrumentProjectionOut]:
     return await service.get_trading_results(
         **filters_query.model_dump(exclude_unset=True),
     )
+
+
+@router.get(
+    "/get_trading_results_by_cursor",
+    response_model=None,
+    responses={200: {"model": KeysetPage[InstrumentProjectionOut]}},
+    dependencies=[Depends(pagination_ctx(KeysetPage[InstrumentProjectionOut]))],
+)
+@render_model
+@cached()
+async def get_trading_results_by_cursor(
+    filters_query: Annotated[ProjectedInstrumentFilters, Query()],
+    service: InstrumentService = Depends(InstrumentService),
+) -> KeysetPage[InstrumentProjectionOut]:
+    return await service.get_trading_results_by_cursor(
+        **filters_query.model_dump(exclude_unset=True),
+    )
@@ -0,0 +1,186 @@
+import time
+from collections import Counter, OrderedDict
+from typing import Optional
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.types import Backend
+
+from app.observability.tracing import get_current_span, span
+
+
+class LRUCache:
+    """
+    In-process cache with bounded size, LRU eviction and TTL.
+
+    params:
+        - maxsize: maximum number of stored entries
+        - ttl: maximum number of seconds an entry is stored for
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """Initialize the class."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, float, bytes]] = (
+            OrderedDict()
+        )
+
+    def get_with_ttl(self, key: str) -> tuple[int, Optional[bytes]]:
+        """Get value and its remaining TTL in the upper tier."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0, None
+        expires_at, upper_expires_at, value = entry
+        now = time.monotonic()
+        if now >= expires_at:
+            del self._entries[key]
+            return 0, None
+        self._entries.move_to_end(key)
+        if upper_expires_at == float("inf"):
+            return -1, value
+        return int(upper_expires_at - now), value
+
+    def set(self, key: str, value: bytes, ttl: Optional[int]) -> None:
+        """Store value, which expires in the upper tier in ttl seconds."""
+        now = time.monotonic()
+        upper_expires_at = now + ttl if ttl and ttl > 0 else float("inf")
+        self._entries[key] = (
+            min(now + self.ttl, upper_expires_at),
+            upper_expires_at,
+            value,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        """Remove single entry."""
+        self._entries.pop(key, None)
+
+    def clear(self, namespace: str) -> None:
+        """Remove entries in the namespace."""
+        for key in [key for key in self._entries if key.startswith(namespace)]:
+            del self._entries[key]
+
+
+class TwoTierBackend(Backend):
+    """
+    Cache backend with in-process LRU cache in front of another backend.
+
+    Hot entries are served without the network round trip. Hit and miss
+    counters are kept per tier, and the tier, which has served a lookup,
+    is recorded on the current span, e.g. the one of TracedBackend.
+
+    params:
+        - backend: upper tier backend, e.g. RedisBackend
+        - maxsize: maximum number of entries stored in process
+        - ttl: maximum number of seconds an entry is stored in process
+    """
+
+    def __init__(self, backend: Backend, maxsize: int, ttl: float) -> None:
+        """Initialize the class."""
+        self.backend = backend
+        self.local = LRUCache(maxsize, ttl)
+        self.stats: Counter[str] = Counter()
+
+    async def get_with_ttl(self, key: str) -> tuple[int, Optional[bytes]]:
+        """Get value and its TTL from the nearest tier, which has it."""
+        get_span = get_current_span()
+        ttl, value = self.local.get_with_ttl(key)
+        if value is not None:
+            self.stats["l1_hit"] += 1
+            get_span.set_attribute("cache.tier", "l1")
+            return ttl, value
+        self.stats["l1_miss"] += 1
+        ttl, value = await self.backend.get_with_ttl(key)
+        if value is None:
+            self.stats["l2_miss"] += 1
+            get_span.set_attribute("cache.tier", "miss")
+            return ttl, value
+        self.stats["l2_hit"] += 1
+        get_span.set_attribute("cache.tier", "l2")
+        self.local.set(key, value, ttl)
+        return ttl, value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get value from the nearest tier, which has it."""
+        _, value = await self.get_with_ttl(key)
+        return value
+
+    async def set(
+        self,
+        key: str,
+        value: bytes,
+        expire: Optional[int] = None,
+    ) -> None:
+        """Store value in both tiers."""
+        await self.backend.set(key, value, expire)
+        self.local.set(key, value, expire)
+
+    async def clear(
+        self,
+        namespace: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> int:
+        """Remove values from both tiers."""
+        if namespace:
+            self.local.clear(namespace)
+        elif key:
+            self.local.pop(key)
+        return await self.backend.clear(namespace, key)
+
+
+class TracedBackend(Backend):
+    """
+    Cache backend running lookups and stores of another one within spans.
+
+    params:
+        - backend: traced backend, e.g. RedisBackend or TwoTierBackend
+    """
+
+    def __init__(self, backend: Backend) -> None:
+        """Initialize the class."""
+        self.backend = backend
+
+    async def get_with_ttl(self, key: str) -> tuple[int, Optional[bytes]]:
+        """Get value and its TTL within the cache get span."""
+        with span("cache get", **{"cache.key": key}) as get_span:
+            ttl, value = await self.backend.get_with_ttl(key)
+            get_span.set_attribute("cache.hit", value is not None)
+            return ttl, value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get value within the cache get span."""
+        _, value = await self.get_with_ttl(key)
+        return value
+
+    async def set(
+        self,
+        key: str,
+        value: bytes,
+        expire: Optional[int] = None,
+    ) -> None:
+        """Store value within the cache set span."""
+        with span("cache set", **{"cache.key": key}):
+            await self.backend.set(key, value, expire)
+
+    async def clear(
+        self,
+        namespace: Optional[str] = None,
+        key: Optional[str] = None,
+    ) -> int:
+        """Remove values of the traced backend."""
+        return await self.backend.clear(namespace, key)
+
+
+def get_two_tier_backend() -> Optional[TwoTierBackend]:
+    """Get two-tier backend of the cache, if it is initialized with one."""
+    try:
+        backend = FastAPICache.get_backend()
+    except AssertionError:
+        return None
+    if isinstance(backend, TracedBackend):
+        backend = backend.backend
+    if isinstance(backend, TwoTierBackend):
+        return backend
+    return None
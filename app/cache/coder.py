@@ -0,0 +1,20 @@
+from typing import Any
+
+from fastapi_cache.coder import JsonCoder
+from pydantic import BaseModel
+
+
+class ModelJsonCoder(JsonCoder):
+    """
+    JSON coder, which keeps only the fields set on pydantic models.
+
+    Responses projected on requested fields are cached as they are
+    rendered, without the rest of the fields set to null.
+    """
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        """Encode value, dumping models by pydantic itself."""
+        if isinstance(value, BaseModel):
+            return value.model_dump_json(exclude_unset=True).encode()
+        return super().encode(value)
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import logging
+from typing import Any, Optional
+
+from fastapi_cache import FastAPICache
+
+from app.cache.invalidation import data_version
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CountCache:
+    """
+    Totals of paginated queries, keyed by normalized filters.
+
+    Totals are stored in the response cache backend under the current
+    data version, so they are shared by workers and become stale at once
+    with cached responses. Nothing is stored, if the cache is not
+    initialized.
+    """
+
+    def __init__(self, namespace: str = "count") -> None:
+        """Initialize the class."""
+        self.namespace = namespace
+
+    async def get(self, name: str, filters: dict[str, Any]) -> Optional[int]:
+        """Get total of the query matched by filters, if it is stored."""
+        try:
+            backend = FastAPICache.get_backend()
+        except AssertionError:
+            return None
+        key = await self._build_key(name, filters)
+        try:
+            total = await backend.get(key)
+        except Exception:
+            logger.warning("Error retrieving '%s'", key, exc_info=True)
+            return None
+        return None if total is None else int(total)
+
+    async def set(
+        self,
+        name: str,
+        filters: dict[str, Any],
+        total: int,
+    ) -> None:
+        """Store total of the query matched by filters."""
+        try:
+            backend = FastAPICache.get_backend()
+        except AssertionError:
+            return
+        key = await self._build_key(name, filters)
+        try:
+            await backend.set(key, str(total).encode(), settings.cache_expire)
+        except Exception:
+            logger.warning("Error storing '%s'", key, exc_info=True)
+
+    async def _build_key(self, name: str, filters: dict[str, Any]) -> str:
+        """Build key of the query from its name and filters set."""
+        payload = json.dumps(
+            {
+                field: value
+                for field, value in filters.items()
+                if value is not None
+            },
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.md5(payload.encode()).hexdigest()  # noqa: S324
+        version = await data_version.get()
+        return (
+            f"{FastAPICache.get_prefix()}:{self.namespace}:v{version}:"
+            f"{name}:{digest}"
+        )
+
+
+count_cache = CountCache()
@@ -0,0 +1,38 @@
+from typing import Any, Awaitable, Callable
+
+from fastapi_cache.decorator import cache
+
+from app.cache.single_flight import coalesce
+from app.cache.stale import stale_while_revalidate
+from app.core.config import settings
+
+
+def cached(
+    namespace: str = "",
+) -> Callable[
+    [Callable[..., Awaitable[Any]]],
+    Callable[..., Awaitable[Any]],
+]:
+    """
+    Cache handler response.
+
+    Misses are coalesced into a single computation. If the route has
+    a stale grace period set in settings, expired entries are served
+    within it, while being refreshed in background.
+    """
+
+    def decorator(
+        func: Callable[..., Awaitable[Any]],
+    ) -> Callable[..., Awaitable[Any]]:
+        expire = settings.cache_expire
+        grace = settings.cache_stale_grace.get(func.__name__, 0)
+        handler = cache(expire=expire + grace, namespace=namespace)(
+            coalesce(namespace)(func),
+        )
+        if grace:
+            handler = stale_while_revalidate(expire, grace, namespace)(
+                handler,
+            )
+        return handler
+
+    return decorator
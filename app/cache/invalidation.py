@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional
+
+from redis import asyncio as aioredis
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "fastapi-cache"
+
+
+class DataVersion:
+    """
+    Version of the data, which cached responses were built from.
+
+    Cache keys are namespaced by the version, so bumping it after a write
+    makes all the previously cached responses stale at once, without
+    touching any other keys stored in Redis.
+
+    The version is kept in process for ttl seconds, same as in-process
+    cache entries, so other workers see the bump within that time.
+
+    WAL position of the primary after the last write is stored along with
+    the version, so that reads, which may populate the cache under it,
+    go only to the replicas, which have replayed that write.
+    """
+
+    def __init__(self, name: str = "data_version") -> None:
+        """Initialize the class, no Redis client is attached yet."""
+        self.name = name
+        self.key = name
+        self.redis: Optional[Redis] = None
+        self.ttl: float = 0
+        self.write_lsn = 0
+        self._version: Optional[int] = None
+        self._lsn = 0
+        self._expires_at: float = 0
+
+    def init(self, redis: Redis, prefix: str, ttl: float = 0) -> None:
+        """Attach Redis client, which stores the version under the prefix."""
+        self.redis = redis
+        self.key = f"{prefix}:{self.name}"
+        self.ttl = ttl
+        self._version = None
+        self._lsn = 0
+
+    def reset(self) -> None:
+        """Detach Redis client, e.g. when it is closed on shutdown."""
+        self.redis = None
+        self.key = self.name
+        self.ttl = 0
+        self._version = None
+        self._lsn = 0
+
+    @property
+    def lsn_key(self) -> str:
+        """Get key of the WAL position of the last write."""
+        return f"{self.key}:lsn"
+
+    async def get(self) -> int:
+        """Get current version, fall back to 0 if it is unavailable."""
+        if self.redis is None:
+            return 0
+        if self._version is not None and time.monotonic() < self._expires_at:
+            return self._version
+        try:
+            async with self.redis.pipeline(transaction=False) as pipeline:
+                pipeline.get(self.key)
+                pipeline.zscore(self.lsn_key, "lsn")
+                version, lsn = await pipeline.execute()
+        except RedisError:
+            logger.warning("Error retrieving data version", exc_info=True)
+            return 0
+        return self._remember(int(version or 0), int(lsn or 0))
+
+    async def get_lsn(self) -> int:
+        """Get WAL position of the last write, 0 if there were none."""
+        await self.get()
+        return max(self._lsn, self.write_lsn)
+
+    def observe_write(self, lsn: int) -> None:
+        """Remember WAL position of the primary after a committed write."""
+        self.write_lsn = max(self.write_lsn, lsn)
+
+    async def bump(self) -> int:
+        """
+        Increment version, making cached responses stale.
+
+        Redis client is created from settings, if the cache has not been
+        initialized, e.g. in scripts writing outside the app. Failures are
+        retried, and the last one is raised, so that the writer does not
+        leave stale responses behind silently.
+        """
+        if self.redis is None:
+            self.init(aioredis.from_url(settings.redis_url), CACHE_PREFIX)
+        interval = settings.cache_invalidation_retry_interval
+        for _ in range(settings.cache_invalidation_attempts - 1):
+            try:
+                return await self._bump()
+            except RedisError:
+                logger.warning("Error bumping data version", exc_info=True)
+                await asyncio.sleep(interval)
+                interval *= 2
+        return await self._bump()
+
+    async def _bump(self) -> int:
+        """Increment version, storing WAL position of the last write."""
+        async with self.redis.pipeline(transaction=True) as pipeline:
+            if self.write_lsn:
+                # sorted set keeps the greatest position of all workers
+                pipeline.zadd(
+                    self.lsn_key,
+                    {"lsn": self.write_lsn},
+                    gt=True,
+                )
+            pipeline.incr(self.key)
+            pipeline.zscore(self.lsn_key, "lsn")
+            *_, version, lsn = await pipeline.execute()
+        return self._remember(version, int(lsn or 0))
+
+    def _remember(self, version: int, lsn: int) -> int:
+        """Keep the version and WAL position of the last write in process."""
+        self._version = version
+        self._lsn = lsn
+        self._expires_at = time.monotonic() + self.ttl
+        return version
+
+
+data_version = DataVersion()
+
+_invalidation_callbacks: list[Callable[[], None]] = []
+_bump_callbacks: list[Callable[[], None]] = []
+
+
+def on_invalidate(callback: Callable[[], None]) -> None:
+    """
+    Register callback invoked after every invalidation.
+
+    Used by in-process structures derived from the data, which must be
+    dropped by the writing worker immediately, even if Redis is down.
+    """
+    _invalidation_callbacks.append(callback)
+
+
+def on_bump(callback: Callable[[], None]) -> None:
+    """
+    Register callback invoked after every bump of the data version.
+
+    Used by in-process structures derived from the data, which are
+    reloaded by the writing worker for the new version.
+    """
+    _bump_callbacks.append(callback)
+
+
+def invalidate_cache(
+    func: Callable[..., Awaitable[Any]],
+) -> Callable[..., Awaitable[Any]]:
+    """
+    Decorate write method with cache invalidation.
+
+    Data version is bumped after the method has returned, i.e. after
+    the transaction has been committed. Methods returning count of
+    changed rows do not bump it, if nothing has changed. If the version
+    cannot be bumped, RedisError is raised, although the write has been
+    committed, so that the writer can re-run it.
+    """
+
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        result = await func(*args, **kwargs)
+        if result != 0:
+            for callback in _invalidation_callbacks:
+                callback()
+            await data_version.bump()
+            for callback in _bump_callbacks:
+                callback()
+        return result
+
+    return wrapper
@@ -0,0 +1,82 @@
+import hashlib
+import json
+from datetime import date
+from inspect import isawaitable
+from typing import Any, Callable, Optional
+
+from fastapi_cache import FastAPICache
+from fastapi_pagination.api import resolve_params
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.cache.invalidation import data_version
+
+KEY_SCALAR_TYPES = (str, int, float, bool, date)
+
+
+def normalize_cache_kwargs(kwargs: dict[str, Any]) -> dict[str, Any]:
+    """
+    Collect handler arguments, which affect the response.
+
+    Filter models are dumped with unset fields excluded, scalar arguments
+    are kept as is, everything else (e.g. injected services) is skipped.
+    Pagination params of the current request are added, if present.
+    """
+    key_parts: dict[str, Any] = {}
+    for name, value in kwargs.items():
+        if isinstance(value, BaseModel):
+            key_parts.update(value.model_dump(mode="json", exclude_unset=True))
+        elif value is None or isinstance(value, KEY_SCALAR_TYPES):
+            key_parts[name] = value
+    try:
+        key_parts.update(resolve_params().model_dump(mode="json"))
+    except RuntimeError:
+        pass
+    return key_parts
+
+
+async def instrument_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> str:
+    """
+    Build deterministic cache key for the handler call.
+
+    The key consists of the current data version, the route function
+    and the hash of its normalized filters, so that equal requests share
+    the same key until the data changes.
+    """
+    payload = json.dumps(
+        normalize_cache_kwargs(kwargs),
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.md5(payload.encode()).hexdigest()  # noqa: S324
+    version = await data_version.get()
+    return f"{namespace}:v{version}:{func.__module__}:{func.__name__}:{digest}"
+
+
+async def build_cache_key(
+    func: Callable[..., Any],
+    namespace: str,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> str:
+    """Build the key, which the cache decorator stores the call under."""
+    key = FastAPICache.get_key_builder()(
+        func,
+        f"{FastAPICache.get_prefix()}:{namespace}",
+        request=None,
+        response=None,
+        args=args,
+        kwargs=kwargs,
+    )
+    if isawaitable(key):
+        key = await key
+    return key
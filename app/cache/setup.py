@@ -0,0 +1,41 @@
+from fastapi_cache import Backend, FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from redis.asyncio import Redis
+
+from app.cache.backends import TracedBackend, TwoTierBackend
+from app.cache.coder import ModelJsonCoder
+from app.cache.invalidation import CACHE_PREFIX, data_version
+from app.cache.key_builder import instrument_key_builder
+from app.cache.single_flight import single_flight
+from app.core.config import settings
+
+
+def init_cache(redis: Redis) -> None:
+    """Initialize response cache and its invalidation on the Redis client."""
+    backend: Backend = RedisBackend(redis)
+    if settings.cache_local_maxsize:
+        backend = TwoTierBackend(
+            backend,
+            settings.cache_local_maxsize,
+            settings.cache_local_ttl,
+        )
+    FastAPICache.init(
+        TracedBackend(backend),
+        prefix=CACHE_PREFIX,
+        expire=settings.cache_expire,
+        coder=ModelJsonCoder,
+        key_builder=instrument_key_builder,
+    )
+    data_version.init(
+        redis,
+        CACHE_PREFIX,
+        settings.cache_local_ttl if settings.cache_local_maxsize else 0,
+    )
+    single_flight.init(redis if settings.single_flight_redis_lock else None)
+
+
+def reset_cache() -> None:
+    """Detach response cache and its invalidation from the Redis client."""
+    FastAPICache.reset()
+    data_version.reset()
+    single_flight.init(None)
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional, TYPE_CHECKING
+
+from fastapi.dependencies.utils import get_typed_return_annotation
+from fastapi_cache import FastAPICache
+from redis.asyncio import Redis
+from redis.exceptions import LockError, RedisError
+
+from app.cache.key_builder import build_cache_key
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from redis.asyncio.lock import Lock
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent computations of the same cache key into one.
+
+    Within the process, callers of the key await the single task
+    computing it. If Redis client is attached, the computation is
+    additionally guarded by a Redis lock, so that other workers wait
+    for the value to appear in cache instead of computing it again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the class, no Redis client is attached yet."""
+        self.redis: Optional[Redis] = None
+        self._flights: dict[str, asyncio.Future] = {}
+
+    def init(self, redis: Optional[Redis]) -> None:
+        """Attach Redis client, which guards computations across workers."""
+        self.redis = redis
+
+    async def do(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+        return_type: Any,
+    ) -> Any:
+        """
+        Get result of the computation for the key.
+
+        The computation runs in its own task, so that cancellation
+        of one caller does not affect the others.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(
+                self._compute(key, func, return_type),
+            )
+            self._flights[key] = flight
+            flight.add_done_callback(lambda _: self._land(key, flight))
+        return await asyncio.shield(flight)
+
+    def _land(self, key: str, flight: asyncio.Future) -> None:
+        """Forget finished computation."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def _compute(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+        return_type: Any,
+    ) -> Any:
+        """Compute the result, unless another worker already does it."""
+        if self.redis is None:
+            return await func()
+        lock = self.redis.lock(
+            f"{key}:lock",
+            timeout=settings.single_flight_lock_timeout,
+        )
+        try:
+            acquired = await lock.acquire(blocking=False)
+        except RedisError:
+            logger.warning("Error acquiring lock for '%s'", key, exc_info=True)
+            return await func()
+        if acquired:
+            try:
+                return await func()
+            finally:
+                try:
+                    await lock.release()
+                except (LockError, RedisError):
+                    logger.warning("Error releasing lock for '%s'", key)
+        return await self._wait_for_cached(key, lock, return_type, func)
+
+    @staticmethod
+    async def _wait_for_cached(
+        key: str,
+        lock: "Lock",
+        return_type: Any,
+        func: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Wait until another worker puts the value into cache.
+
+        Fall back to computing it, if the worker has failed
+        or the lock has timed out.
+        """
+        backend = FastAPICache.get_backend()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.single_flight_lock_timeout
+        try:
+            while loop.time() < deadline:
+                await asyncio.sleep(settings.single_flight_poll_interval)
+                cached = await backend.get(key)
+                if cached is not None:
+                    return FastAPICache.get_coder().decode_as_type(
+                        cached,
+                        type_=return_type,
+                    )
+                if not await lock.locked():
+                    break
+        except RedisError:
+            logger.warning("Error waiting for '%s'", key, exc_info=True)
+        return await func()
+
+
+single_flight = SingleFlight()
+
+
+def coalesce(
+    namespace: str = "",
+) -> Callable[
+    [Callable[..., Awaitable[Any]]],
+    Callable[..., Awaitable[Any]],
+]:
+    """
+    Decorate cached handler with single-flight computation.
+
+    Must be applied under the cache decorator with the same namespace,
+    so that the key matches the one the response is cached by.
+    """
+
+    def decorator(
+        func: Callable[..., Awaitable[Any]],
+    ) -> Callable[..., Awaitable[Any]]:
+        return_type = get_typed_return_annotation(func)
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not FastAPICache.get_enable():
+                return await func(*args, **kwargs)
+            return await single_flight.do(
+                await build_cache_key(wrapper, namespace, args, kwargs),
+                lambda: func(*args, **kwargs),
+                return_type,
+            )
+
+        return wrapper
+
+    return decorator
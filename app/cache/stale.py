@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from functools import wraps
+from typing import Any, Awaitable, Callable, TYPE_CHECKING
+
+from fastapi.dependencies.utils import get_typed_return_annotation
+from fastapi_cache import FastAPICache
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+from app.cache.key_builder import build_cache_key
+
+if TYPE_CHECKING:
+    from starlette.requests import Request
+    from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+REQUEST_PARAM = "__fastapi_cache_request"
+RESPONSE_PARAM = "__fastapi_cache_response"
+
+_refreshing: dict[str, asyncio.Task] = {}
+
+
+def stale_while_revalidate(
+    expire: int,
+    grace: int,
+    namespace: str = "",
+) -> Callable[
+    [Callable[..., Awaitable[Any]]],
+    Callable[..., Awaitable[Any]],
+]:
+    """
+    Decorate cached handler with stale-while-revalidate mode.
+
+    Must be applied over the cache decorator, which stores entries for
+    expire + grace seconds. Entry is fresh for the first expire seconds,
+    afterward it is served as is, while a background task recomputes
+    the response and puts it back into cache. Entries found are served
+    by the wrapper itself, so only misses reach the cache decorator.
+    """
+
+    def decorator(
+        func: Callable[..., Awaitable[Any]],
+    ) -> Callable[..., Awaitable[Any]]:
+        compute = func.__wrapped__
+        return_type = get_typed_return_annotation(func)
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            request: Request = kwargs.get(REQUEST_PARAM)
+            response: Response = kwargs.get(RESPONSE_PARAM)
+            if not FastAPICache.get_enable() or (
+                request is not None
+                and request.headers.get("Cache-Control")
+                in ("no-cache", "no-store")
+            ):
+                return await func(*args, **kwargs)
+
+            handler_kwargs = {
+                name: value
+                for name, value in kwargs.items()
+                if name not in (REQUEST_PARAM, RESPONSE_PARAM)
+            }
+            key = await build_cache_key(
+                compute,
+                namespace,
+                args,
+                handler_kwargs,
+            )
+            try:
+                ttl, cached = await FastAPICache.get_backend().get_with_ttl(
+                    key,
+                )
+            except Exception:
+                logger.warning("Error retrieving '%s'", key, exc_info=True)
+                return await func(*args, **kwargs)
+            if cached is None:
+                return await func(*args, **kwargs)
+
+            if ttl > grace:
+                status, max_age = "HIT", ttl - grace
+            else:
+                status, max_age = "STALE", 0
+                if key not in _refreshing:
+                    _refreshing[key] = asyncio.create_task(
+                        refresh(
+                            key,
+                            compute,
+                            args,
+                            handler_kwargs,
+                            expire + grace,
+                        ),
+                    )
+                    _refreshing[key].add_done_callback(
+                        lambda _: _refreshing.pop(key, None),
+                    )
+            if response is not None:
+                etag = f"W/{hash(cached)}"
+                response.headers.update(
+                    {
+                        "Cache-Control": f"max-age={max_age}",
+                        "ETag": etag,
+                        FastAPICache.get_cache_status_header(): status,
+                    },
+                )
+                if (
+                    request is not None
+                    and request.headers.get("if-none-match") == etag
+                ):
+                    response.status_code = HTTP_304_NOT_MODIFIED
+                    return response
+            return FastAPICache.get_coder().decode_as_type(
+                cached,
+                type_=return_type,
+            )
+
+        return wrapper
+
+    return decorator
+
+
+async def refresh(
+    key: str,
+    compute: Callable[..., Awaitable[Any]],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    expire: int,
+) -> None:
+    """Recompute the response and put it into cache."""
+    try:
+        result = await compute(*args, **kwargs)
+        await FastAPICache.get_backend().set(
+            key,
+            FastAPICache.get_coder().encode(result),
+            expire,
+        )
+    except Exception:
+        logger.warning("Error refreshing '%s'", key, exc_info=True)
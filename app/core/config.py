@@ -14,12 +14,62 @@ class Settings(BaseSettings):
         f":{os.getenv('DB_PORT')}/"
         f"{os.getenv('DB_NAME')}"
     )
+    # connection pool of every engine, statement_cache_size is passed
+    # to asyncpg, set it to 0 behind pgbouncer in transaction mode
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    db_statement_cache_size: int = 100
+    # read-only units are routed to replicas, if any
+    postgres_replica_urls: list[str] = []
+    replica_retry_interval: float = 30.0
+    # statements slower than the threshold in seconds are logged with
+    # a share of them explained, disabled if 0
+    slow_query_threshold: float = 0
+    slow_query_explain_rate: float = 0.1
+    slow_query_log_limit: int = 10
+    slow_query_log_interval: float = 60.0
     secret: str = "VERY_SECRET_SECRET"
+    # requests with "X-Profile: 1" and the secret are profiled into the dir,
+    # if enabled and the secret is not the default one
+    profiling_enabled: bool = False
+    profile_dir: str = "profiles"
+    profile_interval: float = 0.001
+    profile_max_concurrent: int = 1
+    profile_max_files: int = 100
+    # spans are appended to the file as OTLP JSON lines, disabled if empty
+    tracing_export_path: str = ""
+    # production server, see app/server.py
+    web_bind: str = "0.0.0.0:8000"
+    web_workers: int = os.cpu_count() or 1
     model_config = SettingsConfigDict(
         env_file=".env",
         extra="ignore",
     )
     redis_url: str = "redis_url"
+    cache_expire: int = 60 * 60 * 24
+    # in-process cache in front of Redis, disabled if maxsize is 0
+    cache_local_maxsize: int = 1024
+    cache_local_ttl: float = 5.0
+    # route name -> seconds expired response is still served for
+    cache_stale_grace: dict[str, int] = {
+        "get_last_trading_days": 60 * 60,
+        "get_trading_results": 60 * 60,
+    }
+    # data version is bumped after every write, failures are retried
+    cache_invalidation_attempts: int = 3
+    cache_invalidation_retry_interval: float = 0.1
+    single_flight_redis_lock: bool = False
+    single_flight_lock_timeout: float = 10.0
+    single_flight_poll_interval: float = 0.05
+    bulk_insert_chunk_size: int = 5000
+    export_chunk_size: int = 1000
+    # validate rows read from the database against response schemas
+    validate_db_rows: bool = False
+    # number of last trading days served from memory, disabled if 0
+    hot_store_days: int = 0
 
     #for test purposes
     MODE: str = "prod"
@@ -1,25 +1,138 @@
 from collections.abc import AsyncGenerator
+from typing import Optional
 
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
+    AsyncEngine,
     AsyncSession,
 )
 
 from app.core.config import settings
+from app.database.pool import MeasuredQueuePool
+from app.database.replicas import ReplicaRouter
+from app.observability.metrics import instrument_engine
+from app.observability.slow_queries import log_slow_queries
 
-async_engine = create_async_engine(settings.postgres_db_url)
 
-AsyncSessionLocal = async_sessionmaker(
-    bind=async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
-    autocommit=False,
-)
+def create_engine(url: str) -> AsyncEngine:
+    """Create engine with the connection pool configured by settings."""
+    return create_async_engine(
+        url,
+        poolclass=MeasuredQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={
+            "statement_cache_size": settings.db_statement_cache_size,
+        },
+    )
+
+
+def create_session_factory(
+    engine: AsyncEngine,
+) -> async_sessionmaker[AsyncSession]:
+    """Create session factory bound to the engine."""
+    return async_sessionmaker(
+        bind=engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+        autocommit=False,
+    )
+
+
+class Database:
+    """
+    Engines and session factories of the worker process.
+
+    They are created in the app lifespan, i.e. after the worker has been
+    forked, and disposed on shutdown, so that no connections are shared
+    between processes. Outside the app, e.g. in scripts, they are created
+    on first access.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the class, nothing is created yet."""
+        self._engine: Optional[AsyncEngine] = None
+        self._replica_engines: list[AsyncEngine] = []
+
+    def connect(self) -> None:
+        """Create engines and session factories, if not created yet."""
+        if self._engine is not None:
+            return
+        self._engine = create_engine(settings.postgres_db_url)
+        instrument_engine(self._engine, "primary")
+        log_slow_queries(self._engine, "primary")
+        self._session_factory = create_session_factory(self._engine)
+        # Connections of read-only sessions begin transactions as READ ONLY,
+        # the option is reset when they are returned to the pool.
+        self._readonly_session_factory = create_session_factory(
+            self._engine.execution_options(postgresql_readonly=True),
+        )
+        self._replica_engines = [
+            create_engine(url) for url in settings.postgres_replica_urls
+        ]
+        for number, engine in enumerate(self._replica_engines):
+            instrument_engine(engine, f"replica{number}")
+            log_slow_queries(engine, f"replica{number}")
+        self._replica_router = ReplicaRouter(
+            [
+                create_session_factory(
+                    engine.execution_options(postgresql_readonly=True),
+                )
+                for engine in self._replica_engines
+            ],
+            settings.replica_retry_interval,
+        )
+
+    async def dispose(self) -> None:
+        """Close connections of all the engines and drop them."""
+        if self._engine is None:
+            return
+        engines = [self._engine, *self._replica_engines]
+        self._engine = None
+        self._replica_engines = []
+        for engine in engines:
+            await engine.dispose()
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """Get engine of the primary."""
+        self.connect()
+        return self._engine
+
+    @property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Get session factory of the primary."""
+        self.connect()
+        return self._session_factory
+
+    @property
+    def readonly_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """Get read-only session factory of the primary."""
+        self.connect()
+        return self._readonly_session_factory
+
+    @property
+    def replica_engines(self) -> list[AsyncEngine]:
+        """Get engines of the replicas."""
+        self.connect()
+        return self._replica_engines
+
+    @property
+    def replica_router(self) -> ReplicaRouter:
+        """Get round-robin of read-only session factories of the replicas."""
+        self.connect()
+        return self._replica_router
+
+
+database = Database()
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     """Create session for database."""
-    async with AsyncSessionLocal() as session:
+    async with database.session_factory() as session:
         yield session
@@ -0,0 +1,72 @@
+import time
+from collections.abc import Sequence
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class ReplicaRouter:
+    """
+    Round-robin of read-only session factories of the replicas.
+
+    Replica, which has failed to connect, is skipped for retry_interval
+    seconds, so read-only units go to the other ones, or to the primary,
+    if there are no healthy replicas left. WAL position replayed by every
+    replica is remembered, once it has been observed, so that replicas,
+    which have already caught up with a write, need no check.
+
+    params:
+        - session_factories: read-only session factories of the replicas
+        - retry_interval: number of seconds unhealthy replica is skipped for
+    """
+
+    def __init__(
+        self,
+        session_factories: Sequence[async_sessionmaker[AsyncSession]],
+        retry_interval: float,
+    ) -> None:
+        """Initialize the class, all the replicas are considered healthy."""
+        self.session_factories = list(session_factories)
+        self.retry_interval = retry_interval
+        self._next = 0
+        self._unhealthy_until: dict[int, float] = {}
+        self._replayed: dict[int, int] = {}
+
+    def candidates(self) -> list[async_sessionmaker[AsyncSession]]:
+        """Get healthy replicas, starting from the next one in turn."""
+        count = len(self.session_factories)
+        if not count:
+            return []
+        start = self._next
+        self._next = (start + 1) % count
+        now = time.monotonic()
+        return [
+            self.session_factories[index]
+            for index in ((start + offset) % count for offset in range(count))
+            if self._unhealthy_until.get(index, 0) <= now
+        ]
+
+    def mark_unhealthy(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+    ) -> None:
+        """Skip the replica for retry_interval seconds."""
+        index = self.session_factories.index(session_factory)
+        self._unhealthy_until[index] = time.monotonic() + self.retry_interval
+
+    def replayed(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+    ) -> Optional[int]:
+        """Get WAL position the replica has replayed, None if unknown."""
+        index = self.session_factories.index(session_factory)
+        return self._replayed.get(index)
+
+    def observe(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        lsn: int,
+    ) -> None:
+        """Remember WAL position the replica has replayed."""
+        index = self.session_factories.index(session_factory)
+        self._replayed[index] = max(self._replayed.get(index, 0), lsn)
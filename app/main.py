@@ -2,22 +2,39 @@ from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from fastapi_pagination import add_pagination
 from redis import asyncio as aioredis
 
 from app.api import router
+from app.cache.setup import init_cache, reset_cache
 from app.core.config import settings
+from app.database.db import database
+from app.observability.metrics import MetricsMiddleware
+from app.observability.profiling import ProfilingMiddleware
+from app.observability.tracing import TracingMiddleware, tracer
+from app.services.instrument import InstrumentService
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    # Created per worker process, after it has been forked.
+    database.connect()
     redis = aioredis.from_url(settings.redis_url)
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
-    yield
+    init_cache(redis)
+    if settings.hot_store_days:
+        await InstrumentService().refresh_hot_store()
+    try:
+        yield
+    finally:
+        reset_cache()
+        await redis.close()
+        await database.dispose()
+        tracer.shutdown()
 
 
 app = FastAPI(docs_url="/swagger", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(ProfilingMiddleware)
 add_pagination(app)
 app.include_router(router)
@@ -0,0 +1,123 @@
+from datetime import date
+
+from sqlalchemy import DDL, Date, Float, Index, String, UniqueConstraint, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+from app.models.trading_day import INSTRUMENT_TRANSITION_TABLES
+
+REFRESH_DAILY_AGGREGATES_FUNCTION = """
+CREATE OR REPLACE FUNCTION refresh_daily_instrument_aggregates()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO dailyinstrumentaggregatedb AS aggregate (
+            date, oil_id, delivery_type_id, delivery_basis_id,
+            volume, total, count
+        )
+        SELECT
+            date, oil_id, delivery_type_id, delivery_basis_id,
+            sum(volume), sum(total), sum(count)
+        FROM new_rows
+        GROUP BY date, oil_id, delivery_type_id, delivery_basis_id
+        ON CONFLICT (date, oil_id, delivery_type_id, delivery_basis_id)
+        DO UPDATE SET
+            volume = aggregate.volume + excluded.volume,
+            total = aggregate.total + excluded.total,
+            count = aggregate.count + excluded.count;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE dailyinstrumentaggregatedb AS aggregate SET
+            volume = aggregate.volume - removed.volume,
+            total = aggregate.total - removed.total,
+            count = aggregate.count - removed.count
+        FROM (
+            SELECT
+                date, oil_id, delivery_type_id, delivery_basis_id,
+                sum(volume) AS volume,
+                sum(total) AS total,
+                sum(count) AS count
+            FROM old_rows
+            GROUP BY date, oil_id, delivery_type_id, delivery_basis_id
+        ) AS removed
+        WHERE aggregate.date = removed.date
+        AND aggregate.oil_id = removed.oil_id
+        AND aggregate.delivery_type_id = removed.delivery_type_id
+        AND aggregate.delivery_basis_id = removed.delivery_basis_id;
+        DELETE FROM dailyinstrumentaggregatedb AS aggregate
+        USING (
+            SELECT DISTINCT date, oil_id, delivery_type_id, delivery_basis_id
+            FROM old_rows
+        ) AS removed
+        WHERE aggregate.date = removed.date
+        AND aggregate.oil_id = removed.oil_id
+        AND aggregate.delivery_type_id = removed.delivery_type_id
+        AND aggregate.delivery_basis_id = removed.delivery_basis_id
+        AND NOT EXISTS (
+            SELECT 1 FROM instrumentdb
+            WHERE instrumentdb.date = aggregate.date
+            AND instrumentdb.oil_id = aggregate.oil_id
+            AND instrumentdb.delivery_type_id = aggregate.delivery_type_id
+            AND instrumentdb.delivery_basis_id = aggregate.delivery_basis_id
+        );
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+
+class DailyInstrumentAggregateDB(Base):
+    """
+    Class which represents daily instrument aggregate in SQLAlchemy database.
+
+    Holds sums of volume, total and count of instruments per trading day
+    and (oil_id, delivery_type_id, delivery_basis_id). Statement-level
+    triggers on instrument table add sums of the inserted rows and
+    subtract sums of the deleted ones, so concurrent writers of the same
+    day serialize on the aggregate row instead of overwriting each other.
+    """
+
+    __table_args__ = (
+        UniqueConstraint(
+            "date",
+            "oil_id",
+            "delivery_type_id",
+            "delivery_basis_id",
+            name="uq_dailyinstrumentaggregatedb_date_instrument",
+        ),
+        Index(
+            "ix_dailyinstrumentaggregatedb_instrument_date",
+            "oil_id",
+            "delivery_type_id",
+            "delivery_basis_id",
+            "date",
+        ),
+    )
+
+    date: Mapped[date] = mapped_column(Date)
+    oil_id: Mapped[str] = mapped_column(String(30))
+    delivery_type_id: Mapped[str] = mapped_column(String(30))
+    delivery_basis_id: Mapped[str] = mapped_column(String(30))
+    volume: Mapped[float] = mapped_column(Float)
+    total: Mapped[float] = mapped_column(Float)
+    count: Mapped[float] = mapped_column(Float)
+
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(REFRESH_DAILY_AGGREGATES_FUNCTION).execute_if(dialect="postgresql"),
+)
+for _operation, _referencing in INSTRUMENT_TRANSITION_TABLES.items():
+    event.listen(
+        Base.metadata,
+        "after_create",
+        DDL(
+            "CREATE OR REPLACE TRIGGER "
+            f"refresh_daily_instrument_aggregates_{_operation.lower()} "
+            f"AFTER {_operation} ON instrumentdb {_referencing} "
+            "FOR EACH STATEMENT "
+            "EXECUTE FUNCTION refresh_daily_instrument_aggregates()",
+        ).execute_if(dialect="postgresql"),
+    )
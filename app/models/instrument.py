@@ -1,6 +1,13 @@
 from datetime import datetime
 
-from sqlalchemy import String, Float, Date, DateTime
+from sqlalchemy import (
+    String,
+    Float,
+    Date,
+    DateTime,
+    Index,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import (
     Mapped,
     mapped_column,
@@ -10,7 +17,34 @@ from app.models.base import Base
 
 
 class InstrumentDB(Base):
-    """Class which represents Instrument model in SQLAlchemy database."""
+    """
+    Class which represents Instrument model in SQLAlchemy database.
+
+    Indexes are matched to the API's filter patterns:
+        - (date, id) serves date ranges, keyset ordering
+          and the last trading days lookup;
+        - (oil_id, delivery_type_id, delivery_basis_id, date) serves
+          filtering by instrument, optionally bounded by dates.
+
+    Rows are unique by (exchange_product_id, date), which is the natural
+    key of a bulletin record.
+    """
+
+    __table_args__ = (
+        UniqueConstraint(
+            "exchange_product_id",
+            "date",
+            name="uq_instrumentdb_exchange_product_id_date",
+        ),
+        Index("ix_instrumentdb_date_id", "date", "id"),
+        Index(
+            "ix_instrumentdb_oil_id_delivery_type_id_delivery_basis_id_date",
+            "oil_id",
+            "delivery_type_id",
+            "delivery_basis_id",
+            "date",
+        ),
+    )
 
     exchange_product_id: Mapped[str] = mapped_column(String(30))
     exchange_product_name: Mapped[str] = mapped_column(String(300))
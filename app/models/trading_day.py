@@ -0,0 +1,63 @@
+from datetime import date
+
+from sqlalchemy import DDL, Date, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+SYNC_TRADING_DAYS_FUNCTION = """
+CREATE OR REPLACE FUNCTION sync_trading_days() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO tradingdaydb (date)
+        SELECT DISTINCT date FROM new_rows
+        ON CONFLICT (date) DO NOTHING;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM tradingdaydb AS day
+        USING (SELECT DISTINCT date FROM old_rows) AS changed
+        WHERE day.date = changed.date
+        AND NOT EXISTS (
+            SELECT 1 FROM instrumentdb WHERE instrumentdb.date = day.date
+        );
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+INSTRUMENT_TRANSITION_TABLES = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+}
+
+
+class TradingDayDB(Base):
+    """
+    Class which represents trading day in SQLAlchemy database.
+
+    The table holds distinct dates of instrument table. It is kept in sync
+    by statement-level triggers on instrument table, so that every way
+    of ingestion, including COPY, populates it.
+    """
+
+    date: Mapped[date] = mapped_column(Date, unique=True)
+
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(SYNC_TRADING_DAYS_FUNCTION).execute_if(dialect="postgresql"),
+)
+for _operation, _referencing in INSTRUMENT_TRANSITION_TABLES.items():
+    event.listen(
+        Base.metadata,
+        "after_create",
+        DDL(
+            "CREATE OR REPLACE TRIGGER "
+            f"sync_trading_days_{_operation.lower()} "
+            f"AFTER {_operation} ON instrumentdb {_referencing} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION sync_trading_days()",
+        ).execute_if(dialect="postgresql"),
+    )
@@ -0,0 +1,392 @@
+import math
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, Optional, TYPE_CHECKING
+
+from fastapi_cache import FastAPICache
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.cache.backends import get_two_tier_backend
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+QUERY_LATENCY_BUCKETS = (0.0005, 0.001, *LATENCY_BUCKETS)
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+
+def format_labels(labels: dict[str, Any]) -> str:
+    """Render labels in the Prometheus text format."""
+    if not labels:
+        return ""
+    rendered = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for name, value in labels.items()
+    )
+    return f"{{{rendered}}}"
+
+
+def format_value(value: float) -> str:
+    """Render sample value in the Prometheus text format, losing no digits."""
+    if isinstance(value, int):
+        return str(int(value))
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def format_sample(name: str, labels: dict[str, Any], value: float) -> str:
+    """Render single sample in the Prometheus text format."""
+    return f"{name}{format_labels(labels)} {format_value(value)}"
+
+
+class Counter:
+    """
+    Monotonic counter, partitioned by labels.
+
+    params:
+        - name: metric name
+        - documentation: help text
+        - labelnames: names of the labels, passed to inc
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+    ) -> None:
+        """Initialize the class."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: defaultdict[tuple, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Increment counter of the labels."""
+        self._values[tuple(labels[name] for name in self.labelnames)] += amount
+
+    def collect(self) -> Iterable[str]:
+        """Render the counter."""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for values, value in self._values.items():
+            yield format_sample(
+                self.name,
+                dict(zip(self.labelnames, values, strict=True)),
+                value,
+            )
+
+
+class Histogram:
+    """
+    Histogram of observed values, partitioned by labels.
+
+    params:
+        - name: metric name
+        - documentation: help text
+        - labelnames: names of the labels, passed to observe
+        - buckets: upper bounds of the buckets, ascending
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        """Initialize the class."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: defaultdict[tuple, float] = defaultdict(float)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Add value to the histogram of the labels."""
+        key = tuple(labels[name] for name in self.labelnames)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+        self._sums[key] += value
+
+    def collect(self) -> Iterable[str]:
+        """Render the histogram with cumulative buckets."""
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for key, counts in self._counts.items():
+            labels = dict(zip(self.labelnames, key, strict=True))
+            cumulative = 0
+            for bound, count in zip(
+                (*self.buckets, "+Inf"),
+                counts,
+                strict=True,
+            ):
+                cumulative += count
+                yield format_sample(
+                    f"{self.name}_bucket",
+                    {**labels, "le": bound},
+                    cumulative,
+                )
+            yield format_sample(f"{self.name}_count", labels, cumulative)
+            yield format_sample(f"{self.name}_sum", labels, self._sums[key])
+
+
+class Registry:
+    """
+    Metrics of the worker process, rendered on scrape.
+
+    Collectors are callables, which render metrics computed at scrape
+    time, e.g. from pool and cache statistics.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the class, nothing is registered yet."""
+        self.metrics: list[Counter | Histogram] = []
+        self.collectors: list[Callable[[], Iterable[str]]] = []
+
+    def register(self, metric: Any) -> Any:
+        """Register metric, returning it."""
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all the metrics in the Prometheus text format."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.collect())
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Duration of HTTP requests by route",
+        ("method", "route", "status"),
+    ),
+)
+CACHED_RESPONSES = registry.register(
+    Counter(
+        "cache_responses_total",
+        "Responses of cached routes by cache status",
+        ("route", "cache"),
+    ),
+)
+QUERY_DURATION = registry.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "Duration of database statements by operation",
+        ("engine", "operation"),
+        QUERY_LATENCY_BUCKETS,
+    ),
+)
+QUERY_ROWS = registry.register(
+    Histogram(
+        "db_query_rows",
+        "Rows returned or affected by database statements",
+        ("engine", "operation"),
+        ROW_BUCKETS,
+    ),
+)
+
+_engines: dict[str, "AsyncEngine"] = {}
+
+
+def instrument_engine(engine: "AsyncEngine", name: str) -> None:
+    """Measure statements of the engine, and report its pool on scrape."""
+    _engines[name] = engine
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def stop_timer(conn, cursor, statement, parameters, context, many):
+        duration = time.perf_counter() - conn.info["query_started"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper()
+        QUERY_DURATION.observe(duration, engine=name, operation=operation)
+        if cursor.rowcount >= 0:
+            QUERY_ROWS.observe(
+                cursor.rowcount,
+                engine=name,
+                operation=operation,
+            )
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def drop_timer(context):
+        if context.connection is None:
+            return
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def collect_pools() -> Iterable[str]:
+    """Render connection counts and waits of instrumented pools."""
+    statuses = {
+        name: engine.sync_engine.pool.status()
+        for name, engine in _engines.items()
+    }
+    gauges = (
+        ("db_pool_size", "size", "Size of the connection pool"),
+        ("db_pool_checked_in", "checked_in", "Idle connections in the pool"),
+        ("db_pool_checked_out", "checked_out", "Connections in use"),
+        ("db_pool_overflow", "overflow", "Connections over the pool size"),
+    )
+    for metric, field, documentation in gauges:
+        yield f"# HELP {metric} {documentation}"
+        yield f"# TYPE {metric} gauge"
+        for name, status in statuses.items():
+            yield format_sample(metric, {"engine": name}, status[field])
+    yield "# HELP db_pool_utilization Share of connections in use"
+    yield "# TYPE db_pool_utilization gauge"
+    capacity = settings.db_pool_size + settings.db_max_overflow
+    for name, status in statuses.items():
+        yield format_sample(
+            "db_pool_utilization",
+            {"engine": name},
+            status["checked_out"] / capacity if capacity else 0,
+        )
+    counters = (
+        ("db_pool_waits_total", "waits", "Connection checkouts"),
+        (
+            "db_pool_wait_seconds_total",
+            "wait_seconds_total",
+            "Time spent checking connections out",
+        ),
+        ("db_pool_timeouts_total", "timeouts", "Connection checkout timeouts"),
+    )
+    for metric, field, documentation in counters:
+        yield f"# HELP {metric} {documentation}"
+        yield f"# TYPE {metric} counter"
+        for name, status in statuses.items():
+            yield format_sample(metric, {"engine": name}, status[field])
+
+
+def collect_cache_tiers() -> Iterable[str]:
+    """Render lookups and hit ratios of the cache tiers."""
+    backend = get_two_tier_backend()
+    if backend is None:
+        return
+    yield "# HELP cache_lookups_total Cache lookups by tier and result"
+    yield "# TYPE cache_lookups_total counter"
+    for tier in ("l1", "l2"):
+        for result in ("hit", "miss"):
+            yield format_sample(
+                "cache_lookups_total",
+                {"tier": tier, "result": result},
+                backend.stats[f"{tier}_{result}"],
+            )
+    yield "# HELP cache_hit_ratio Share of lookups served by the tier"
+    yield "# TYPE cache_hit_ratio gauge"
+    for tier in ("l1", "l2"):
+        hits = backend.stats[f"{tier}_hit"]
+        lookups = hits + backend.stats[f"{tier}_miss"]
+        yield format_sample(
+            "cache_hit_ratio",
+            {"tier": tier},
+            hits / lookups if lookups else 0,
+        )
+
+
+registry.collectors.extend((collect_pools, collect_cache_tiers))
+
+
+def get_cache_status(message: Message) -> Optional[str]:
+    """Get cache status of the response, if it is set."""
+    try:
+        header = FastAPICache.get_cache_status_header().lower().encode()
+    except AssertionError:
+        return None
+    for name, value in message.get("headers", ()):
+        if name.lower() == header:
+            return value.decode().lower()
+    return None
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware measuring duration of every HTTP request.
+
+    Requests are labelled by the route template, so that path parameters
+    do not multiply the series. Cache status of cached routes is counted
+    from the response header, set by the cache decorator.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize the class."""
+        self.app = app
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        """Handle the request, measuring it."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+        cache_status: Optional[str] = None
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status, cache_status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                cache_status = get_cache_status(message)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", "<unmatched>")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=route_path,
+                status=status,
+            )
+            if cache_status is not None:
+                CACHED_RESPONSES.inc(route=route_path, cache=cache_status)
@@ -0,0 +1,323 @@
+import asyncio
+import hmac
+import json
+import sys
+import threading
+import time
+import uuid
+from contextvars import Context, ContextVar
+from pathlib import Path
+from types import FrameType
+from typing import Any, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import Settings, settings
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_SECRET_HEADER = b"x-profile-secret"
+PROFILE_PATH_HEADER = b"x-profile-path"
+PROFILE_SUFFIX = ".speedscope.json"
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# profiler of the request, inherited by tasks the request creates
+current_profiler: ContextVar[Optional["Profiler"]] = ContextVar(
+    "current_profiler",
+    default=None,
+)
+
+
+def _await_target(awaitable: Any) -> Any:
+    """Get object, which the coroutine or generator is suspended on."""
+    for attribute in ("cr_await", "ag_await", "gi_yieldfrom"):
+        if hasattr(awaitable, attribute):
+            return getattr(awaitable, attribute)
+    return None
+
+
+def _frame_of(awaitable: Any) -> Optional[FrameType]:
+    """Get frame of the coroutine or generator, None if it has none."""
+    for attribute in ("cr_frame", "ag_frame", "gi_frame"):
+        if hasattr(awaitable, attribute):
+            return getattr(awaitable, attribute)
+    return None
+
+
+def _is_running(awaitable: Any) -> bool:
+    """Check whether the coroutine or generator is executing."""
+    for attribute in ("cr_running", "ag_running", "gi_running"):
+        if hasattr(awaitable, attribute):
+            return getattr(awaitable, attribute)
+    return False
+
+
+def sample_task(task: asyncio.Task, thread_id: int) -> list[FrameType]:
+    """
+    Get logical stack of the task, from the outermost frame.
+
+    Awaits are followed from the task coroutine down, so the stack
+    includes the awaiting callers, even if the task is suspended,
+    e.g. waiting for the database. If the task is executing, frames
+    of synchronous calls made by its innermost coroutine are added.
+    """
+    frames: list[FrameType] = []
+    awaitable: Any = task.get_coro()
+    innermost = None
+    while awaitable is not None:
+        frame = _frame_of(awaitable)
+        if frame is None:
+            break
+        frames.append(frame)
+        innermost = awaitable
+        awaitable = _await_target(awaitable)
+    if innermost is not None and _is_running(innermost):
+        thread_frame = sys._current_frames().get(thread_id)
+        calls = []
+        while thread_frame is not None and thread_frame is not frames[-1]:
+            calls.append(thread_frame)
+            thread_frame = thread_frame.f_back
+        if thread_frame is not None:
+            frames.extend(reversed(calls))
+    return frames
+
+
+class Profiler:
+    """
+    Sampling profiler of a single task, rendering speedscope profiles.
+
+    Stacks are sampled by a background thread at the interval, i.e. by
+    wall clock time, so time spent waiting is attributed to the awaiting
+    frames. Stacks of unfinished tasks created by the task, e.g. of
+    coalesced computations, are appended in order of their creation.
+    Profiles can be opened at https://www.speedscope.app.
+
+    params:
+        - task: task to sample, e.g. of the request
+        - interval: seconds between samples
+    """
+
+    def __init__(self, task: asyncio.Task, interval: float) -> None:
+        """Initialize the class, nothing is sampled yet."""
+        self.task = task
+        self.interval = interval
+        self.children: list[asyncio.Task] = []
+        self._children_lock = threading.Lock()
+        self.frames: dict[tuple[str, str, int], int] = {}
+        self.samples: list[list[int]] = []
+        self.weights: list[float] = []
+        self._thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._started = 0.0
+        self._finished = 0.0
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler."""
+        self._stopped.set()
+        self._thread.join()
+        self._finished = time.perf_counter()
+
+    def add_child(self, task: asyncio.Task) -> None:
+        """Register task created by the sampled one, from the loop thread."""
+        with self._children_lock:
+            self.children.append(task)
+
+    def _run(self) -> None:
+        previous = self._started
+        while not self._stopped.wait(self.interval):
+            with self._children_lock:
+                self.children[:] = [
+                    child for child in self.children if not child.done()
+                ]
+                children = list(self.children)
+            stack = sample_task(self.task, self._thread_id)
+            for child in children:
+                stack.extend(sample_task(child, self._thread_id))
+            now = time.perf_counter()
+            self.samples.append([self._frame_index(frame) for frame in stack])
+            self.weights.append(now - previous)
+            previous = now
+
+    def _frame_index(self, frame: FrameType) -> int:
+        code = frame.f_code
+        key = (code.co_qualname, code.co_filename, code.co_firstlineno)
+        index = self.frames.get(key)
+        if index is None:
+            index = self.frames[key] = len(self.frames)
+        return index
+
+    def render(self, name: str) -> dict[str, Any]:
+        """Render profile in the speedscope file format."""
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "app.observability.profiling",
+            "shared": {
+                "frames": [
+                    {"name": qualname, "file": filename, "line": line}
+                    for qualname, filename, line in self.frames
+                ],
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self._finished - self._started,
+                    "samples": self.samples,
+                    "weights": self.weights,
+                },
+            ],
+        }
+
+
+class ChildTaskFactory:
+    """
+    Task factory, which registers tasks with the profiler of the context.
+
+    It is installed into the loop while any request is profiled,
+    and delegates creation of tasks to the previously installed one.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the class, not installed yet."""
+        self.profiled = 0
+        self._previous: Any = None
+
+    def __call__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        coro: Any,
+        context: Optional[Context] = None,
+    ) -> asyncio.Future:
+        """Create task, registering it with the profiler, if any."""
+        if self._previous is None:
+            task = asyncio.Task(coro, loop=loop, context=context)
+        elif context is None:
+            task = self._previous(loop, coro)
+        else:
+            task = self._previous(loop, coro, context=context)
+        if context is None:
+            profiler = current_profiler.get()
+        else:
+            profiler = context.get(current_profiler)
+        if profiler is not None:
+            profiler.add_child(task)
+        return task
+
+    def enter(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Install the factory for one more profiled request."""
+        if self.profiled == 0:
+            self._previous = loop.get_task_factory()
+            loop.set_task_factory(self)
+        self.profiled += 1
+
+    def exit(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Restore the previous factory after the last profiled request."""
+        self.profiled -= 1
+        if self.profiled == 0:
+            loop.set_task_factory(self._previous)
+            self._previous = None
+
+
+child_task_factory = ChildTaskFactory()
+
+
+def is_profiling_requested(scope: Scope) -> bool:
+    """
+    Check profiling header and the shared secret of the request.
+
+    Nothing is profiled unless profiling is enabled, or while the secret
+    is still the publicly known default one.
+    """
+    if (
+        not settings.profiling_enabled
+        or settings.secret == Settings.model_fields["secret"].default
+    ):
+        return False
+    headers = dict(scope["headers"])
+    if headers.get(PROFILE_HEADER) != b"1":
+        return False
+    return hmac.compare_digest(
+        headers.get(PROFILE_SECRET_HEADER, b""),
+        settings.secret.encode(),
+    )
+
+
+def store_profile(path: Path, profile: dict[str, Any]) -> None:
+    """Write the profile, removing the oldest ones above the limit."""
+    path.write_text(json.dumps(profile))
+    stored = sorted(
+        path.parent.glob(f"*{PROFILE_SUFFIX}"),
+        key=lambda stored_path: stored_path.stat().st_mtime_ns,
+    )
+    for outdated in stored[: max(len(stored) - settings.profile_max_files, 0)]:
+        outdated.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling requests on demand.
+
+    Requests with "X-Profile: 1" and the app secret in the
+    "X-Profile-Secret" header are profiled, the speedscope profile is
+    stored in the profile directory, and its path is returned in the
+    "X-Profile-Path" header. Other requests, and requests arriving while
+    the limit of concurrently profiled ones is reached, are passed
+    through as is. Only the newest profiles are kept.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize the class."""
+        self.app = app
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        """Handle the request, profiling it if requested."""
+        if (
+            scope["type"] != "http"
+            or child_task_factory.profiled >= settings.profile_max_concurrent
+            or not is_profiling_requested(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+        directory = Path(settings.profile_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+            f"{PROFILE_SUFFIX}"
+        )
+
+        async def send_with_path(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (PROFILE_PATH_HEADER, str(path).encode()),
+                ]
+            await send(message)
+
+        loop = asyncio.get_running_loop()
+        profiler = Profiler(asyncio.current_task(), settings.profile_interval)
+        token = current_profiler.set(profiler)
+        child_task_factory.enter(loop)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_path)
+        finally:
+            profiler.stop()
+            profile = profiler.render(f"{scope['method']} {scope['path']}")
+            try:
+                await asyncio.to_thread(store_profile, path, profile)
+            finally:
+                child_task_factory.exit(loop)
+                current_profiler.reset(token)
@@ -0,0 +1,238 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import random
+import reprlib
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from typing import Any, Optional, TYPE_CHECKING
+
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# "InstrumentRepository.get_dynamics", set while the method is running
+repository_method: ContextVar[Optional[str]] = ContextVar(
+    "repository_method",
+    default=None,
+)
+
+_parameters_repr = reprlib.Repr()
+_parameters_repr.maxstring = 200
+_parameters_repr.maxother = 200
+_parameters_repr.maxtuple = 20
+_parameters_repr.maxlist = 20
+
+
+def record_repository_method(method: Callable) -> Callable:
+    """Make queries of the repository method attributable to it."""
+    if inspect.isasyncgenfunction(method):
+
+        @functools.wraps(method)
+        async def generator_wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            token = repository_method.set(
+                f"{type(self).__name__}.{method.__name__}",
+            )
+            try:
+                async for item in method(self, *args, **kwargs):
+                    yield item
+            finally:
+                repository_method.reset(token)
+
+        return generator_wrapper
+
+    @functools.wraps(method)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        token = repository_method.set(
+            f"{type(self).__name__}.{method.__name__}",
+        )
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            repository_method.reset(token)
+
+    return wrapper
+
+
+class RateLimiter:
+    """
+    Fixed window limit of events, counting the suppressed ones.
+
+    params:
+        - limit: events allowed per window
+        - interval: window length in seconds
+    """
+
+    def __init__(self, limit: int, interval: float) -> None:
+        """Initialize the class."""
+        self.limit = limit
+        self.interval = interval
+        self.window_started = float("-inf")
+        self.allowed = 0
+        self.suppressed = 0
+
+    def allow(self) -> bool:
+        """Check whether the event is allowed in the current window."""
+        now = time.monotonic()
+        if now - self.window_started >= self.interval:
+            self.window_started = now
+            self.allowed = 0
+        if self.allowed >= self.limit:
+            self.suppressed += 1
+            return False
+        self.allowed += 1
+        return True
+
+    def take_suppressed(self) -> int:
+        """Get count of events suppressed since the last call."""
+        suppressed, self.suppressed = self.suppressed, 0
+        return suppressed
+
+
+limiter = RateLimiter(
+    settings.slow_query_log_limit,
+    settings.slow_query_log_interval,
+)
+
+
+class SlowQueryLog:
+    """
+    Log of engine statements, which take longer than the threshold.
+
+    Records are JSON objects with the statement, its bound parameters
+    and the repository method it originates from. A share of SELECT
+    statements is explained with EXPLAIN (ANALYZE, BUFFERS) on another
+    connection in the background, and logged together with the plan.
+    Records of all the engines are rate-limited by the module limiter.
+
+    params:
+        - engine: engine to watch
+        - name: engine name, e.g. primary or replica0
+        - threshold: duration in seconds
+        - explain_rate: share of slow SELECT statements to explain
+    """
+
+    def __init__(
+        self,
+        engine: "AsyncEngine",
+        name: str,
+        threshold: float,
+        explain_rate: float,
+    ) -> None:
+        """Initialize the class."""
+        self.engine = engine
+        self.name = name
+        self.threshold = threshold
+        self.explain_rate = explain_rate
+        self._explains: set[asyncio.Task] = set()
+
+    def install(self) -> None:
+        """Listen to statements of the engine."""
+        sync_engine = self.engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._start)
+        event.listen(sync_engine, "after_cursor_execute", self._finish)
+        event.listen(sync_engine, "handle_error", self._drop)
+
+    def uninstall(self) -> None:
+        """Stop listening to statements of the engine."""
+        sync_engine = self.engine.sync_engine
+        event.remove(sync_engine, "before_cursor_execute", self._start)
+        event.remove(sync_engine, "after_cursor_execute", self._finish)
+        event.remove(sync_engine, "handle_error", self._drop)
+
+    def _start(self, conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("slow_query_started", []).append(
+            time.perf_counter(),
+        )
+
+    def _drop(self, context) -> None:
+        if context.connection is None:
+            return
+        started = context.connection.info.get("slow_query_started")
+        if started:
+            started.pop()
+
+    def _finish(self, conn, cursor, statement, parameters, context, many):
+        duration = time.perf_counter() - conn.info["slow_query_started"].pop()
+        if duration < self.threshold:
+            return
+        if not conn.get_execution_options().get("slow_query_log", True):
+            return
+        if not limiter.allow():
+            return
+        record = {
+            "event": "slow_query",
+            "engine": self.name,
+            "duration": round(duration, 6),
+            "repository_method": repository_method.get(),
+            "statement": statement,
+            "parameters": _parameters_repr.repr(parameters),
+            "suppressed": limiter.take_suppressed(),
+        }
+        explainable = (
+            not many
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and random.random() < self.explain_rate
+        )
+        if explainable:
+            try:
+                task = asyncio.get_running_loop().create_task(
+                    self._explain_and_log(record, statement, parameters),
+                )
+            except RuntimeError:
+                pass
+            else:
+                self._explains.add(task)
+                task.add_done_callback(self._explains.discard)
+                return
+        self._log(record)
+
+    async def _explain_and_log(
+        self,
+        record: dict[str, Any],
+        statement: str,
+        parameters: Any,
+    ) -> None:
+        """Explain the statement on another connection, then log it."""
+        try:
+            async with self.engine.connect() as connection:
+                await connection.execution_options(
+                    postgresql_readonly=True,
+                    slow_query_log=False,
+                )
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}",
+                    parameters,
+                )
+                record["plan"] = "\n".join(result.scalars())
+        except (OSError, SQLAlchemyError) as exc:
+            record["plan_error"] = str(exc)
+        self._log(record)
+
+    @staticmethod
+    def _log(record: dict[str, Any]) -> None:
+        logger.warning(
+            json.dumps(record, default=str),
+            extra={"slow_query": record},
+        )
+
+
+def log_slow_queries(engine: "AsyncEngine", name: str) -> None:
+    """Log slow statements of the engine, if threshold is configured."""
+    if settings.slow_query_threshold <= 0:
+        return
+    SlowQueryLog(
+        engine,
+        name,
+        settings.slow_query_threshold,
+        settings.slow_query_explain_rate,
+    ).install()
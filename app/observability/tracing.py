@@ -0,0 +1,336 @@
+import functools
+import inspect
+import json
+import queue
+import random
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+SERVICE_NAME = "em_fastapi"
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class Span:
+    """
+    Timed operation within a trace.
+
+    Spans of a trace share the list of finished spans, which is exported
+    when the root span ends. Spans ending after that, e.g. in tasks
+    outliving the request, are exported one by one.
+
+    params:
+        - name: operation name, e.g. InstrumentRepository.get_dynamics
+        - parent: enclosing span, None for the root of a trace
+        - kind: OTLP span kind
+        - attributes: initial attributes
+    """
+
+    __slots__ = (
+        "name",
+        "kind",
+        "trace_id",
+        "span_id",
+        "parent",
+        "attributes",
+        "start_time",
+        "end_time",
+        "status",
+        "_finished",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        parent: Optional["Span"] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """Initialize the class, starting the span."""
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.trace_id = (
+            parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        )
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.attributes = attributes or {}
+        self.status = STATUS_OK
+        self._finished: list[Span] = parent._finished if parent else []
+        self.start_time = time.time_ns()
+        self.end_time = 0
+
+    def set_attribute(self, name: str, value: Any) -> None:
+        """Set attribute of the span."""
+        self.attributes[name] = value
+
+    def end(self, exporter: "JsonFileExporter") -> None:
+        """End the span, exporting the trace if the span is its root."""
+        self.end_time = time.time_ns()
+        if self.parent is None:
+            self._finished.append(self)
+            exporter.export(self._finished)
+            self._finished = []
+        elif self._root_ended():
+            exporter.export([self])
+        else:
+            self._finished.append(self)
+
+    def _root_ended(self) -> bool:
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        return root.end_time != 0
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Render the span in the OTLP JSON encoding."""
+        rendered = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": [
+                {"key": name, "value": _otlp_value(value)}
+                for name, value in self.attributes.items()
+            ],
+            "status": {"code": self.status},
+        }
+        if self.parent is not None:
+            rendered["parentSpanId"] = self.parent.span_id
+        return rendered
+
+
+class NoopSpan:
+    """Span returned while tracing is disabled, recording nothing."""
+
+    def set_attribute(self, name: str, value: Any) -> None:
+        """Ignore the attribute."""
+
+
+NOOP_SPAN = NoopSpan()
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    """Render attribute value in the OTLP JSON encoding."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class JsonFileExporter:
+    """
+    Exporter appending traces to the file as OTLP JSON lines.
+
+    Every line is an ExportTraceServiceRequest, as written by the file
+    exporter of the OpenTelemetry Collector, so the file can be read by
+    its otlpjsonfile receiver. Lines are written by a background thread,
+    started on the first export.
+
+    params:
+        - path: file to append to
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the class, nothing is exported yet."""
+        self.path = Path(path)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def export(self, spans: list[Span]) -> None:
+        """Schedule the spans to be written."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._queue.put(spans)
+
+    def shutdown(self) -> None:
+        """Write the scheduled spans and stop the background thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while (spans := self._queue.get()) is not None:
+            line = json.dumps(
+                {
+                    "resourceSpans": [
+                        {
+                            "resource": {
+                                "attributes": [
+                                    {
+                                        "key": "service.name",
+                                        "value": _otlp_value(SERVICE_NAME),
+                                    },
+                                ],
+                            },
+                            "scopeSpans": [
+                                {
+                                    "scope": {"name": __name__},
+                                    "spans": [
+                                        span.to_otlp() for span in spans
+                                    ],
+                                },
+                            ],
+                        },
+                    ],
+                },
+            )
+            with self.path.open("a") as file:
+                file.write(line + "\n")
+
+
+class Tracer:
+    """
+    Tracer of the worker process, disabled if it has no exporter.
+
+    params:
+        - exporter: exporter of finished traces
+    """
+
+    def __init__(self, exporter: Optional[JsonFileExporter]) -> None:
+        """Initialize the class."""
+        self.exporter = exporter
+
+    def shutdown(self) -> None:
+        """Write traces, which are not written yet."""
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+tracer = Tracer(
+    JsonFileExporter(settings.tracing_export_path)
+    if settings.tracing_export_path
+    else None,
+)
+
+current_span: ContextVar[Optional[Span]] = ContextVar(
+    "current_span",
+    default=None,
+)
+
+
+def get_current_span() -> Span | NoopSpan:
+    """Get the current span, or the no-op one outside of any span."""
+    return current_span.get() or NOOP_SPAN
+
+
+@contextmanager
+def span(
+    name: str,
+    kind: int = SPAN_KIND_INTERNAL,
+    activate: bool = True,
+    **attributes: Any,
+) -> Iterator[Span | NoopSpan]:
+    """
+    Run the block within a span, child of the current one.
+
+    The span is current within the block, unless activate is unset,
+    e.g. for spans of async generators, which are suspended between
+    items. Exceptions raised by the block mark the span as failed.
+    """
+    exporter = tracer.exporter
+    if exporter is None:
+        yield NOOP_SPAN
+        return
+    started = Span(name, current_span.get(), kind, attributes)
+    token = current_span.set(started) if activate else None
+    try:
+        yield started
+    except BaseException as exc:
+        started.status = STATUS_ERROR
+        started.set_attribute("exception.type", type(exc).__name__)
+        raise
+    finally:
+        if token is not None:
+            current_span.reset(token)
+        started.end(exporter)
+
+
+def trace_method(method: Callable) -> Callable:
+    """Run the coroutine method within a span named after the class."""
+    if inspect.isasyncgenfunction(method):
+
+        @functools.wraps(method)
+        async def generator_wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            with span(
+                f"{type(self).__name__}.{method.__name__}",
+                activate=False,
+            ):
+                async for item in method(self, *args, **kwargs):
+                    yield item
+
+        return generator_wrapper
+
+    @functools.wraps(method)
+    async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        if tracer.exporter is None:
+            return await method(self, *args, **kwargs)
+        with span(f"{type(self).__name__}.{method.__name__}"):
+            return await method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware running every HTTP request within a root span.
+
+    The span is named after the route template, once the request has
+    been routed. Requests are passed through as is, if tracing is
+    disabled.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize the class."""
+        self.app = app
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        """Handle the request within a span."""
+        if scope["type"] != "http" or tracer.exporter is None:
+            await self.app(scope, receive, send)
+            return
+        with span(
+            scope["method"],
+            SPAN_KIND_SERVER,
+            **{"http.method": scope["method"]},
+        ) as request_span:
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    request_span.set_attribute(
+                        "http.status_code",
+                        message["status"],
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route is not None:
+                    request_span.name = f"{scope['method']} {route}"
+                    request_span.set_attribute("http.route", route)
@@ -0,0 +1,39 @@
+from datetime import date
+from typing import Any
+
+from sqlalchemy import between, select
+
+from app.repositories.base import SqlAlchemyRepository
+from app.schemas.instrument import DailyInstrumentAggregateOut
+from app.schemas.pagination import CountedPage
+
+
+class DailyInstrumentAggregateRepository(SqlAlchemyRepository):
+    """
+    Repository class for DailyInstrumentAggregate model.
+
+    The table is refreshed by the database itself on instrument ingestion,
+    so only reading methods are listed below.
+    """
+
+    async def get_aggregates(
+        self,
+        start_date: date,
+        end_date: date,
+        **kwargs: Any,
+    ) -> CountedPage[DailyInstrumentAggregateOut]:
+        """Get daily aggregates for set period, matched by filters."""
+        columns = self.model.__table__.columns
+        return await self._paginate_counted(
+            select(*columns)
+            .filter(between(self.model.date, start_date, end_date))
+            .filter_by(**kwargs)
+            .order_by(
+                self.model.date,
+                self.model.oil_id,
+                self.model.delivery_type_id,
+                self.model.delivery_basis_id,
+            ),
+            "aggregates",
+            dict(start_date=start_date, end_date=end_date, **kwargs),
+        )
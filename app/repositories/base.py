@@ -1,14 +1,35 @@
+import inspect
 from abc import ABC, abstractmethod
-from typing import Any, Sequence, TypeVar, TYPE_CHECKING, Union, Optional
+from itertools import islice
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Sequence,
+    TypeVar,
+    TYPE_CHECKING,
+    Union,
+    Optional,
+)
 
-from sqlalchemy import delete, insert, select, update
+from fastapi_pagination.api import create_page, resolve_params
+from fastapi_pagination.ext.sqlalchemy import (
+    create_count_query,
+    create_paginate_query,
+)
+from sqlalchemy import delete, insert, select, text, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache.counts import count_cache
 from app.models.base import Base
+from app.observability.slow_queries import record_repository_method
+from app.observability.tracing import trace_method
 
 if TYPE_CHECKING:
-    from sqlalchemy import Insert, Select, Update, Delete
+    from fastapi_pagination.bases import AbstractPage
+    from sqlalchemy import Insert, Row, Select, Update, Delete
     from sqlalchemy.engine import Result
+    from sqlalchemy.ext.asyncio import AsyncConnection
 
 Model = TypeVar("Model", bound=Base)
 
@@ -18,8 +39,25 @@ class AbstractRepository(ABC):
     Abstract Repository class.
 
     Implements all the CRUD operations for working with any database.
+    Public coroutine methods of subclasses are traced, and recorded as
+    the origin of queries they run, e.g. for the slow query log.
     """
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Trace and record public coroutine methods of the subclass."""
+        super().__init_subclass__(**kwargs)
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith("_"):
+                continue
+            if inspect.iscoroutinefunction(
+                attribute,
+            ) or inspect.isasyncgenfunction(attribute):
+                setattr(
+                    cls,
+                    name,
+                    trace_method(record_repository_method(attribute)),
+                )
+
     @abstractmethod
     async def add_one(self, *args: Any, **kwargs: Any) -> None:
         """Create single object."""
@@ -42,6 +80,10 @@ class AbstractRepository(ABC):
         """Create single object and return it."""
         raise NotImplementedError
 
+    async def add_many(self, *args: Any, **kwargs: Any) -> int:
+        """Create many objects and return their count."""
+        raise NotImplementedError
+
     async def get_by_query_one_or_none(
         self,
         *args: Any,
@@ -127,6 +169,45 @@ class SqlAlchemyRepository(AbstractRepository):
         obj: Result = await self.session.execute(query)
         return obj.scalar_one()
 
+    async def add_many(
+        self,
+        data: Iterable[dict[str, Any]],
+        chunk_size: int,
+    ) -> int:
+        """
+        Insert many objects into the database and return their count.
+
+        Rows are sent chunk by chunk via COPY, if the driver supports it,
+        or via multi-row INSERT otherwise. Python-side column defaults
+        are not applied, so every row must contain all required values.
+        """
+        connection: AsyncConnection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        use_copy = hasattr(driver_connection, "copy_records_to_table")
+        if use_copy and not driver_connection.is_in_transaction():
+            # Driver transaction is begun lazily by the first statement,
+            # COPY must not run outside the unit of work transaction.
+            await self.session.execute(text("SELECT 1"))
+        rows = iter(data)
+        inserted = 0
+        while chunk := list(islice(rows, chunk_size)):
+            if use_copy:
+                columns = list(chunk[0])
+                await driver_connection.copy_records_to_table(
+                    self.model.__table__.name,
+                    records=[
+                        tuple(row[column] for column in columns)
+                        for row in chunk
+                    ],
+                    columns=columns,
+                    schema_name=self.model.__table__.schema,
+                )
+            else:
+                await self.session.execute(insert(self.model), chunk)
+            inserted += len(chunk)
+        return inserted
+
     async def get_by_query_one_or_none(self, **kwargs: Any) -> Model | None:
         """Get an object by query or None if not found."""
         query: Select = select(self.model).filter_by(**kwargs)
@@ -169,3 +250,56 @@ class SqlAlchemyRepository(AbstractRepository):
         """Delete all objects."""
         query: Delete = delete(self.model)
         await self.session.execute(query)
+
+    async def _paginate_counted(
+        self,
+        query: "Select",
+        name: str,
+        filters: dict[str, Any],
+        transformer: Optional[Callable[[Sequence["Row"]], Any]] = None,
+        estimated: bool = False,
+    ) -> "AbstractPage[Any]":
+        """
+        Paginate query by limit and offset, without counting every page.
+
+        Total is taken from the count cache keyed by name and filters,
+        or from the planner estimate of the table, if estimated is set,
+        i.e. the query matches every row of it. Otherwise, or if exact
+        total is requested, rows are counted and the total is cached.
+        """
+        params = resolve_params()
+        name = f"{self.model.__tablename__}:{name}"
+        total = None
+        if not getattr(params, "exact_total", True):
+            total = await count_cache.get(name, filters)
+            if total is None and estimated:
+                total = await self._estimate_count()
+        if total is None:
+            total = await self.session.scalar(create_count_query(query))
+            await count_cache.set(name, filters, total)
+        result: Result = await self.session.execute(
+            create_paginate_query(query, params),
+        )
+        rows = result.all()
+        return create_page(
+            transformer(rows) if transformer else rows,
+            total=total,
+            params=params,
+        )
+
+    async def _estimate_count(self) -> Optional[int]:
+        """
+        Get planner estimate of the table rows count.
+
+        None is returned, if the table has never been analyzed.
+        """
+        estimate = await self.session.scalar(
+            text(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = to_regclass(:table_name)",
+            ),
+            {"table_name": self.model.__table__.fullname},
+        )
+        if estimate is None or estimate < 0:
+            return None
+        return estimate
@@ -1,15 +1,34 @@
 from datetime import date
-from typing import Any, Sequence, TYPE_CHECKING
+from itertools import islice
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterable,
+    Optional,
+    Sequence,
+    TYPE_CHECKING,
+)
 
 from fastapi_pagination.ext.sqlalchemy import paginate
-from fastapi_pagination import Page
-from sqlalchemy import select, distinct, between
+from sqlalchemy import Date, between, cast, distinct, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.models.instrument import InstrumentDB
+from app.core.config import settings
 from app.repositories.base import SqlAlchemyRepository
+from app.schemas.instrument import (
+    INSTRUMENTS_ADAPTER,
+    InstrumentProjectionOut,
+    PricePointOut,
+)
+from app.schemas.pagination import CountedPage, KeysetPage
 
 if TYPE_CHECKING:
-    from sqlalchemy import Result, Select
+    from sqlalchemy import ColumnElement, Result, Row, Select
+    from sqlalchemy.dialects.postgresql import Insert
+    from sqlalchemy.ext.asyncio import AsyncResult
+
+UPSERT_KEY = ("exchange_product_id", "date")
+UPSERT_AUDIT_COLUMNS = ("id", "created_on", "updated_on")
 
 
 class InstrumentRepository(SqlAlchemyRepository):
@@ -20,6 +39,58 @@ class InstrumentRepository(SqlAlchemyRepository):
     as well as specific ones listed below.
     """
 
+    async def upsert_many(
+        self,
+        data: Iterable[dict[str, Any]],
+        chunk_size: int,
+    ) -> int:
+        """
+        Insert many instruments or update existing ones.
+
+        Rows are matched by (exchange_product_id, date). Existing rows
+        are updated, and get new updated_on, only if their values actually
+        change, so re-importing the same bulletin writes nothing.
+
+        Return count of inserted or updated rows.
+        """
+        table = self.model.__table__
+        rows = iter(data)
+        affected = 0
+        while chunk := list(islice(rows, chunk_size)):
+            # Single statement must not affect the same row twice.
+            unique_rows = list(
+                {
+                    tuple(row[column] for column in UPSERT_KEY): row
+                    for row in chunk
+                }.values(),
+            )
+            query: Insert = pg_insert(table)
+            changed_columns = [
+                column
+                for column in unique_rows[0]
+                if column not in (*UPSERT_KEY, *UPSERT_AUDIT_COLUMNS)
+            ]
+            query = query.on_conflict_do_update(
+                index_elements=UPSERT_KEY,
+                set_={
+                    **{
+                        column: query.excluded[column]
+                        for column in changed_columns
+                    },
+                    "updated_on": func.now(),
+                },
+                where=tuple_(
+                    *(table.c[column] for column in changed_columns),
+                ).is_distinct_from(
+                    tuple_(
+                        *(query.excluded[name] for name in changed_columns),
+                    ),
+                ),
+            ).returning(table.c.id)
+            result: Result = await self.session.execute(query, unique_rows)
+            affected += len(result.all())
+        return affected
+
     async def get_last_trading_days(self, num_days: int) -> Sequence[date]:
         """Get sequence of last trading days."""
         query: Select = (
@@ -36,21 +107,247 @@ class InstrumentRepository(SqlAlchemyRepository):
         self,
         start_date: date,
         end_date: date,
+        fields: Optional[Sequence[str]] = None,
         **kwargs: Any,
-    ) -> Page[InstrumentDB]:
-        """Get trading dynamics for set period."""
-        query: Select = (
-            select(self.model)
-            .filter(
-                between(self.model.date, start_date, end_date),
+    ) -> CountedPage[InstrumentProjectionOut]:
+        """
+        Get trading dynamics for set period, projected on fields.
+
+        Rows are ordered by (date, id), same as in the hot window,
+        so pages are stable.
+        """
+        return await self._paginate_counted(
+            self._get_dynamics_query(
+                start_date,
+                end_date,
+                fields,
+                **kwargs,
+            ).order_by(
+                *self._keyset_order,
+            ),
+            "dynamics",
+            dict(start_date=start_date, end_date=end_date, **kwargs),
+            transformer=self._to_instruments,
+        )
+
+    async def get_dynamics_by_cursor(
+        self,
+        start_date: date,
+        end_date: date,
+        fields: Optional[Sequence[str]] = None,
+        **kwargs: Any,
+    ) -> KeysetPage[InstrumentProjectionOut]:
+        """
+        Get trading dynamics for set period, using keyset pagination.
+
+        Rows are ordered by (date, id), so every page costs the same
+        regardless of its depth.
+        """
+        return await paginate(
+            self.session,
+            self._get_dynamics_query(
+                start_date,
+                end_date,
+                fields,
+                **kwargs,
+            ).order_by(
+                *self._keyset_order,
+            ),
+            transformer=self._to_instruments,
+        )
+
+    async def stream_dynamics(
+        self,
+        start_date: date,
+        end_date: date,
+        chunk_size: int,
+        fields: Optional[Sequence[str]] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[list[InstrumentProjectionOut]]:
+        """
+        Stream trading dynamics for set period in chunks.
+
+        Rows are fetched through a server-side cursor, so that memory
+        usage does not depend on the size of the period.
+        """
+        result: AsyncResult = await self.session.stream(
+            self._get_dynamics_query(start_date, end_date, fields, **kwargs)
+            .order_by(*self._keyset_order)
+            .execution_options(yield_per=chunk_size),
+        )
+        async for chunk in result.partitions():
+            yield self._to_instruments(chunk)
+
+    async def get_price_series(
+        self,
+        start_date: date,
+        end_date: date,
+        period: str,
+        **kwargs: Any,
+    ) -> CountedPage[PricePointOut]:
+        """
+        Get price time series of products for set period.
+
+        Rows are bucketed by the start of day, week or month. Open and close
+        prices of a bucket are taken by window functions over the rows
+        of the product within the bucket, ordered by date. Rows without
+        volume have no price, they are skipped by open and close, and
+        prices of a bucket without volume are null.
+        """
+        period_start = cast(
+            func.date_trunc(period, self.model.date),
+            Date,
+        )
+        price = self.model.total / func.nullif(self.model.volume, 0)
+        bucket_window = {
+            "partition_by": (self.model.exchange_product_id, period_start),
+            "rows": (None, None),
+        }
+        # priced rows go first for open and last for close
+        opening_window = {
+            **bucket_window,
+            "order_by": (price.is_(None), *self._keyset_order),
+        }
+        closing_window = {
+            **bucket_window,
+            "order_by": (price.is_not(None), *self._keyset_order),
+        }
+        priced = (
+            self._get_dynamics_query(
+                start_date,
+                end_date,
+                ("exchange_product_id", "volume", "total"),
+                **kwargs,
+            )
+            .add_columns(
+                period_start.label("period_start"),
+                price.label("price"),
+                func.first_value(price).over(**opening_window).label("open"),
+                func.last_value(price).over(**closing_window).label("close"),
+            )
+            .subquery()
+        )
+        return await self._paginate_counted(
+            select(
+                priced.c.exchange_product_id,
+                priced.c.period_start,
+                (
+                    func.sum(priced.c.total)
+                    / func.nullif(func.sum(priced.c.volume), 0)
+                ).label("average_price"),
+                func.min(priced.c.open).label("open"),
+                func.max(priced.c.price).label("high"),
+                func.min(priced.c.price).label("low"),
+                func.min(priced.c.close).label("close"),
+                func.sum(priced.c.volume).label("volume"),
+                func.sum(priced.c.total).label("total"),
             )
+            .group_by(priced.c.exchange_product_id, priced.c.period_start)
+            .order_by(priced.c.exchange_product_id, priced.c.period_start),
+            "price_series",
+            dict(
+                start_date=start_date,
+                end_date=end_date,
+                period=period,
+                **kwargs,
+            ),
+        )
+
+    async def get_rows_since(self, start_date: date) -> Sequence["Row"]:
+        """Get plain rows of all columns since the date, by (date, id)."""
+        result: Result = await self.session.execute(
+            self._select_columns()
+            .filter(self.model.date >= start_date)
+            .order_by(*self._keyset_order),
+        )
+        return result.all()
+
+    async def get_trading_results(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        **kwargs: Any,
+    ) -> CountedPage[InstrumentProjectionOut]:
+        """Get trading results, matched by filters, ordered by (date, id)."""
+        return await self._paginate_counted(
+            self._select_columns(fields)
             .filter_by(**kwargs)
+            .order_by(
+                *self._keyset_order,
+            ),
+            "trading_results",
+            kwargs,
+            transformer=self._to_instruments,
+            estimated=not kwargs,
         )
-        return await paginate(self.session, query)
 
-    async def get_trading_results(self, **kwargs: Any) -> Page[InstrumentDB]:
-        """Get sequence of trading results, matched by filters."""
+    async def get_trading_results_by_cursor(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        **kwargs: Any,
+    ) -> KeysetPage[InstrumentProjectionOut]:
+        """Get trading results, matched by filters, using keyset pagination."""
         return await paginate(
             self.session,
-            select(self.model).filter_by(**kwargs),
+            self._select_columns(fields)
+            .filter_by(**kwargs)
+            .order_by(
+                *self._keyset_order,
+            ),
+            transformer=self._to_instruments,
+        )
+
+    @property
+    def _keyset_order(self) -> tuple["ColumnElement", ...]:
+        """Get unique ordering used by keyset pagination."""
+        return self.model.date, self.model.id
+
+    def _get_dynamics_query(
+        self,
+        start_date: date,
+        end_date: date,
+        fields: Optional[Sequence[str]] = None,
+        **kwargs: Any,
+    ) -> "Select":
+        """Build query for trading dynamics for set period."""
+        return (
+            self._select_columns(fields)
+            .filter(
+                between(self.model.date, start_date, end_date),
+            )
+            .filter_by(**kwargs)
         )
+
+    def _select_columns(
+        self,
+        fields: Optional[Sequence[str]] = None,
+    ) -> "Select":
+        """
+        Build query for plain column tuples of the table.
+
+        Only the columns listed in fields are selected, if they are set.
+        Rows are not turned into ORM objects, which skips identity map
+        bookkeeping for read-only pages.
+        """
+        columns = self.model.__table__.columns
+        if fields:
+            return select(*(columns[name] for name in fields))
+        return select(*columns)
+
+    @staticmethod
+    def _to_instruments(
+        rows: Sequence["Row"],
+    ) -> list[InstrumentProjectionOut]:
+        """
+        Convert plain rows into response models.
+
+        Rows are trusted to match the schema, as they come from the
+        database, so validation is skipped unless it is enabled.
+        """
+        if settings.validate_db_rows:
+            return INSTRUMENTS_ADAPTER.validate_python(
+                [row._mapping for row in rows],
+            )
+        return [
+            InstrumentProjectionOut.model_construct(**row._mapping)
+            for row in rows
+        ]
@@ -0,0 +1,25 @@
+from datetime import date
+from typing import Sequence, TYPE_CHECKING
+
+from sqlalchemy import select
+
+from app.repositories.base import SqlAlchemyRepository
+
+if TYPE_CHECKING:
+    from sqlalchemy import Result
+
+
+class TradingDayRepository(SqlAlchemyRepository):
+    """
+    Repository class for TradingDay model.
+
+    The table is populated by the database itself on instrument ingestion,
+    so only reading methods are listed below.
+    """
+
+    async def get_dates(self) -> Sequence[date]:
+        """Get all trading days in ascending order."""
+        result: Result = await self.session.execute(
+            select(self.model.date).order_by(self.model.date),
+        )
+        return result.scalars().all()
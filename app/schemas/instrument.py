@@ -1,11 +1,16 @@
 from datetime import datetime, date
-from typing import Annotated, Self, Optional
+from enum import StrEnum
+from typing import Annotated, Any, Literal, Self, Optional
 
 from pydantic import (
+    AfterValidator,
     BaseModel,
+    BeforeValidator,
     ConfigDict,
     Field,
     PositiveFloat,
+    TypeAdapter,
+    create_model,
     model_validator,
 )
 
@@ -33,6 +38,109 @@ class InstrumentOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class DailyInstrumentAggregateOut(BaseModel):
+    """
+    Schema for representing daily aggregate of Instruments.
+
+    Sums are calculated per trading day and instrument.
+    """
+
+    date: date
+    oil_id: str
+    delivery_type_id: str
+    delivery_basis_id: str
+    volume: float
+    total: float
+    count: float
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PricePointOut(BaseModel):
+    """
+    Schema for representing point of price time series.
+
+    Prices are calculated as total / volume of a product for the period,
+    average price is weighted by volume. Prices of a period without
+    volume are None.
+    """
+
+    exchange_product_id: str
+    period_start: date
+    average_price: Optional[float]
+    open: Optional[float]
+    high: Optional[float]
+    low: Optional[float]
+    close: Optional[float]
+    volume: float
+    total: float
+
+
+class PricePeriod(StrEnum):
+    """Periods, which price time series are bucketed by."""
+
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class ExportFormat(StrEnum):
+    """Formats, which instruments can be exported in."""
+
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+INSTRUMENT_FIELDS = tuple(InstrumentOut.model_fields)
+
+InstrumentProjectionOut = create_model(
+    "InstrumentProjectionOut",
+    __doc__=(
+        "Schema for representing Instrument model, projected on "
+        "the requested fields.\n\nDerived from InstrumentOut, every field "
+        "is optional, only the fields, which were set, are rendered."
+    ),
+    **{
+        name: (
+            Annotated[(Optional[field.annotation], *field.metadata)]
+            if field.metadata
+            else Optional[field.annotation],
+            None,
+        )
+        for name, field in InstrumentOut.model_fields.items()
+    },
+)
+
+INSTRUMENTS_ADAPTER = TypeAdapter(list[InstrumentProjectionOut])
+
+
+def split_fields(value: Any) -> Any:
+    """Split comma-separated field names of the query."""
+    if isinstance(value, str):
+        value = [value]
+    if isinstance(value, (list, tuple)):
+        return [
+            name.strip()
+            for item in value
+            for name in str(item).split(",")
+            if name.strip()
+        ]
+    return value
+
+
+def order_fields(value: Optional[list[str]]) -> Optional[list[str]]:
+    """Order field names as in the schema, dropping duplicates."""
+    if not value:
+        return None
+    return [name for name in INSTRUMENT_FIELDS if name in value]
+
+
+InstrumentFields = Annotated[
+    Optional[list[Literal[INSTRUMENT_FIELDS]]],
+    BeforeValidator(split_fields),
+    AfterValidator(order_fields),
+]
+
+
 class InstrumentDateResponse(BaseModel):
     """Schema for representing date of a trading day."""
 
@@ -64,3 +172,46 @@ class InstrumentWithDateFilters(InstrumentFilters):
 
     start_date: date
     end_date: date
+
+
+class InstrumentProjection(BaseModel):
+    """Schema for representing fields, which Instruments are projected on."""
+
+    fields: InstrumentFields = None
+
+
+class ProjectedInstrumentFilters(InstrumentFilters, InstrumentProjection):
+    """Schema for representing filters and projection of Instruments."""
+
+
+class ProjectedInstrumentWithDateFilters(
+    InstrumentWithDateFilters,
+    InstrumentProjection,
+):
+    """
+    Schema for representing filters and projection of Instruments.
+
+    Also includes start_date and end_date fields.
+    """
+
+
+class InstrumentExportFilters(ProjectedInstrumentWithDateFilters):
+    """
+    Schema for representing filters of Instruments export.
+
+    Also includes format, which the instruments are rendered in.
+    """
+
+    format: ExportFormat = ExportFormat.ndjson
+
+
+class PriceSeriesFilters(InstrumentWithDateFilters):
+    """
+    Schema for representing filters of price time series.
+
+    Also includes exchange_product_id and period, which prices
+    are bucketed by.
+    """
+
+    exchange_product_id: Annotated[str, Field(None, max_length=11)]
+    period: PricePeriod = PricePeriod.day
@@ -0,0 +1,57 @@
+from collections.abc import Sequence
+from typing import Any, Generic, Optional, TypeVar
+
+from fastapi import Query
+from fastapi_pagination import Page, Params
+from fastapi_pagination.bases import AbstractPage, AbstractParams
+from fastapi_pagination.cursor import CursorParams, encode_cursor
+from fastapi_pagination.types import Cursor
+
+T = TypeVar("T")
+
+
+class KeysetPage(AbstractPage[T], Generic[T]):
+    """
+    Schema for representing page, paginated by keyset.
+
+    Exposes only the opaque cursor for the next page, total count
+    of items is never calculated.
+    """
+
+    items: Sequence[T]
+    next_cursor: Optional[str] = None
+
+    __params_type__ = CursorParams
+
+    @classmethod
+    def create(
+        cls,
+        items: Sequence[T],
+        params: AbstractParams,
+        *,
+        next_: Optional[Cursor] = None,
+        **kwargs: Any,
+    ) -> "KeysetPage[T]":
+        """Create page with encoded cursor for the next page."""
+        return cls(items=items, next_cursor=encode_cursor(next_))
+
+
+class CountedParams(Params):
+    """Page params, which let clients opt in to the exact total."""
+
+    exact_total: bool = Query(
+        False,
+        description="Count total exactly, instead of taking it from cache "
+        "or planner estimate",
+    )
+
+
+class CountedPage(Page[T], Generic[T]):
+    """
+    Schema for representing page, which total may be approximate.
+
+    Total is taken from the count cache, or from the planner estimate
+    for unfiltered queries, unless exact_total is requested.
+    """
+
+    __params_type__ = CountedParams
@@ -0,0 +1,64 @@
+"""
+Production entry point, running the app in several worker processes.
+
+    python -m app.server --workers 4 --bind 0.0.0.0:8000
+
+The app code is imported once by the master process and inherited by
+forked workers. Engines and Redis clients are created by every worker
+in the app lifespan.
+"""
+
+import argparse
+from typing import Any
+
+from fastapi import FastAPI
+from gunicorn.app.base import BaseApplication
+
+from app.core.config import settings
+from app.main import app
+
+
+class Server(BaseApplication):
+    """
+    Gunicorn application serving the app with uvicorn workers.
+
+    params:
+        - application: ASGI app to serve
+        - options: gunicorn settings, e.g. bind and workers
+    """
+
+    def __init__(self, application: FastAPI, options: dict[str, Any]) -> None:
+        """Initialize the class."""
+        self.application = application
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        """Apply the options to gunicorn settings."""
+        for name, value in self.options.items():
+            self.cfg.set(name, value)
+
+    def load(self) -> FastAPI:
+        """Get the app, which is served by workers."""
+        return self.application
+
+
+def main() -> None:
+    """Run the server with options from command line or settings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bind", default=settings.web_bind)
+    parser.add_argument("--workers", type=int, default=settings.web_workers)
+    arguments = parser.parse_args()
+    Server(
+        app,
+        {
+            "bind": arguments.bind,
+            "workers": arguments.workers,
+            "worker_class": "uvicorn_worker.UvicornWorker",
+            "preload_app": True,
+        },
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
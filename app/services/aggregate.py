@@ -0,0 +1,19 @@
+from typing import Any
+
+from app.services.base import BaseService
+from app.units_of_work.base import atomic
+
+
+class DailyInstrumentAggregateService(BaseService):
+    """
+    Daily instrument aggregate model-specific service.
+
+    Used for performing actions with repository.
+    """
+
+    base_repository: str = "daily_aggregates"
+
+    @atomic(readonly=True)
+    async def get_aggregates(self, **kwargs: Any):
+        """Get daily aggregates."""
+        return await self.uow.daily_aggregates.get_aggregates(**kwargs)
@@ -1,6 +1,8 @@
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 from typing import Any
 
+from app.cache.invalidation import invalidate_cache
+from app.core.config import settings
 from app.units_of_work.base import atomic, UnitOfWork
 
 
@@ -18,11 +20,13 @@ class BaseService:
         """Apply Unit of Work to service."""
         self.uow: UnitOfWork = UnitOfWork()
 
+    @invalidate_cache
     @atomic
     async def add_one(self, **kwargs: Any) -> None:
         """Add a new record to the database through unit of work."""
         await getattr(self.uow, self.base_repository).add_one(**kwargs)
 
+    @invalidate_cache
     @atomic
     async def add_one_and_get_id(self, **kwargs: Any) -> int | str:
         """
@@ -35,6 +39,7 @@ class BaseService:
             self.base_repository,
         ).add_one_and_get_id(**kwargs)
 
+    @invalidate_cache
     @atomic
     async def add_one_and_get_obj(self, **kwargs: Any) -> Any:
         """
@@ -47,7 +52,24 @@ class BaseService:
             self.base_repository,
         ).add_one_and_get_obj(**kwargs)
 
+    @invalidate_cache
     @atomic
+    async def add_many(
+        self,
+        data: Iterable[dict[str, Any]],
+        chunk_size: int = settings.bulk_insert_chunk_size,
+    ) -> int:
+        """
+        Add many records to the database within a single unit of work.
+
+        After that, return their count.
+        """
+        return await getattr(self.uow, self.base_repository).add_many(
+            data,
+            chunk_size,
+        )
+
+    @atomic(readonly=True)
     async def get_by_query_one_or_none(self, **kwargs: Any) -> Any:
         """
         Get an object from the database via unit of work.
@@ -59,7 +81,7 @@ class BaseService:
             self.base_repository,
         ).get_by_query_one_or_none(**kwargs)
 
-    @atomic
+    @atomic(readonly=True)
     async def get_by_query_all(self, **kwargs: Any) -> Sequence[Any]:
         """
         Get sequence of objects from the database via unit of work.
@@ -70,6 +92,7 @@ class BaseService:
             **kwargs,
         )
 
+    @invalidate_cache
     @atomic
     async def update_one_by_id(self, obj_id: int | str, **kwargs: Any) -> Any:
         """
@@ -82,11 +105,13 @@ class BaseService:
             **kwargs,
         )
 
+    @invalidate_cache
     @atomic
     async def delete_by_query(self, **kwargs: Any) -> None:
         """Delete an object from the database via unit of work."""
         await getattr(self.uow, self.base_repository).delete_by_query(**kwargs)
 
+    @invalidate_cache
     @atomic
     async def delete_all(self) -> None:
         """Delete all objects from the database via unit of work."""
@@ -0,0 +1,183 @@
+from datetime import date
+from typing import Any, Optional, Sequence, TYPE_CHECKING
+
+import numpy as np
+from fastapi_pagination.api import create_page, resolve_params
+
+from app.cache.invalidation import on_invalidate
+from app.schemas.instrument import INSTRUMENT_FIELDS, InstrumentProjectionOut
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from fastapi_pagination.bases import AbstractPage
+    from sqlalchemy import Row
+
+ENCODED_COLUMNS = (
+    "exchange_product_id",
+    "exchange_product_name",
+    "oil_id",
+    "delivery_basis_id",
+    "delivery_basis_name",
+    "delivery_type_id",
+)
+COLUMN_TYPES = {
+    "id": np.int64,
+    "volume": np.float64,
+    "total": np.float64,
+    "count": np.float64,
+    "date": "datetime64[D]",
+    "created_on": "datetime64[us]",
+    "updated_on": "datetime64[us]",
+}
+
+
+class HotWindow:
+    """
+    Columnar snapshot of instruments of the last trading days.
+
+    Every column is a NumPy array, string columns are dictionary-encoded,
+    i.e. stored as codes into the sorted array of their distinct values.
+    Missing timestamps are stored as NaT. Rows are ordered by (date, id).
+
+    params:
+        - rows: instrument rows, ordered by (date, id)
+        - start_date: first trading day of the window
+        - complete: whether the window holds all trading days
+    """
+
+    def __init__(
+        self,
+        rows: Sequence["Row"],
+        start_date: date,
+        complete: bool,
+    ) -> None:
+        """Initialize the class, encoding rows into columns."""
+        self.start_date = start_date
+        self.complete = complete
+        self.columns: dict[str, np.ndarray] = {}
+        self.categories: dict[str, np.ndarray] = {}
+        self.codes: dict[str, dict[str, int]] = {}
+        values = {}
+        if rows:
+            columns = zip(*rows, strict=True)
+            values = dict(zip(rows[0]._fields, columns, strict=True))
+        for name in INSTRUMENT_FIELDS:
+            column = values.get(name, ())
+            if name in ENCODED_COLUMNS:
+                categories, codes = np.unique(
+                    np.array(column, dtype=object),
+                    return_inverse=True,
+                )
+                self.categories[name] = categories
+                self.codes[name] = {
+                    value: code for code, value in enumerate(categories)
+                }
+                self.columns[name] = codes.astype(np.int32)
+            else:
+                self.columns[name] = np.array(
+                    column,
+                    dtype=COLUMN_TYPES[name],
+                )
+
+    def __len__(self) -> int:
+        """Get number of rows in the window."""
+        return len(self.columns["id"])
+
+    def covers(self, start_date: Optional[date]) -> bool:
+        """Check if all rows since start_date are in the window."""
+        if start_date is None:
+            return self.complete
+        return self.complete or start_date >= self.start_date
+
+    def paginate(
+        self,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        fields: Optional[Sequence[str]] = None,
+        **kwargs: Any,
+    ) -> "AbstractPage[InstrumentProjectionOut]":
+        """
+        Get page of instruments, matched by filters.
+
+        Rows are matched by vectorized masks, only the requested page
+        is turned into response models.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if start_date is not None:
+            mask &= self.columns["date"] >= np.datetime64(start_date)
+        if end_date is not None:
+            mask &= self.columns["date"] <= np.datetime64(end_date)
+        for name, value in kwargs.items():
+            code = self.codes[name].get(value)
+            if code is None:
+                mask[:] = False
+                break
+            mask &= self.columns[name] == code
+        matched = np.flatnonzero(mask)
+
+        params = resolve_params()
+        raw_params = params.to_raw_params().as_limit_offset()
+        offset = raw_params.offset or 0
+        page_rows = matched[
+            offset : None if raw_params.limit is None
+            else offset + raw_params.limit
+        ]
+        return create_page(
+            self._to_instruments(page_rows, fields or INSTRUMENT_FIELDS),
+            total=len(matched),
+            params=params,
+        )
+
+    def _to_instruments(
+        self,
+        rows: np.ndarray,
+        fields: Sequence[str],
+    ) -> list[InstrumentProjectionOut]:
+        """Decode rows of the window into response models."""
+        columns = []
+        for name in fields:
+            column = self.columns[name][rows]
+            if name in ENCODED_COLUMNS:
+                columns.append(self.categories[name][column].tolist())
+            else:
+                columns.append(column.tolist())
+        return [
+            InstrumentProjectionOut.model_construct(
+                **dict(zip(fields, row, strict=True)),
+            )
+            for row in zip(*columns, strict=True)
+        ]
+
+
+class HotStore:
+    """
+    Holder of the hot window, loaded for a data version.
+
+    The window is dropped on every invalidation, and replaced
+    by the one loaded in the background.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the class, no window is loaded yet."""
+        self.window: Optional[HotWindow] = None
+        self.version: Optional[int] = None
+        self.refreshing: Optional["asyncio.Task"] = None
+
+    def is_stale(self, version: int) -> bool:
+        """Check if the window was loaded for another data version."""
+        return self.version != version
+
+    def load(self, window: Optional[HotWindow], version: int) -> None:
+        """Replace the window with the one loaded for the data version."""
+        self.window = window
+        self.version = version
+
+    def invalidate(self) -> None:
+        """Drop the window, until it is loaded again."""
+        self.window = None
+        self.version = None
+
+
+hot_store = HotStore()
+on_invalidate(hot_store.invalidate)
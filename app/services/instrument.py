@@ -1,12 +1,31 @@
+import asyncio
+import csv
+import io
+import logging
+from collections.abc import AsyncIterator, Iterable, Iterator
+from contextlib import contextmanager
 from typing import Any, Optional
 from http import HTTPStatus
 
 from fastapi.exceptions import HTTPException
+from fastapi_pagination.api import resolve_params
+from sqlakeyset import BadBookmark, InvalidPage
+from sqlalchemy.exc import SQLAlchemyError
 
-from app.schemas.instrument import InstrumentDateResponse
+from app.cache.invalidation import data_version, invalidate_cache, on_bump
+from app.core.config import settings
+from app.schemas.instrument import (
+    INSTRUMENT_FIELDS,
+    ExportFormat,
+    InstrumentDateResponse,
+)
 from app.services.base import BaseService
+from app.services.hot_store import HotWindow, hot_store
+from app.services.trading_calendar import TradingCalendar, trading_calendar
 from app.units_of_work.base import atomic
 
+logger = logging.getLogger(__name__)
+
 
 class InstrumentService(BaseService):
     """
@@ -17,30 +36,179 @@ class InstrumentService(BaseService):
 
     base_repository: str = "instruments"
 
+    @invalidate_cache
     @atomic
+    async def upsert_many(
+        self,
+        data: Iterable[dict[str, Any]],
+        chunk_size: int = settings.bulk_insert_chunk_size,
+    ) -> int:
+        """
+        Insert or update many instruments within a single unit of work.
+
+        After that, return count of actually changed rows.
+        """
+        return await self.uow.instruments.upsert_many(data, chunk_size)
+
+    @atomic(readonly=True)
     async def get_last_trading_days(
         self,
         num_dates: int,
     ) -> list[InstrumentDateResponse]:
         """Get last trading days."""
         self._validate_num_dates(num_dates)
+        calendar = await self._get_trading_calendar()
         return [
             InstrumentDateResponse.model_validate(dict(date=_date))
-            for _date in await self.uow.instruments.get_last_trading_days(
-                num_dates,
-            )
+            for _date in calendar.last(num_dates)
         ]
 
-    @atomic
+    @atomic(readonly=True)
     async def get_dynamics(self, **kwargs: Any):
         """Get dynamics."""
+        await self._clamp_to_trading_days(kwargs)
+        window = await self._get_hot_window()
+        if window is not None and window.covers(kwargs["start_date"]):
+            return window.paginate(**kwargs)
         return await self.uow.instruments.get_dynamics(**kwargs)
 
-    @atomic
+    @atomic(readonly=True)
+    async def get_dynamics_by_cursor(self, **kwargs: Any):
+        """Get dynamics, paginated by cursor."""
+        await self._clamp_to_trading_days(kwargs)
+        with self._handle_invalid_cursor():
+            return await self.uow.instruments.get_dynamics_by_cursor(**kwargs)
+
+    async def export_dynamics(
+        self,
+        export_format: ExportFormat,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """
+        Export dynamics for set period, rendered chunk by chunk.
+
+        The unit of work stays open until the export is exhausted.
+        """
+        async with self.uow(readonly=True):
+            await self._clamp_to_trading_days(kwargs)
+            if export_format is ExportFormat.csv:
+                yield self._render_csv(
+                    [kwargs.get("fields") or INSTRUMENT_FIELDS],
+                )
+            async for instruments in self.uow.instruments.stream_dynamics(
+                chunk_size=settings.export_chunk_size,
+                **kwargs,
+            ):
+                if export_format is ExportFormat.csv:
+                    yield self._render_csv(
+                        instrument.model_dump(
+                            mode="json",
+                            exclude_unset=True,
+                        ).values()
+                        for instrument in instruments
+                    )
+                else:
+                    yield "".join(
+                        f"{instrument.model_dump_json(exclude_unset=True)}\n"
+                        for instrument in instruments
+                    )
+
+    @atomic(readonly=True)
+    async def get_price_series(self, **kwargs: Any):
+        """Get price time series."""
+        await self._clamp_to_trading_days(kwargs)
+        return await self.uow.instruments.get_price_series(**kwargs)
+
+    @atomic(readonly=True)
     async def get_trading_results(self, **kwargs: Any):
         """Get trading results."""
+        window = await self._get_hot_window()
+        if window is not None and window.covers(None):
+            return window.paginate(**kwargs)
         return await self.uow.instruments.get_trading_results(**kwargs)
 
+    @atomic(readonly=True)
+    async def get_trading_results_by_cursor(self, **kwargs: Any):
+        """Get trading results, paginated by cursor."""
+        with self._handle_invalid_cursor():
+            return await self.uow.instruments.get_trading_results_by_cursor(
+                **kwargs,
+            )
+
+    async def refresh_hot_store(self) -> None:
+        """
+        Load last trading days into the hot store.
+
+        Failures are logged, queries fall back to the database meanwhile.
+        """
+        try:
+            await self._load_hot_store()
+        except SQLAlchemyError:
+            logger.warning("Error loading hot store", exc_info=True)
+
+    @atomic(readonly=True)
+    async def _load_hot_store(self) -> None:
+        """Load rows of last trading days for the current data version."""
+        version = await data_version.get()
+        calendar = await self._get_trading_calendar()
+        days = calendar.last(settings.hot_store_days)
+        if not days:
+            hot_store.load(None, version)
+            return
+        hot_store.load(
+            HotWindow(
+                await self.uow.instruments.get_rows_since(days[-1]),
+                start_date=days[-1],
+                complete=len(days) == len(calendar.days),
+            ),
+            version,
+        )
+
+    @staticmethod
+    def schedule_hot_store_refresh() -> None:
+        """Reload the hot store in the background, unless it is reloading."""
+        if not settings.hot_store_days:
+            return
+        if hot_store.refreshing is None or hot_store.refreshing.done():
+            hot_store.refreshing = asyncio.create_task(
+                InstrumentService().refresh_hot_store(),
+            )
+
+    async def _get_hot_window(self) -> Optional[HotWindow]:
+        """
+        Get the hot window, if it was loaded for the current data version.
+
+        Otherwise, schedule reloading it in the background. The window
+        is not used, if exact total is requested, since it may lag behind
+        writes of other workers, so rows are counted by the database.
+        """
+        if not settings.hot_store_days:
+            return None
+        if getattr(resolve_params(), "exact_total", False):
+            return None
+        if not hot_store.is_stale(await data_version.get()):
+            return hot_store.window
+        self.schedule_hot_store_refresh()
+        return None
+
+    async def _get_trading_calendar(self) -> TradingCalendar:
+        """Get trading calendar, reloading it if the data has changed."""
+        version = await data_version.get()
+        if trading_calendar.is_stale(version):
+            trading_calendar.load(
+                await self.uow.trading_days.get_dates(),
+                version,
+            )
+        return trading_calendar
+
+    async def _clamp_to_trading_days(self, kwargs: dict[str, Any]) -> None:
+        """Narrow start_date and end_date filters to actual trading days."""
+        calendar = await self._get_trading_calendar()
+        kwargs["start_date"], kwargs["end_date"] = calendar.clamp(
+            kwargs["start_date"],
+            kwargs["end_date"],
+        )
+
     @classmethod
     def _validate_num_dates(cls, num_dates: Optional[int]) -> None:
         """
@@ -53,3 +221,25 @@ class InstrumentService(BaseService):
                 status_code=HTTPStatus.BAD_REQUEST,
                 detail="Number of days must be a positive integer",
             )
+
+    @staticmethod
+    def _render_csv(rows: Iterable[Iterable[Any]]) -> str:
+        """Render rows as CSV lines."""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
+
+    @staticmethod
+    @contextmanager
+    def _handle_invalid_cursor() -> Iterator[None]:
+        """Reject cursor, which can not be decoded into a page bookmark."""
+        try:
+            yield
+        except (BadBookmark, InvalidPage):
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail="Invalid cursor value",
+            )
+
+
+on_bump(InstrumentService.schedule_hot_store_refresh)
@@ -0,0 +1,53 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Iterable, Optional
+
+from app.cache.invalidation import on_invalidate
+
+
+class TradingCalendar:
+    """
+    In-process mirror of the trading days table.
+
+    Days are kept as a sorted list, so that last trading days are
+    a slice of it, and date ranges are clamped by binary search.
+    The mirror is reloaded when the data version changes.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the class, no days are loaded yet."""
+        self.days: list[date] = []
+        self.version: Optional[int] = None
+
+    def is_stale(self, version: int) -> bool:
+        """Check if the days were loaded for another data version."""
+        return self.version != version
+
+    def load(self, days: Iterable[date], version: int) -> None:
+        """Replace the days with the ones loaded for the data version."""
+        self.days = sorted(days)
+        self.version = version
+
+    def invalidate(self) -> None:
+        """Make the days reload on the next access."""
+        self.version = None
+
+    def last(self, num_days: int) -> list[date]:
+        """Get last trading days, most recent first."""
+        return self.days[: -num_days - 1 : -1]
+
+    def clamp(self, start_date: date, end_date: date) -> tuple[date, date]:
+        """
+        Narrow the date range to the trading days within it.
+
+        The range is returned as is, if there are no trading days in it.
+        """
+        start = bisect_left(self.days, start_date)
+        end = bisect_right(self.days, end_date) - 1
+        if start > end:
+            return start_date, end_date
+        return self.days[start], self.days[end]
+
+
+trading_calendar = TradingCalendar()
+on_invalidate(trading_calendar.invalidate)
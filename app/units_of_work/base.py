@@ -1,24 +1,71 @@
+import logging
 from abc import ABC, abstractmethod
 from functools import wraps
 from typing import Any, Awaitable, Callable, Optional
 from types import TracebackType
 
-from app.database.db import AsyncSessionLocal
+from sqlalchemy import text
+from sqlalchemy.exc import InterfaceError, OperationalError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.cache.invalidation import data_version
+from app.database.db import database
+from app.models.aggregate import DailyInstrumentAggregateDB
 from app.models.instrument import InstrumentDB
+from app.models.trading_day import TradingDayDB
+from app.observability.tracing import span
+from app.repositories.aggregate import DailyInstrumentAggregateRepository
 from app.repositories.instrument import InstrumentRepository
+from app.repositories.trading_day import TradingDayRepository
+
+logger = logging.getLogger(__name__)
+
+# WAL positions as byte offsets, primary reports its current one
+WRITE_LSN_QUERY = text("SELECT (pg_current_wal_lsn() - '0/0')::bigint")
+REPLAYED_LSN_QUERY = text(
+    "SELECT (COALESCE(pg_last_wal_replay_lsn(), pg_current_wal_lsn())"
+    " - '0/0')::bigint",
+)
 
 
 def atomic(
-    func: Callable[..., Awaitable[Any]],
-) -> Callable[..., Awaitable[Any]]:
-    """Decorate function with transaction mode."""
+    func: Optional[Callable[..., Awaitable[Any]]] = None,
+    *,
+    readonly: bool = False,
+) -> Any:
+    """
+    Decorate function with transaction mode.
+
+    Used as is, or as atomic(readonly=True) for reading functions, which
+    run in a READ ONLY transaction that is never committed. Reading
+    function, which has lost connection to a replica, is run once again
+    on the primary.
+    """
 
-    @wraps(func)
-    async def wrapper(self, *args, **kwargs):
-        async with self.uow:
-            return await func(self, *args, **kwargs)
+    def decorator(
+        func: Callable[..., Awaitable[Any]],
+    ) -> Callable[..., Awaitable[Any]]:
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            with span(f"atomic {func.__qualname__}", readonly=readonly):
+                try:
+                    async with self.uow(readonly=readonly):
+                        return await func(self, *args, **kwargs)
+                except (OSError, SQLAlchemyError):
+                    if not self.uow.replica_lost:
+                        raise
+                    logger.warning(
+                        "Connection to replica lost, retrying on primary",
+                        exc_info=True,
+                    )
+                async with self.uow(readonly=True, primary=True):
+                    return await func(self, *args, **kwargs)
 
-    return wrapper
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
 
 
 class AbstractUnitOfWork(ABC):
@@ -66,18 +113,53 @@ class UnitOfWork(AbstractUnitOfWork):
     """The class responsible for the atomicity of transactions."""
 
     def __init__(self) -> None:
-        """Initialize the class, adding session_factory."""
-        self.session_factory = AsyncSessionLocal
+        """Initialize the class, adding session factories."""
+        self.session_factory = database.session_factory
+        self.readonly_session_factory = database.readonly_session_factory
+        self.replicas = database.replica_router
+        self.readonly = False
+        self.primary = False
+        self.replica: Optional[async_sessionmaker[AsyncSession]] = None
+        self.replica_lost = False
+
+    def __call__(
+        self,
+        readonly: bool = False,
+        primary: bool = False,
+    ) -> "UnitOfWork":
+        """
+        Set mode of the next unit, e.g. async with uow(readonly=True).
+
+        Read-only unit is run on the primary, if primary is set.
+        """
+        self.readonly = readonly
+        self.primary = primary
+        return self
 
     async def __aenter__(self) -> None:
         """
         Initialize the context manager.
 
         Initialization includes creating a session via session factory,
-        and also injecting model-specific repository.
+        and also injecting model-specific repositories.
+        Read-only units get sessions, which transactions are READ ONLY,
+        on a replica if there is a healthy one, which has replayed the last
+        write, or on the primary.
         """
-        self.session = self.session_factory()
+        self.replica_lost = False
+        with span("UnitOfWork.__aenter__", readonly=self.readonly):
+            if self.readonly and self.primary:
+                self.session = self.readonly_session_factory()
+            elif self.readonly:
+                self.session = await self._open_readonly_session()
+            else:
+                self.session = self.session_factory()
         self.instruments = InstrumentRepository(self.session, InstrumentDB)
+        self.trading_days = TradingDayRepository(self.session, TradingDayDB)
+        self.daily_aggregates = DailyInstrumentAggregateRepository(
+            self.session,
+            DailyInstrumentAggregateDB,
+        )
 
     async def __aexit__(
         self,
@@ -89,19 +171,92 @@ class UnitOfWork(AbstractUnitOfWork):
         Close context manager.
 
         If there were no exceptions, commit transaction, rollback it otherwise.
+        Read-only units are never committed. Replica, which has lost
+        connection within the unit, is marked unhealthy, and replica_lost
+        is set, so that the caller can retry the unit on the primary.
+        The error is raised as is, atomic retries reading functions.
 
-        Close the session afterward.
+        Close the session afterward, returning the connection to the pool.
         """
-        if not exc_type:
-            await self.commit()
-        else:
-            await self.rollback()
-        await self.session.close()
+        with span("UnitOfWork.__aexit__", readonly=self.readonly):
+            if self.readonly:
+                self.readonly = False
+                self.primary = False
+                if self.replica is not None and _is_connection_error(
+                    exc_val,
+                ):
+                    self.replicas.mark_unhealthy(self.replica)
+                    self.replica_lost = True
+                self.replica = None
+            elif not exc_type:
+                await self.commit()
+            else:
+                await self.rollback()
+            await self.session.close()
 
     async def commit(self) -> None:
-        """Commit changes to the database."""
-        await self.session.commit()
+        """
+        Commit changes to the database.
+
+        If there are replicas, WAL position of the primary after the commit
+        is recorded, so that reads go to replicas, which have replayed it.
+        It is read in autocommit mode, without beginning a new transaction.
+        """
+        with span("UnitOfWork.commit"):
+            await self.session.commit()
+            if self.replicas.session_factories:
+                connection = await self.session.connection(
+                    execution_options={"isolation_level": "AUTOCOMMIT"},
+                )
+                data_version.observe_write(
+                    await connection.scalar(WRITE_LSN_QUERY),
+                )
 
     async def rollback(self) -> None:
         """Rollback pending changes."""
-        await self.session.rollback()
+        with span("UnitOfWork.rollback"):
+            await self.session.rollback()
+
+    async def _open_readonly_session(self) -> AsyncSession:
+        """
+        Open read-only session on the next healthy, caught up replica.
+
+        Replica must have replayed the last write, which is known to the
+        data version, otherwise it could put stale data into cache under
+        the current version. Session on a replica, which is known to have
+        replayed it, connects on the first query. Otherwise, the replica
+        is asked for its position, and is skipped if it lags behind.
+        Replica, which fails to connect, is marked unhealthy. Session
+        on the primary is returned, if none is left.
+        """
+        candidates = self.replicas.candidates()
+        if not candidates:
+            return self.readonly_session_factory()
+        write_lsn = await data_version.get_lsn()
+        for session_factory in candidates:
+            replayed = self.replicas.replayed(session_factory)
+            if replayed is not None and replayed >= write_lsn:
+                self.replica = session_factory
+                return session_factory()
+            session = session_factory()
+            try:
+                replayed = await session.scalar(REPLAYED_LSN_QUERY)
+            except (OSError, SQLAlchemyError):
+                logger.warning("Error connecting to replica", exc_info=True)
+                await session.close()
+                self.replicas.mark_unhealthy(session_factory)
+                continue
+            self.replicas.observe(session_factory, replayed)
+            if replayed >= write_lsn:
+                self.replica = session_factory
+                return session
+            await session.close()
+        return self.readonly_session_factory()
+
+
+def _is_connection_error(exc: Optional[BaseException]) -> bool:
+    """Check whether the exception is caused by a lost connection."""
+    return isinstance(
+        exc,
+        (OSError, OperationalError, InterfaceError),
+    ) or getattr(exc, "connection_invalidated", False)
@@ -0,0 +1,88 @@
+"""
+Benchmark bulk ingestion against the per-row insertion path.
+
+Runs against the database configured in settings:
+
+    python -m benchmarks.add_many --rows 5000 --chunk-size 1000
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from app.services.instrument import InstrumentService
+
+BENCHMARK_PRODUCT_NAME = "BENCHMARK"
+
+
+def make_rows(count: int) -> list[dict[str, Any]]:
+    """Build unique instrument rows, resembling a trading bulletin."""
+    now = datetime.now()
+    return [
+        {
+            "exchange_product_id": f"BENCH{number:06d}",
+            "exchange_product_name": BENCHMARK_PRODUCT_NAME,
+            "oil_id": "BNCH",
+            "delivery_basis_id": "BNC",
+            "delivery_basis_name": BENCHMARK_PRODUCT_NAME,
+            "delivery_type_id": "B",
+            "volume": float(number + 1),
+            "total": float((number + 1) * 1000),
+            "count": 1.0,
+            "date": date(2000, 1, 1) + timedelta(days=number % 365),
+            "created_on": now,
+            "updated_on": now,
+        }
+        for number in range(count)
+    ]
+
+
+async def insert_per_row(rows: list[dict[str, Any]], _: int) -> None:
+    """Insert rows one by one, each in its own transaction."""
+    service = InstrumentService()
+    for row in rows:
+        await service.add_one(**row)
+
+
+async def insert_bulk(rows: list[dict[str, Any]], chunk_size: int) -> None:
+    """Insert rows in chunks within a single transaction."""
+    await InstrumentService().add_many(rows, chunk_size)
+
+
+async def measure(
+    name: str,
+    insert: Callable[[list[dict[str, Any]], int], Awaitable[None]],
+    rows: list[dict[str, Any]],
+    chunk_size: int,
+) -> float:
+    """Run insertion, report its throughput and clean up the rows."""
+    started = time.perf_counter()
+    await insert(rows, chunk_size)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:>10}: {len(rows)} rows in {elapsed:.3f}s "
+        f"({len(rows) / elapsed:,.0f} rows/s)",
+    )
+    await InstrumentService().delete_by_query(
+        exchange_product_name=BENCHMARK_PRODUCT_NAME,
+    )
+    return elapsed
+
+
+async def main(rows_count: int, chunk_size: int) -> None:
+    """Compare both insertion paths on the same data."""
+    rows = make_rows(rows_count)
+    per_row = await measure("per-row", insert_per_row, rows, chunk_size)
+    bulk = await measure("add_many", insert_bulk, rows, chunk_size)
+    print(f"{'speedup':>10}: x{per_row / bulk:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.rows, arguments.chunk_size))
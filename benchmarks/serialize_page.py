@@ -0,0 +1,145 @@
+"""
+Benchmark the zero-ORM read path against ORM objects for a single page.
+
+All paths fetch the same rows and turn them into response models.
+ORM objects are rendered the way FastAPI does for a route with
+response_model, rows are dumped by pydantic, as routes without
+response_model do.
+Runs against the database configured in settings:
+
+    python -m benchmarks.serialize_page --rows 1000 --repeat 50
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import Response
+
+from app.database.db import database
+from app.models.instrument import InstrumentDB
+from app.repositories.instrument import InstrumentRepository
+from app.schemas.instrument import INSTRUMENTS_ADAPTER, InstrumentOut
+from app.services.instrument import InstrumentService
+from benchmarks.add_many import BENCHMARK_PRODUCT_NAME, make_rows
+
+RESPONSE_FIELD = create_model_field(
+    name="response",
+    type_=list[InstrumentOut],
+    mode="serialization",
+)
+
+
+async def orm_objects(session: AsyncSession, size: int) -> list[Any]:
+    """Fetch ORM objects and validate them one by one from attributes."""
+    result = await session.scalars(
+        select(InstrumentDB)
+        .filter_by(exchange_product_name=BENCHMARK_PRODUCT_NAME)
+        .limit(size),
+    )
+    return [InstrumentOut.model_validate(row) for row in result.all()]
+
+
+async def validated_rows(session: AsyncSession, size: int) -> list[Any]:
+    """Fetch column tuples and validate them in bulk."""
+    result = await session.execute(
+        select(*InstrumentDB.__table__.columns)
+        .filter_by(exchange_product_name=BENCHMARK_PRODUCT_NAME)
+        .limit(size),
+    )
+    return INSTRUMENTS_ADAPTER.validate_python(
+        [row._mapping for row in result.all()],
+    )
+
+
+async def trusted_rows(session: AsyncSession, size: int) -> list[Any]:
+    """Fetch column tuples and build models without validation."""
+    result = await session.execute(
+        select(*InstrumentDB.__table__.columns)
+        .filter_by(exchange_product_name=BENCHMARK_PRODUCT_NAME)
+        .limit(size),
+    )
+    return InstrumentRepository._to_instruments(result.all())
+
+
+async def render_validated(items: list[Any]) -> Response:
+    """Validate and serialize items by the response model, as FastAPI."""
+    content = await serialize_response(
+        field=RESPONSE_FIELD,
+        response_content=items,
+    )
+    return JSONResponse(content)
+
+
+async def render_trusted(items: list[Any]) -> Response:
+    """Dump items by pydantic, as routes without response_model."""
+    return Response(
+        INSTRUMENTS_ADAPTER.dump_json(items, exclude_unset=True),
+        media_type="application/json",
+    )
+
+
+async def measure(
+    name: str,
+    fetch: Callable[[AsyncSession, int], Awaitable[list[Any]]],
+    render: Callable[[list[Any]], Awaitable[Response]],
+    size: int,
+    repeat: int,
+) -> float:
+    """Fetch and render the page repeatedly, report time per page."""
+    elapsed = 0.0
+    for _ in range(repeat):
+        async with database.session_factory() as session:
+            started = time.perf_counter()
+            await render(await fetch(session, size))
+            elapsed += time.perf_counter() - started
+    per_page = elapsed / repeat
+    print(f"{name:>16}: {per_page * 1000:.2f}ms per {size}-row page")
+    return per_page
+
+
+async def main(rows_count: int, repeat: int) -> None:
+    """Compare read paths on the same rows."""
+    await InstrumentService().add_many(make_rows(rows_count))
+    try:
+        before = await measure(
+            "orm + json",
+            orm_objects,
+            render_validated,
+            rows_count,
+            repeat,
+        )
+        await measure(
+            "rows + adapter",
+            validated_rows,
+            render_trusted,
+            rows_count,
+            repeat,
+        )
+        after = await measure(
+            "trusted rows",
+            trusted_rows,
+            render_trusted,
+            rows_count,
+            repeat,
+        )
+        print(f"{'speedup':>16}: x{before / after:.1f}")
+    finally:
+        await InstrumentService().delete_by_query(
+            exchange_product_name=BENCHMARK_PRODUCT_NAME,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.rows, arguments.repeat))
@@ -0,0 +1,135 @@
+"""
+Benchmark throughput of the production server against worker count.
+
+Starts app.server with every given number of workers in turn, and
+requests the route from concurrent clients for a fixed duration.
+Runs against the database and Redis configured in settings:
+
+    python -m benchmarks.throughput --workers 1 2 4 --duration 10
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+
+import httpx
+
+from app.services.instrument import InstrumentService
+from benchmarks.add_many import BENCHMARK_PRODUCT_NAME, make_rows
+
+ROUTE = "/v1/instrument/get_trading_results?oil_id=BNCH&size=50"
+
+
+async def wait_until_ready(
+    client: httpx.AsyncClient,
+    timeout: float = 30,
+) -> None:
+    """Wait until the server responds to the health check."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/healthz/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError("Server has not started")
+
+
+async def measure(
+    base_url: str,
+    workers: int,
+    concurrency: int,
+    duration: float,
+) -> float:
+    """Run the server with the workers, report requests per second."""
+    bind = base_url.removeprefix("http://")
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "app.server",
+            "--bind",
+            bind,
+            "--workers",
+            str(workers),
+        ],
+    )
+    try:
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(
+            base_url=base_url,
+            limits=limits,
+            headers={"Cache-Control": "no-cache"},
+        ) as client:
+            await wait_until_ready(client)
+            deadline = time.monotonic() + duration
+            completed = failed = 0
+
+            async def request_until_deadline() -> None:
+                nonlocal completed, failed
+                while time.monotonic() < deadline:
+                    try:
+                        response = await client.get(ROUTE)
+                    except httpx.TransportError:
+                        failed += 1
+                        continue
+                    if response.is_success:
+                        completed += 1
+                    else:
+                        failed += 1
+
+            await asyncio.gather(
+                *(request_until_deadline() for _ in range(concurrency)),
+            )
+    finally:
+        server.terminate()
+        server.wait()
+    per_second = completed / duration
+    print(
+        f"{workers:>3} workers: {per_second:.1f} requests per second, "
+        f"{failed} failed",
+    )
+    return per_second
+
+
+async def main(
+    workers: list[int],
+    rows_count: int,
+    concurrency: int,
+    duration: float,
+    base_url: str,
+) -> None:
+    """Compare throughput of the server with different worker counts."""
+    await InstrumentService().add_many(make_rows(rows_count))
+    try:
+        baseline = None
+        for count in workers:
+            per_second = await measure(base_url, count, concurrency, duration)
+            baseline = baseline or per_second
+            print(f"{'scaling':>11}: x{per_second / baseline:.1f}")
+    finally:
+        await InstrumentService().delete_by_query(
+            exchange_product_name=BENCHMARK_PRODUCT_NAME,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8089")
+    arguments = parser.parse_args()
+    asyncio.run(
+        main(
+            arguments.workers,
+            arguments.rows,
+            arguments.concurrency,
+            arguments.duration,
+            arguments.base_url,
+        ),
+    )
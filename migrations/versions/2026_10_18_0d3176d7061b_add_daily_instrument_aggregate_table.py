@@ -0,0 +1,146 @@
+"""add daily instrument aggregate table
+
+Revision ID: 0d3176d7061b
+Revises: 7dcfaddd1d9c
+Create Date: 2026-10-18 20:03:11.512934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d3176d7061b'
+down_revision: Union[str, Sequence[str], None] = '7dcfaddd1d9c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REFRESH_DAILY_AGGREGATES_FUNCTION = """
+CREATE OR REPLACE FUNCTION refresh_daily_instrument_aggregates()
+RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    touched date[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT date) INTO touched FROM new_rows;
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(DISTINCT date) INTO touched FROM (
+            SELECT date FROM new_rows UNION SELECT date FROM old_rows
+        ) AS changed;
+    ELSE
+        SELECT array_agg(DISTINCT date) INTO touched FROM old_rows;
+    END IF;
+    IF touched IS NULL THEN
+        RETURN NULL;
+    END IF;
+    DELETE FROM dailyinstrumentaggregatedb AS aggregate
+    WHERE aggregate.date = ANY(touched)
+    AND NOT EXISTS (
+        SELECT 1 FROM instrumentdb
+        WHERE instrumentdb.date = aggregate.date
+        AND instrumentdb.oil_id = aggregate.oil_id
+        AND instrumentdb.delivery_type_id = aggregate.delivery_type_id
+        AND instrumentdb.delivery_basis_id = aggregate.delivery_basis_id
+    );
+    INSERT INTO dailyinstrumentaggregatedb (
+        date, oil_id, delivery_type_id, delivery_basis_id,
+        volume, total, count
+    )
+    SELECT
+        date, oil_id, delivery_type_id, delivery_basis_id,
+        sum(volume), sum(total), sum(count)
+    FROM instrumentdb
+    WHERE date = ANY(touched)
+    GROUP BY date, oil_id, delivery_type_id, delivery_basis_id
+    ON CONFLICT (date, oil_id, delivery_type_id, delivery_basis_id)
+    DO UPDATE SET
+        volume = excluded.volume,
+        total = excluded.total,
+        count = excluded.count;
+    RETURN NULL;
+END
+$$
+"""
+INSTRUMENT_TRANSITION_TABLES = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Aggregates are backfilled from the existing instruments,
+    afterward they are refreshed by triggers.
+    """
+    op.create_table(
+        "dailyinstrumentaggregatedb",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("oil_id", sa.String(length=30), nullable=False),
+        sa.Column("delivery_type_id", sa.String(length=30), nullable=False),
+        sa.Column("delivery_basis_id", sa.String(length=30), nullable=False),
+        sa.Column("volume", sa.Float(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("count", sa.Float(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "id",
+            name=op.f("pk_dailyinstrumentaggregatedb"),
+        ),
+        sa.UniqueConstraint(
+            "date",
+            "oil_id",
+            "delivery_type_id",
+            "delivery_basis_id",
+            name="uq_dailyinstrumentaggregatedb_date_instrument",
+        ),
+    )
+    op.create_index(
+        "ix_dailyinstrumentaggregatedb_instrument_date",
+        "dailyinstrumentaggregatedb",
+        ["oil_id", "delivery_type_id", "delivery_basis_id", "date"],
+    )
+    op.execute(
+        sa.text(
+            "INSERT INTO dailyinstrumentaggregatedb ("
+            "date, oil_id, delivery_type_id, delivery_basis_id, "
+            "volume, total, count) "
+            "SELECT date, oil_id, delivery_type_id, delivery_basis_id, "
+            "sum(volume), sum(total), sum(count) "
+            "FROM instrumentdb "
+            "GROUP BY date, oil_id, delivery_type_id, delivery_basis_id",
+        ),
+    )
+    op.execute(sa.text(REFRESH_DAILY_AGGREGATES_FUNCTION))
+    for operation, referencing in INSTRUMENT_TRANSITION_TABLES.items():
+        op.execute(
+            sa.text(
+                "CREATE TRIGGER "
+                f"refresh_daily_instrument_aggregates_{operation.lower()} "
+                f"AFTER {operation} ON instrumentdb {referencing} "
+                "FOR EACH STATEMENT "
+                "EXECUTE FUNCTION refresh_daily_instrument_aggregates()",
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for operation in INSTRUMENT_TRANSITION_TABLES:
+        op.execute(
+            sa.text(
+                "DROP TRIGGER "
+                f"refresh_daily_instrument_aggregates_{operation.lower()} "
+                "ON instrumentdb",
+            ),
+        )
+    op.execute(sa.text("DROP FUNCTION refresh_daily_instrument_aggregates()"))
+    op.drop_index(
+        "ix_dailyinstrumentaggregatedb_instrument_date",
+        table_name="dailyinstrumentaggregatedb",
+    )
+    op.drop_table("dailyinstrumentaggregatedb")
@@ -0,0 +1,152 @@
+"""apply daily instrument aggregate deltas
+
+Revision ID: 3b8e51f0a2c4
+Revises: 0d3176d7061b
+Create Date: 2026-10-18 22:41:07.218406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e51f0a2c4'
+down_revision: Union[str, Sequence[str], None] = '0d3176d7061b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+APPLY_AGGREGATE_DELTAS_FUNCTION = """
+CREATE OR REPLACE FUNCTION refresh_daily_instrument_aggregates()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO dailyinstrumentaggregatedb AS aggregate (
+            date, oil_id, delivery_type_id, delivery_basis_id,
+            volume, total, count
+        )
+        SELECT
+            date, oil_id, delivery_type_id, delivery_basis_id,
+            sum(volume), sum(total), sum(count)
+        FROM new_rows
+        GROUP BY date, oil_id, delivery_type_id, delivery_basis_id
+        ON CONFLICT (date, oil_id, delivery_type_id, delivery_basis_id)
+        DO UPDATE SET
+            volume = aggregate.volume + excluded.volume,
+            total = aggregate.total + excluded.total,
+            count = aggregate.count + excluded.count;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE dailyinstrumentaggregatedb AS aggregate SET
+            volume = aggregate.volume - removed.volume,
+            total = aggregate.total - removed.total,
+            count = aggregate.count - removed.count
+        FROM (
+            SELECT
+                date, oil_id, delivery_type_id, delivery_basis_id,
+                sum(volume) AS volume,
+                sum(total) AS total,
+                sum(count) AS count
+            FROM old_rows
+            GROUP BY date, oil_id, delivery_type_id, delivery_basis_id
+        ) AS removed
+        WHERE aggregate.date = removed.date
+        AND aggregate.oil_id = removed.oil_id
+        AND aggregate.delivery_type_id = removed.delivery_type_id
+        AND aggregate.delivery_basis_id = removed.delivery_basis_id;
+        DELETE FROM dailyinstrumentaggregatedb AS aggregate
+        USING (
+            SELECT DISTINCT date, oil_id, delivery_type_id, delivery_basis_id
+            FROM old_rows
+        ) AS removed
+        WHERE aggregate.date = removed.date
+        AND aggregate.oil_id = removed.oil_id
+        AND aggregate.delivery_type_id = removed.delivery_type_id
+        AND aggregate.delivery_basis_id = removed.delivery_basis_id
+        AND NOT EXISTS (
+            SELECT 1 FROM instrumentdb
+            WHERE instrumentdb.date = aggregate.date
+            AND instrumentdb.oil_id = aggregate.oil_id
+            AND instrumentdb.delivery_type_id = aggregate.delivery_type_id
+            AND instrumentdb.delivery_basis_id = aggregate.delivery_basis_id
+        );
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+RECOMPUTE_TOUCHED_DATES_FUNCTION = """
+CREATE OR REPLACE FUNCTION refresh_daily_instrument_aggregates()
+RETURNS trigger LANGUAGE plpgsql AS $$
+DECLARE
+    touched date[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(DISTINCT date) INTO touched FROM new_rows;
+    ELSIF TG_OP = 'UPDATE' THEN
+        SELECT array_agg(DISTINCT date) INTO touched FROM (
+            SELECT date FROM new_rows UNION SELECT date FROM old_rows
+        ) AS changed;
+    ELSE
+        SELECT array_agg(DISTINCT date) INTO touched FROM old_rows;
+    END IF;
+    IF touched IS NULL THEN
+        RETURN NULL;
+    END IF;
+    DELETE FROM dailyinstrumentaggregatedb AS aggregate
+    WHERE aggregate.date = ANY(touched)
+    AND NOT EXISTS (
+        SELECT 1 FROM instrumentdb
+        WHERE instrumentdb.date = aggregate.date
+        AND instrumentdb.oil_id = aggregate.oil_id
+        AND instrumentdb.delivery_type_id = aggregate.delivery_type_id
+        AND instrumentdb.delivery_basis_id = aggregate.delivery_basis_id
+    );
+    INSERT INTO dailyinstrumentaggregatedb (
+        date, oil_id, delivery_type_id, delivery_basis_id,
+        volume, total, count
+    )
+    SELECT
+        date, oil_id, delivery_type_id, delivery_basis_id,
+        sum(volume), sum(total), sum(count)
+    FROM instrumentdb
+    WHERE date = ANY(touched)
+    GROUP BY date, oil_id, delivery_type_id, delivery_basis_id
+    ON CONFLICT (date, oil_id, delivery_type_id, delivery_basis_id)
+    DO UPDATE SET
+        volume = excluded.volume,
+        total = excluded.total,
+        count = excluded.count;
+    RETURN NULL;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Aggregates are rebuilt from the existing instruments, since
+    concurrent writers could have overwritten each other's sums.
+    """
+    op.execute(sa.text(APPLY_AGGREGATE_DELTAS_FUNCTION))
+    op.execute(sa.text("LOCK TABLE instrumentdb IN SHARE MODE"))
+    op.execute(sa.text("DELETE FROM dailyinstrumentaggregatedb"))
+    op.execute(
+        sa.text(
+            "INSERT INTO dailyinstrumentaggregatedb ("
+            "date, oil_id, delivery_type_id, delivery_basis_id, "
+            "volume, total, count) "
+            "SELECT date, oil_id, delivery_type_id, delivery_basis_id, "
+            "sum(volume), sum(total), sum(count) "
+            "FROM instrumentdb "
+            "GROUP BY date, oil_id, delivery_type_id, delivery_basis_id",
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(sa.text(RECOMPUTE_TOUCHED_DATES_FUNCTION))
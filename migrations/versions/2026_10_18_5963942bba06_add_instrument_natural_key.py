@@ -0,0 +1,50 @@
+"""add instrument natural key
+
+Revision ID: 5963942bba06
+Revises: c77fa2d779be
+Create Date: 2026-10-18 18:06:55.875023
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5963942bba06'
+down_revision: Union[str, Sequence[str], None] = 'c77fa2d779be'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Duplicates left by repeated imports are removed first,
+    keeping the most recently inserted row.
+    """
+    op.execute(
+        sa.text(
+            "DELETE FROM instrumentdb AS older "
+            "USING instrumentdb AS newer "
+            "WHERE older.exchange_product_id = newer.exchange_product_id "
+            "AND older.date = newer.date "
+            "AND older.id < newer.id",
+        ),
+    )
+    op.create_unique_constraint(
+        "uq_instrumentdb_exchange_product_id_date",
+        "instrumentdb",
+        ["exchange_product_id", "date"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        "uq_instrumentdb_exchange_product_id_date",
+        "instrumentdb",
+        type_="unique",
+    )
@@ -0,0 +1,89 @@
+"""add trading day table
+
+Revision ID: 7dcfaddd1d9c
+Revises: 5963942bba06
+Create Date: 2026-10-18 19:12:40.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7dcfaddd1d9c'
+down_revision: Union[str, Sequence[str], None] = '5963942bba06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNC_TRADING_DAYS_FUNCTION = """
+CREATE OR REPLACE FUNCTION sync_trading_days() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO tradingdaydb (date)
+        SELECT DISTINCT date FROM new_rows
+        ON CONFLICT (date) DO NOTHING;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM tradingdaydb AS day
+        USING (SELECT DISTINCT date FROM old_rows) AS changed
+        WHERE day.date = changed.date
+        AND NOT EXISTS (
+            SELECT 1 FROM instrumentdb WHERE instrumentdb.date = day.date
+        );
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+SYNC_TRADING_DAYS_TRIGGERS = {
+    "INSERT": "REFERENCING NEW TABLE AS new_rows",
+    "UPDATE": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Trading days are backfilled from the existing instruments,
+    afterward they are kept in sync by triggers.
+    """
+    op.create_table(
+        "tradingdaydb",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_tradingdaydb")),
+        sa.UniqueConstraint("date", name=op.f("uq_tradingdaydb_date")),
+    )
+    op.execute(
+        sa.text(
+            "INSERT INTO tradingdaydb (date) "
+            "SELECT DISTINCT date FROM instrumentdb ORDER BY date",
+        ),
+    )
+    op.execute(sa.text(SYNC_TRADING_DAYS_FUNCTION))
+    for operation, referencing in SYNC_TRADING_DAYS_TRIGGERS.items():
+        op.execute(
+            sa.text(
+                f"CREATE TRIGGER sync_trading_days_{operation.lower()} "
+                f"AFTER {operation} ON instrumentdb {referencing} "
+                "FOR EACH STATEMENT EXECUTE FUNCTION sync_trading_days()",
+            ),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for operation in SYNC_TRADING_DAYS_TRIGGERS:
+        op.execute(
+            sa.text(
+                f"DROP TRIGGER sync_trading_days_{operation.lower()} "
+                "ON instrumentdb",
+            ),
+        )
+    op.execute(sa.text("DROP FUNCTION sync_trading_days()"))
+    op.drop_table("tradingdaydb")
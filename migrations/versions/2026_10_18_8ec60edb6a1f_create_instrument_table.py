@@ -0,0 +1,52 @@
+"""create instrument table
+
+Revision ID: 8ec60edb6a1f
+Revises: 
+Create Date: 2026-10-18 18:03:23.621378
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8ec60edb6a1f'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "instrumentdb",
+        sa.Column("exchange_product_id", sa.String(length=30), nullable=False),
+        sa.Column(
+            "exchange_product_name",
+            sa.String(length=300),
+            nullable=False,
+        ),
+        sa.Column("oil_id", sa.String(length=30), nullable=False),
+        sa.Column("delivery_basis_id", sa.String(length=30), nullable=False),
+        sa.Column(
+            "delivery_basis_name",
+            sa.String(length=50),
+            nullable=False,
+        ),
+        sa.Column("delivery_type_id", sa.String(length=30), nullable=False),
+        sa.Column("volume", sa.Float(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.Column("count", sa.Float(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("created_on", sa.DateTime(), nullable=False),
+        sa.Column("updated_on", sa.DateTime(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_instrumentdb")),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("instrumentdb")
@@ -0,0 +1,57 @@
+"""add instrument indexes
+
+Revision ID: c77fa2d779be
+Revises: 8ec60edb6a1f
+Create Date: 2026-10-18 18:03:24.225716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c77fa2d779be'
+down_revision: Union[str, Sequence[str], None] = '8ec60edb6a1f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = {
+    "ix_instrumentdb_date_id": ["date", "id"],
+    "ix_instrumentdb_oil_id_delivery_type_id_delivery_basis_id_date": [
+        "oil_id",
+        "delivery_type_id",
+        "delivery_basis_id",
+        "date",
+    ],
+}
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Indexes are built concurrently, so that the table stays writable.
+    """
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name,
+                "instrumentdb",
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(
+                name,
+                table_name="instrumentdb",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
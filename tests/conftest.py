@@ -1,15 +1,21 @@
 import asyncio
 
 from asgi_lifespan import LifespanManager
+from fakeredis import FakeAsyncRedis, FakeServer
+from fastapi_cache import FastAPICache
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
+from redis import asyncio as aioredis
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncSession,
     async_sessionmaker,
 )
 
+from app.cache.invalidation import data_version
+from app.cache.setup import init_cache
+from app.cache.single_flight import single_flight
 from app.core.config import settings
 from app.database.db import get_async_session
 from app.models.base import Base
@@ -39,6 +45,39 @@ async def async_client():
             yield client
 
 
+@pytest.fixture(autouse=True)
+def fake_redis_server(monkeypatch: pytest.MonkeyPatch):
+    """
+    Back every Redis client of the app by in-process fake Redis.
+
+    Clients created from settings, by the app lifespan or by the data
+    version outside the app, share the fake server, so no test reaches
+    Redis at settings.redis_url.
+    """
+    server = FakeServer()
+    monkeypatch.setattr(
+        aioredis,
+        "from_url",
+        lambda url, **kwargs: FakeAsyncRedis(server=server, **kwargs),
+    )
+    for state in (data_version, single_flight):
+        for name, value in vars(state).items():
+            monkeypatch.setattr(state, name, value)
+    init_cache(FakeAsyncRedis(server=server))
+    yield server
+    FastAPICache.reset()
+
+
+@pytest_asyncio.fixture
+async def fake_redis(fake_redis_server, async_client):
+    """Serve response cache from in-process fake Redis."""
+    redis = FakeAsyncRedis(server=fake_redis_server)
+    FastAPICache.reset()
+    init_cache(redis)
+    yield redis
+    FastAPICache.reset()
+
+
 @pytest_asyncio.fixture(scope="session", autouse=True)
 async def init_test_db(get_test_data):
     assert settings.MODE == "TEST"
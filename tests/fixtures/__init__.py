@@ -1,19 +1,28 @@
 """The package contains various data used in tests."""
 
 __all__ = [
+    "collect_statements",
     "FakeBaseService",
     "FakeInstrumentService",
     "FakeUnitOfWork",
     "test_cases",
 ]
 
+from collections.abc import Iterator
+from contextlib import contextmanager
 from types import TracebackType
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database.db import database
 from app.services.instrument import InstrumentService
 from app.models.instrument import InstrumentDB
+from app.models.aggregate import DailyInstrumentAggregateDB
+from app.models.trading_day import TradingDayDB
+from app.repositories.aggregate import DailyInstrumentAggregateRepository
 from app.repositories.instrument import InstrumentRepository
+from app.repositories.trading_day import TradingDayRepository
 from app.services.base import BaseService
 from app.units_of_work.base import UnitOfWork
 from tests.fixtures import test_cases
@@ -30,6 +39,11 @@ class FakeUnitOfWork(UnitOfWork):
 
     async def __aenter__(self) -> None:
         self.instruments = InstrumentRepository(self._session, InstrumentDB)
+        self.trading_days = TradingDayRepository(self._session, TradingDayDB)
+        self.daily_aggregates = DailyInstrumentAggregateRepository(
+            self._session,
+            DailyInstrumentAggregateDB,
+        )
 
     async def __aexit__(
         self,
@@ -52,3 +66,26 @@ class FakeInstrumentService(FakeBaseService, InstrumentService):
     """..."""
 
     base_repository: str = "instruments"
+
+
+@contextmanager
+def collect_statements() -> Iterator[list[str]]:
+    """Collect statements executed by the app engine within the block."""
+    statements: list[str] = []
+
+    def collect_statement(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    event.listen(
+        database.engine.sync_engine,
+        "before_cursor_execute",
+        collect_statement,
+    )
+    try:
+        yield statements
+    finally:
+        event.remove(
+            database.engine.sync_engine,
+            "before_cursor_execute",
+            collect_statement,
+        )
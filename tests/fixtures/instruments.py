@@ -150,4 +150,17 @@ INSTRUMENTS_TEST_DATA = (
 
 @pytest.fixture(scope="session")
 def get_test_data():
-    return [InstrumentDB(**instrument) for instrument in INSTRUMENTS_TEST_DATA]
\ No newline at end of file
+    return [InstrumentDB(**instrument) for instrument in INSTRUMENTS_TEST_DATA]
+
+
+def make_instruments(count: int, product_prefix: str) -> list[dict]:
+    """Build unique instrument rows, ready for bulk insertion."""
+    return [
+        {
+            **INSTRUMENTS_TEST_DATA[0],
+            "exchange_product_id": f"{product_prefix}{number:06d}",
+            "date": datetime(2023, 1, 1).date(),
+            "volume": float(number + 1),
+        }
+        for number in range(count)
+    ]
@@ -1,4 +1,5 @@
 from contextlib import nullcontext as does_not_raise
+from datetime import date
 
 import pytest
 from fastapi import HTTPException
@@ -116,3 +117,267 @@ PARAMS_TEST_TRADING_RESULTS_HANDLER = [
     # positive case with default params
     ("v1/instrument/get_trading_results", {}, 200, does_not_raise()),
 ]
+
+# url, params
+PARAMS_TEST_CACHED_HANDLERS = [
+    ("v1/instrument/get_last_trading_days", {"num_dates": 3}),
+    (
+        "v1/instrument/get_dynamics",
+        {
+            "oil_id": "A10K",
+            "start_date": "2024-02-10",
+            "end_date": "2024-02-20",
+            "size": 5,
+        },
+    ),
+    ("v1/instrument/get_trading_results", {"oil_id": "A10S", "page": 1}),
+]
+
+# url, params, expected_dates
+PARAMS_TEST_CURSOR_HANDLERS = [
+    (
+        "v1/instrument/get_trading_results_by_cursor",
+        {"size": 3},
+        [
+            "2024-02-11",
+            "2024-02-12",
+            "2024-02-13",
+            "2024-02-14",
+            "2024-02-15",
+            "2024-02-16",
+            "2024-02-17",
+            "2024-02-18",
+            "2024-02-19",
+            "2024-02-20",
+        ],
+    ),
+    (
+        "v1/instrument/get_dynamics_by_cursor",
+        {
+            "oil_id": "A10K",
+            "start_date": "2024-02-12",
+            "end_date": "2024-02-20",
+            "size": 2,
+        },
+        ["2024-02-12", "2024-02-16", "2024-02-17", "2024-02-18"],
+    ),
+]
+
+# repository method, kwargs, expected index
+PARAMS_TEST_REPOSITORY_QUERY_PLANS = [
+    ("get_last_trading_days", {"num_days": 5}, "ix_instrumentdb_date_id"),
+    (
+        "get_dynamics",
+        {"start_date": date(2024, 2, 12), "end_date": date(2024, 2, 18)},
+        "ix_instrumentdb_date_id",
+    ),
+    (
+        "get_dynamics",
+        {
+            "start_date": date(2024, 2, 12),
+            "end_date": date(2024, 2, 18),
+            "oil_id": "A10K",
+            "delivery_type_id": "W",
+            "delivery_basis_id": "ZLY",
+        },
+        "ix_instrumentdb_oil_id_delivery_type_id_delivery_basis_id_date",
+    ),
+    (
+        "get_dynamics_by_cursor",
+        {"start_date": date(2024, 2, 12), "end_date": date(2024, 2, 18)},
+        "ix_instrumentdb_date_id",
+    ),
+    (
+        "get_trading_results",
+        {
+            "oil_id": "A10K",
+            "delivery_type_id": "W",
+            "delivery_basis_id": "ZLY",
+        },
+        "ix_instrumentdb_oil_id_delivery_type_id_delivery_basis_id_date",
+    ),
+    (
+        "get_trading_results_by_cursor",
+        {"oil_id": "A10K"},
+        "ix_instrumentdb_oil_id_delivery_type_id_delivery_basis_id_date",
+    ),
+]
+
+# url, params, statements issued by a single computation,
+# including loading of the trading calendar
+PARAMS_TEST_SINGLE_FLIGHT_HANDLERS = [
+    ("v1/instrument/get_last_trading_days", {"num_dates": 4}, 1),
+    (
+        "v1/instrument/get_dynamics",
+        {"start_date": "2024-02-11", "end_date": "2024-02-19"},
+        3,
+    ),
+]
+
+# params, export format, expected media type
+PARAMS_TEST_EXPORT_HANDLER = [
+    (
+        {"start_date": "2024-02-10", "end_date": "2024-02-20"},
+        "ndjson",
+        "application/x-ndjson",
+    ),
+    (
+        {
+            "oil_id": "A10K",
+            "start_date": "2024-02-11",
+            "end_date": "2024-02-17",
+        },
+        "csv",
+        "text/csv; charset=utf-8",
+    ),
+]
+
+# url, params, expected item keys
+PARAMS_TEST_PROJECTION_HANDLERS = [
+    (
+        "v1/instrument/get_dynamics",
+        {
+            "start_date": "2024-02-10",
+            "end_date": "2024-02-20",
+            "fields": "date,oil_id,volume,total",
+        },
+        ["oil_id", "volume", "total", "date"],
+    ),
+    (
+        "v1/instrument/get_dynamics_by_cursor",
+        {
+            "start_date": "2024-02-10",
+            "end_date": "2024-02-20",
+            "fields": "volume",
+            "size": 3,
+        },
+        ["volume"],
+    ),
+    (
+        "v1/instrument/get_trading_results",
+        {"oil_id": "A10K", "fields": ["date", "id"]},
+        ["id", "date"],
+    ),
+    (
+        "v1/instrument/get_trading_results_by_cursor",
+        {"fields": "date, total", "size": 4},
+        ["total", "date"],
+    ),
+]
+
+# params of daily aggregates, matching dynamics
+PARAMS_TEST_AGGREGATES_HANDLER = [
+    {"start_date": "2024-02-10", "end_date": "2024-02-20"},
+    {"oil_id": "A10K", "start_date": "2024-02-11", "end_date": "2024-02-17"},
+    {
+        "oil_id": "A10K",
+        "delivery_basis_id": "ZLY",
+        "start_date": "2024-02-12",
+        "end_date": "2024-02-20",
+    },
+]
+
+# params of price time series
+PARAMS_TEST_PRICE_SERIES_HANDLER = [
+    {"start_date": "2024-02-10", "end_date": "2024-02-20", "period": "day"},
+    {"start_date": "2024-02-10", "end_date": "2024-02-20", "period": "week"},
+    {
+        "oil_id": "A10K",
+        "start_date": "2024-02-01",
+        "end_date": "2024-02-29",
+        "period": "month",
+    },
+    {
+        "exchange_product_id": "A10KZLY060W",
+        "start_date": "2024-02-12",
+        "end_date": "2024-02-18",
+    },
+]
+
+PARAMS_TEST_HOT_STORE = [
+    # in-window period
+    (
+        3,
+        "v1/instrument/get_dynamics",
+        {"start_date": "2024-02-18", "end_date": "2024-02-25"},
+        True,
+    ),
+    # in-window period, matched by filters and projected on fields
+    (
+        3,
+        "v1/instrument/get_dynamics",
+        {
+            "oil_id": "A10A",
+            "start_date": "2024-02-18",
+            "end_date": "2024-02-20",
+            "fields": "id,date,volume",
+        },
+        True,
+    ),
+    # in-window period, filter value not in the window
+    (
+        3,
+        "v1/instrument/get_dynamics",
+        {
+            "oil_id": "A10X",
+            "start_date": "2024-02-18",
+            "end_date": "2024-02-20",
+        },
+        True,
+    ),
+    # period starts before the window
+    (
+        3,
+        "v1/instrument/get_dynamics",
+        {"start_date": "2024-02-12", "end_date": "2024-02-20"},
+        False,
+    ),
+    # window does not hold all trading days
+    (
+        3,
+        "v1/instrument/get_trading_results",
+        {"oil_id": "A10K"},
+        False,
+    ),
+    # window holds all trading days
+    (
+        30,
+        "v1/instrument/get_trading_results",
+        {"oil_id": "A10K", "fields": "id,oil_id"},
+        True,
+    ),
+    # later page, rows ordered the same way as in the database
+    (
+        30,
+        "v1/instrument/get_trading_results",
+        {"page": 2, "size": 3},
+        True,
+    ),
+    # exact total requested
+    (
+        3,
+        "v1/instrument/get_dynamics",
+        {
+            "start_date": "2024-02-18",
+            "end_date": "2024-02-25",
+            "exact_total": True,
+        },
+        False,
+    ),
+]
+
+PARAMS_TEST_COUNTED_HANDLERS = [
+    (
+        "v1/instrument/get_dynamics",
+        {"start_date": "2024-02-10", "end_date": "2024-02-20"},
+    ),
+    ("v1/instrument/get_trading_results", {"oil_id": "A10K"}),
+    (
+        "v1/instrument/get_price_series",
+        {"start_date": "2024-02-10", "end_date": "2024-02-20"},
+    ),
+    (
+        "v1/instrument/aggregates",
+        {"start_date": "2024-02-10", "end_date": "2024-02-20"},
+    ),
+]
@@ -0,0 +1,46 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.database.db import create_engine
+
+
+class TestHealthCheck:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_health_check_reports_pool(
+        async_client: AsyncClient,
+    ) -> None:
+        await async_client.get(
+            "v1/instrument/get_trading_results",
+            headers={"Cache-Control": "no-cache"},
+        )
+        response = await async_client.get("healthz/")
+        assert response.status_code == 200
+        pool = response.json()["pool"]
+        assert pool["size"] == settings.db_pool_size
+        assert pool["checked_in"] >= 1
+        assert pool["checked_out"] == 0
+        assert pool["waits"] >= 1
+        assert pool["wait_seconds_max"] >= 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_pool_configured_by_settings(
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(settings, "db_pool_size", 1)
+        monkeypatch.setattr(settings, "db_max_overflow", 0)
+        monkeypatch.setattr(settings, "db_pool_timeout", 0.1)
+        engine = create_engine(settings.postgres_db_url)
+        try:
+            async with engine.connect():
+                with pytest.raises(PoolTimeoutError):
+                    async with engine.connect():
+                        pass
+            status = engine.sync_engine.pool.status()
+            assert status["timeouts"] == 1
+            assert status["wait_seconds_max"] >= 0.1
+        finally:
+            await engine.dispose()
@@ -0,0 +1,65 @@
+import pytest
+from httpx import AsyncClient
+
+from app.observability.metrics import Counter, Histogram, format_sample
+from tests.fixtures import test_cases
+
+
+class TestMetrics:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_metrics_exposed(
+        async_client: AsyncClient,
+        fake_redis,
+    ) -> None:
+        url, params = test_cases.PARAMS_TEST_CACHED_HANDLERS[1]
+        for _ in range(2):
+            assert (await async_client.get(url, params=params)).is_success
+
+        response = await async_client.get("metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        samples = dict(
+            line.rsplit(" ", 1)
+            for line in response.text.splitlines()
+            if not line.startswith("#")
+        )
+        route = f"/v1/{url.removeprefix('v1/')}"
+        assert float(
+            samples[
+                "http_request_duration_seconds_count"
+                f'{{method="GET",route="{route}",status="200"}}'
+            ],
+        ) >= 2
+        assert samples[f'cache_responses_total{{route="{route}",cache="hit"}}']
+        assert float(
+            samples[
+                "db_query_duration_seconds_count"
+                '{engine="primary",operation="SELECT"}'
+            ],
+        ) >= 1
+        assert samples['db_pool_checked_out{engine="primary"}'] == "0"
+        assert 'cache_hit_ratio{tier="l1"}' in samples
+
+    @staticmethod
+    def test_histogram_buckets_cumulative() -> None:
+        histogram = Histogram("latency", "Latency", ("route",), (0.1, 1))
+        for value in (0.05, 0.5, 0.5, 5):
+            histogram.observe(value, route="/")
+        assert list(histogram.collect())[2:] == [
+            'latency_bucket{route="/",le="0.1"} 1',
+            'latency_bucket{route="/",le="1"} 3',
+            'latency_bucket{route="/",le="+Inf"} 4',
+            'latency_count{route="/"} 4',
+            'latency_sum{route="/"} 6.05',
+        ]
+
+    @staticmethod
+    def test_large_counter_rendered_exactly() -> None:
+        counter = Counter("requests_total", "Requests")
+        counter.inc(1234567)
+        counter.inc(0.5)
+        assert list(counter.collect())[2:] == ["requests_total 1234567.5"]
+        assert format_sample("x", {}, 1234567) == "x 1234567"
+        assert format_sample("x", {}, 2**53 + 1) == f"x {2**53 + 1}"
+        assert format_sample("x", {}, float("inf")) == "x +Inf"
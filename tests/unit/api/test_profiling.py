@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.observability.profiling import (
+    child_task_factory,
+    sample_task,
+    store_profile,
+)
+from tests.fixtures import test_cases
+
+PROFILE_SECRET = "PROFILE_SECRET"
+
+
+@pytest.fixture
+def profiling(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """Enable profiling with a non-default secret into a temporary dir."""
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    monkeypatch.setattr(settings, "secret", PROFILE_SECRET)
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    return tmp_path
+
+
+def profiled_headers(secret: str = PROFILE_SECRET) -> dict[str, str]:
+    """Headers requesting the profile of uncached response."""
+    return {
+        "Cache-Control": "no-cache",
+        "X-Profile": "1",
+        "X-Profile-Secret": secret,
+    }
+
+
+class TestProfiling:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_profiled_with_secret(
+        async_client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+        profiling: Path,
+    ) -> None:
+        monkeypatch.setattr(settings, "profile_interval", 0.0002)
+        url, params, *_ = test_cases.PARAMS_TEST_DYNAMICS_HANDLER[0]
+        response = await async_client.get(
+            url,
+            params=params,
+            headers=profiled_headers(),
+        )
+        assert response.status_code == 200
+        path = Path(response.headers["x-profile-path"])
+        assert path.parent == profiling
+        profile = json.loads(path.read_text())
+        frames = [frame["name"] for frame in profile["shared"]["frames"]]
+        assert "InstrumentService.get_dynamics" in frames
+        sampled = profile["profiles"][0]
+        assert sampled["type"] == "sampled"
+        assert len(sampled["samples"]) == len(sampled["weights"]) > 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("secret", ["", "WRONG_SECRET"])
+    async def test_request_not_profiled_without_secret(
+        async_client: AsyncClient,
+        profiling: Path,
+        secret: str,
+    ) -> None:
+        url, params, *_ = test_cases.PARAMS_TEST_DYNAMICS_HANDLER[0]
+        response = await async_client.get(
+            url,
+            params=params,
+            headers=profiled_headers(secret),
+        )
+        assert response.status_code == 200
+        assert "x-profile-path" not in response.headers
+        assert not list(profiling.iterdir())
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("setting", "value"),
+        [
+            ("profiling_enabled", False),
+            ("secret", settings.model_fields["secret"].default),
+        ],
+    )
+    async def test_request_not_profiled_unless_enabled_and_secret_set(
+        async_client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+        profiling: Path,
+        setting: str,
+        value: object,
+    ) -> None:
+        monkeypatch.setattr(settings, setting, value)
+        url, params, *_ = test_cases.PARAMS_TEST_DYNAMICS_HANDLER[0]
+        response = await async_client.get(
+            url,
+            params=params,
+            headers=profiled_headers(settings.secret),
+        )
+        assert response.status_code == 200
+        assert "x-profile-path" not in response.headers
+        assert not list(profiling.iterdir())
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_not_profiled_above_concurrency_limit(
+        async_client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+        profiling: Path,
+    ) -> None:
+        monkeypatch.setattr(
+            child_task_factory,
+            "profiled",
+            settings.profile_max_concurrent,
+        )
+        url, params, *_ = test_cases.PARAMS_TEST_DYNAMICS_HANDLER[0]
+        response = await async_client.get(
+            url,
+            params=params,
+            headers=profiled_headers(),
+        )
+        assert response.status_code == 200
+        assert "x-profile-path" not in response.headers
+        assert not list(profiling.iterdir())
+
+    @staticmethod
+    def test_oldest_profiles_removed(
+        monkeypatch: pytest.MonkeyPatch,
+        tmp_path: Path,
+    ) -> None:
+        monkeypatch.setattr(settings, "profile_max_files", 2)
+        for age, name in enumerate(["newer", "older"], start=1):
+            path = tmp_path / f"{name}.speedscope.json"
+            path.write_text("{}")
+            os.utime(path, (1000 - age, 1000 - age))
+        store_profile(tmp_path / "new.speedscope.json", {})
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "new.speedscope.json",
+            "newer.speedscope.json",
+        ]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_suspended_task_sampled_with_awaiting_callers() -> None:
+        event = asyncio.Event()
+
+        async def repository() -> None:
+            await event.wait()
+
+        async def service() -> None:
+            await repository()
+
+        task = asyncio.create_task(service())
+        await asyncio.sleep(0)
+        stack = sample_task(task, threading.get_ident())
+        event.set()
+        await task
+        names = [frame.f_code.co_qualname for frame in stack]
+        assert names[0].endswith("service")
+        assert names[1].endswith("repository")
+        assert names[2] == "Event.wait"
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import logging
+
+import pytest
+from httpx import AsyncClient
+
+from app.database.db import database
+from app.observability import slow_queries
+from app.observability.slow_queries import RateLimiter, SlowQueryLog
+from tests.fixtures import test_cases
+
+
+class TestSlowQueryLog:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_slow_query_logged_with_plan(
+        async_client: AsyncClient,
+        caplog: pytest.LogCaptureFixture,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(slow_queries, "limiter", RateLimiter(100, 60))
+        log = SlowQueryLog(database.engine, "primary", 0, 1)
+        log.install()
+        url, params, *_ = test_cases.PARAMS_TEST_DYNAMICS_HANDLER[0]
+        try:
+            with caplog.at_level(logging.WARNING, slow_queries.__name__):
+                response = await async_client.get(
+                    url,
+                    params=params,
+                    headers={"Cache-Control": "no-cache"},
+                )
+                assert response.status_code == 200
+                await asyncio.gather(*log._explains)
+        finally:
+            log.uninstall()
+        records = [
+            json.loads(record.getMessage())
+            for record in caplog.records
+            if record.name == slow_queries.__name__
+        ]
+        dynamics = [
+            record
+            for record in records
+            if record["repository_method"]
+            == "InstrumentRepository.get_dynamics"
+        ]
+        assert dynamics
+        assert params["oil_id"] in dynamics[0]["parameters"]
+        assert all(record["engine"] == "primary" for record in records)
+        assert any(
+            "Buffers" in record["plan"] or "actual time" in record["plan"]
+            for record in dynamics
+        )
+        assert not any(
+            record["statement"].startswith("EXPLAIN") for record in records
+        )
+
+    @staticmethod
+    def test_rate_limiter_counts_suppressed() -> None:
+        limiter = RateLimiter(2, 60)
+        assert [limiter.allow() for _ in range(5)] == [
+            True,
+            True,
+            False,
+            False,
+            False,
+        ]
+        assert limiter.take_suppressed() == 3
+        assert limiter.take_suppressed() == 0
@@ -0,0 +1,136 @@
+import json
+from pathlib import Path
+
+import pytest
+from fastapi_cache import FastAPICache
+from httpx import AsyncClient
+from sqlalchemy.exc import InvalidRequestError
+
+from app.cache.setup import init_cache
+from app.core.config import settings
+from app.observability.tracing import (
+    STATUS_ERROR,
+    JsonFileExporter,
+    tracer,
+)
+from app.units_of_work.base import UnitOfWork
+from tests.fixtures import test_cases
+
+
+@pytest.fixture
+def exported_spans(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Export spans into a temporary file, reading them on demand."""
+    exporter = JsonFileExporter(str(tmp_path / "traces.jsonl"))
+    monkeypatch.setattr(tracer, "exporter", exporter)
+
+    def read_spans() -> list[dict]:
+        exporter.shutdown()
+        spans = []
+        for line in exporter.path.read_text().splitlines():
+            for resource_spans in json.loads(line)["resourceSpans"]:
+                for scope_spans in resource_spans["scopeSpans"]:
+                    spans.extend(scope_spans["spans"])
+        return spans
+
+    return read_spans
+
+
+class TestTracing:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_request_traced_across_layers(
+        async_client: AsyncClient,
+        fake_redis,
+        exported_spans,
+    ) -> None:
+        url, params = test_cases.PARAMS_TEST_CACHED_HANDLERS[1]
+        response = await async_client.get(url, params=params)
+        assert response.status_code == 200
+
+        spans = exported_spans()
+        by_name = {span["name"]: span for span in spans}
+        by_id = {span["spanId"]: span for span in spans}
+        root = by_name["GET /v1/instrument/get_dynamics"]
+        assert "parentSpanId" not in root
+        assert {span["traceId"] for span in spans} == {root["traceId"]}
+        for name in (
+            "atomic InstrumentService.get_dynamics",
+            "UnitOfWork.__aenter__",
+            "UnitOfWork.__aexit__",
+            "InstrumentRepository.get_dynamics",
+            "cache get",
+            "cache set",
+        ):
+            assert name in by_name
+        repository = by_name["InstrumentRepository.get_dynamics"]
+        ancestors = []
+        while "parentSpanId" in repository:
+            repository = by_id[repository["parentSpanId"]]
+            ancestors.append(repository["name"])
+        assert ancestors[0] == "atomic InstrumentService.get_dynamics"
+        assert ancestors[-1] == root["name"]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("local_maxsize", "tier"),
+        [(0, None), (settings.cache_local_maxsize, "miss")],
+    )
+    async def test_cache_lookups_traced(
+        local_maxsize: int,
+        tier: str | None,
+        async_client: AsyncClient,
+        fake_redis,
+        exported_spans,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(settings, "cache_local_maxsize", local_maxsize)
+        FastAPICache.reset()
+        init_cache(fake_redis)
+        url, params = test_cases.PARAMS_TEST_CACHED_HANDLERS[1]
+        response = await async_client.get(url, params=params)
+        assert response.status_code == 200
+
+        by_name = {span["name"]: span for span in exported_spans()}
+        attributes = {
+            attribute["key"]: attribute["value"]
+            for attribute in by_name["cache get"]["attributes"]
+        }
+        assert attributes["cache.hit"] == {"boolValue": False}
+        if tier is None:
+            assert "cache.tier" not in attributes
+        else:
+            assert attributes["cache.tier"] == {"stringValue": tier}
+        assert "cache set" in by_name
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_commit_and_rollback_traced(exported_spans) -> None:
+        async with UnitOfWork():
+            pass
+        with pytest.raises(ValueError):
+            async with UnitOfWork():
+                raise ValueError
+
+        spans = exported_spans()
+        names = [span["name"] for span in spans]
+        assert names.count("UnitOfWork.commit") == 1
+        assert names.count("UnitOfWork.rollback") == 1
+        assert names.count("UnitOfWork.__aexit__") == 2
+        assert all(span["status"]["code"] != STATUS_ERROR for span in spans)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_failed_span_marked(exported_spans) -> None:
+        uow = UnitOfWork()
+        with pytest.raises(InvalidRequestError):
+            async with uow:
+                await uow.instruments.get_by_query_all(missing_column=1)
+
+        spans = exported_spans()
+        failed = [
+            span for span in spans if span["status"]["code"] == STATUS_ERROR
+        ]
+        assert [span["name"] for span in failed] == [
+            "InstrumentRepository.get_by_query_all",
+        ]
@@ -0,0 +1,57 @@
+from collections import defaultdict
+
+import pytest
+from httpx import AsyncClient
+
+from tests.fixtures import test_cases
+
+GROUP_KEYS = ("date", "oil_id", "delivery_type_id", "delivery_basis_id")
+SUM_KEYS = ("volume", "total", "count")
+
+
+class TestDailyAggregatesHandler:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "params",
+        test_cases.PARAMS_TEST_AGGREGATES_HANDLER,
+    )
+    async def test_aggregates_match_dynamics(
+        params: dict,
+        async_client: AsyncClient,
+    ) -> None:
+        dynamics = await async_client.get(
+            "v1/instrument/get_dynamics",
+            params={**params, "size": 100},
+        )
+        expected: dict[tuple, dict[str, float]] = defaultdict(
+            lambda: dict.fromkeys(SUM_KEYS, 0.0),
+        )
+        for item in dynamics.json()["items"]:
+            sums = expected[tuple(item[key] for key in GROUP_KEYS)]
+            for key in SUM_KEYS:
+                sums[key] += item[key]
+
+        response = await async_client.get(
+            "v1/instrument/aggregates",
+            params=params,
+        )
+        assert response.status_code == 200
+        page = response.json()
+        assert page["total"] == len(expected)
+        assert {
+            tuple(item[key] for key in GROUP_KEYS): {
+                key: item[key] for key in SUM_KEYS
+            }
+            for item in page["items"]
+        } == expected
+        assert expected
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_aggregates_invalid_dates(async_client: AsyncClient) -> None:
+        response = await async_client.get(
+            "v1/instrument/aggregates",
+            params={"start_date": "2024-02-12", "end_date": "2024-02-11"},
+        )
+        assert response.status_code == 422
@@ -0,0 +1,369 @@
+import asyncio
+import time
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+from fastapi_cache import FastAPICache
+from httpx import AsyncClient
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import event
+
+from app.cache.backends import LRUCache, get_two_tier_backend
+from app.cache.invalidation import CACHE_PREFIX, DataVersion, data_version
+from app.cache.single_flight import single_flight
+from app.cache.stale import _refreshing
+from app.core.config import settings
+from app.services.trading_calendar import trading_calendar
+from app.database.db import database
+from app.services.instrument import InstrumentService
+from tests.fixtures import test_cases
+from tests.fixtures.instruments import INSTRUMENTS_TEST_DATA
+
+
+class TestCachedHandlers:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("url", "params"),
+        test_cases.PARAMS_TEST_CACHED_HANDLERS,
+    )
+    async def test_repeated_request_served_from_cache(
+        url: str,
+        params: dict,
+        async_client: AsyncClient,
+        fake_redis: FakeAsyncRedis,
+    ) -> None:
+        statements: list[str] = []
+
+        def count_statement(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        response = await async_client.get(
+            url,
+            params=params,
+            headers={"Cache-Control": "no-cache"},
+        )
+        assert response.status_code == 200
+        assert response.headers["X-FastAPI-Cache"] == "MISS"
+
+        event.listen(
+            database.engine.sync_engine,
+            "before_cursor_execute",
+            count_statement,
+        )
+        try:
+            cached_response = await async_client.get(
+                url,
+                params=dict(reversed(params.items())),
+            )
+        finally:
+            event.remove(
+                database.engine.sync_engine,
+                "before_cursor_execute",
+                count_statement,
+            )
+        assert cached_response.status_code == 200
+        assert cached_response.headers["X-FastAPI-Cache"] == "HIT"
+        assert cached_response.json() == response.json()
+        assert statements == []
+
+
+class TestCacheInvalidation:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_write_invalidates_cached_response(
+        async_client: AsyncClient,
+        fake_redis: FakeAsyncRedis,
+    ) -> None:
+        await fake_redis.set("foreign:key", "value")
+        url, params = test_cases.PARAMS_TEST_CACHED_HANDLERS[1]
+
+        response = await async_client.get(url, params=params)
+        assert response.headers["X-FastAPI-Cache"] == "MISS"
+        response = await async_client.get(url, params=params)
+        assert response.headers["X-FastAPI-Cache"] == "HIT"
+
+        await InstrumentService().delete_by_query(exchange_product_id="NONE")
+
+        response = await async_client.get(url, params=params)
+        assert response.headers["X-FastAPI-Cache"] == "MISS"
+        assert await fake_redis.get("foreign:key") == b"value"
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_unchanged_upsert_keeps_cached_response(
+        async_client: AsyncClient,
+        fake_redis: FakeAsyncRedis,
+    ) -> None:
+        url, params = test_cases.PARAMS_TEST_CACHED_HANDLERS[0]
+
+        response = await async_client.get(url, params=params)
+        assert response.headers["X-FastAPI-Cache"] == "MISS"
+
+        assert await InstrumentService().upsert_many(
+            INSTRUMENTS_TEST_DATA,
+        ) == 0
+
+        response = await async_client.get(url, params=params)
+        assert response.headers["X-FastAPI-Cache"] == "HIT"
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_write_outside_app_bumps_version(
+        fake_redis_server: FakeServer,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(data_version, "redis", None)
+        redis = FakeAsyncRedis(server=fake_redis_server)
+        key = f"{CACHE_PREFIX}:data_version"
+
+        await InstrumentService().delete_by_query(exchange_product_id="NONE")
+
+        assert data_version.redis is not None
+        assert int(await redis.get(key)) == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_failed_bump_raised(
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        broken = Redis(port=1)
+        monkeypatch.setattr(data_version, "redis", broken)
+        monkeypatch.setattr(settings, "cache_invalidation_retry_interval", 0)
+        with pytest.raises(RedisError):
+            await InstrumentService().delete_by_query(
+                exchange_product_id="NONE",
+            )
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_bump_shares_greatest_write_position() -> None:
+        redis = FakeAsyncRedis()
+        first, second = DataVersion(), DataVersion()
+        first.init(redis, "test")
+        second.init(redis, "test")
+
+        first.observe_write(200)
+        await first.bump()
+        second.observe_write(100)
+        version = await second.bump()
+
+        assert version == 2
+        assert await second.get_lsn() == 200
+        reader = DataVersion()
+        reader.init(redis, "test")
+        assert await reader.get() == 2
+        assert await reader.get_lsn() == 200
+
+
+class TestSingleFlight:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("redis_lock", [False, True])
+    @pytest.mark.parametrize(
+        ("url", "params", "expected_statements"),
+        test_cases.PARAMS_TEST_SINGLE_FLIGHT_HANDLERS,
+    )
+    async def test_concurrent_misses_coalesced(
+        url: str,
+        params: dict,
+        expected_statements: int,
+        redis_lock: bool,
+        async_client: AsyncClient,
+        fake_redis: FakeAsyncRedis,
+    ) -> None:
+        single_flight.init(fake_redis if redis_lock else None)
+        trading_calendar.invalidate()
+        statements: list[str] = []
+
+        def count_statement(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(
+            database.engine.sync_engine,
+            "before_cursor_execute",
+            count_statement,
+        )
+        try:
+            responses = await asyncio.gather(
+                *(async_client.get(url, params=params) for _ in range(10)),
+            )
+        finally:
+            event.remove(
+                database.engine.sync_engine,
+                "before_cursor_execute",
+                count_statement,
+            )
+            single_flight.init(None)
+        assert all(response.status_code == 200 for response in responses)
+        assert len({response.text for response in responses}) == 1
+        assert len(statements) == expected_statements
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_waits_for_other_worker(
+        fake_redis: FakeAsyncRedis,
+    ) -> None:
+        single_flight.init(fake_redis)
+        key = "fastapi-cache::other-worker"
+        lock = fake_redis.lock(f"{key}:lock", timeout=5)
+        assert await lock.acquire(blocking=False)
+
+        async def other_worker() -> None:
+            await asyncio.sleep(0.1)
+            await fake_redis.set(key, b'[{"date": "2024-02-20"}]')
+            await lock.release()
+
+        async def compute() -> None:
+            raise AssertionError("Value must be taken from cache")
+
+        try:
+            _, result = await asyncio.gather(
+                other_worker(),
+                single_flight.do(key, compute, list[dict]),
+            )
+        finally:
+            single_flight.init(None)
+        assert result == [{"date": "2024-02-20"}]
+
+
+class TestStaleWhileRevalidate:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_and_refreshed(
+        async_client: AsyncClient,
+        fake_redis: FakeAsyncRedis,
+    ) -> None:
+        url, params = test_cases.PARAMS_TEST_CACHED_HANDLERS[0]
+        grace = settings.cache_stale_grace["get_last_trading_days"]
+
+        response = await async_client.get(url, params=params)
+        assert response.headers["X-FastAPI-Cache"] == "MISS"
+        [key] = await fake_redis.keys("*get_last_trading_days*")
+        await fake_redis.expire(key, grace // 2)
+        get_two_tier_backend().local.pop(key.decode())
+
+        stale_response = await async_client.get(url, params=params)
+        assert stale_response.headers["X-FastAPI-Cache"] == "STALE"
+        assert stale_response.headers["Cache-Control"] == "max-age=0"
+        assert stale_response.json() == response.json()
+        not_modified = await async_client.get(
+            url,
+            params=params,
+            headers={"If-None-Match": stale_response.headers["ETag"]},
+        )
+        assert not_modified.status_code == 304
+
+        await asyncio.gather(*_refreshing.values())
+        assert await fake_redis.ttl(key) > grace
+        response = await async_client.get(url, params=params)
+        assert response.headers["X-FastAPI-Cache"] == "HIT"
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_fresh_entry_looked_up_once(
+        async_client: AsyncClient,
+        fake_redis: FakeAsyncRedis,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        url, params = test_cases.PARAMS_TEST_CACHED_HANDLERS[0]
+        response = await async_client.get(url, params=params)
+        backend = FastAPICache.get_backend()
+        lookups: list[str] = []
+        get_with_ttl = backend.get_with_ttl
+
+        async def count_lookup(key: str):
+            lookups.append(key)
+            return await get_with_ttl(key)
+
+        monkeypatch.setattr(backend, "get_with_ttl", count_lookup)
+        hit = await async_client.get(url, params=params)
+        assert hit.headers["X-FastAPI-Cache"] == "HIT"
+        assert hit.json() == response.json()
+        assert len(lookups) == 1
+        max_age = int(hit.headers["Cache-Control"].removeprefix("max-age="))
+        assert max_age <= settings.cache_expire
+
+        not_modified = await async_client.get(
+            url,
+            params=params,
+            headers={"If-None-Match": hit.headers["ETag"]},
+        )
+        assert not_modified.status_code == 304
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_route_without_grace(
+        async_client: AsyncClient,
+        fake_redis: FakeAsyncRedis,
+    ) -> None:
+        url, params = test_cases.PARAMS_TEST_CACHED_HANDLERS[1]
+
+        response = await async_client.get(url, params=params)
+        assert response.headers["X-FastAPI-Cache"] == "MISS"
+        [key] = await fake_redis.keys("*get_dynamics*")
+        await fake_redis.expire(key, 1)
+        get_two_tier_backend().local.pop(key.decode())
+
+        response = await async_client.get(url, params=params)
+        assert response.headers["X-FastAPI-Cache"] == "HIT"
+        assert not _refreshing
+
+
+class TestTwoTierCache:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("url", "params"),
+        test_cases.PARAMS_TEST_CACHED_HANDLERS,
+    )
+    async def test_hot_entry_served_in_process(
+        url: str,
+        params: dict,
+        async_client: AsyncClient,
+        fake_redis: FakeAsyncRedis,
+    ) -> None:
+        backend = get_two_tier_backend()
+        response = await async_client.get(url, params=params)
+        assert response.headers["X-FastAPI-Cache"] == "MISS"
+        await fake_redis.flushdb()
+
+        response = await async_client.get(url, params=params)
+        assert response.headers["X-FastAPI-Cache"] == "HIT"
+        assert backend.stats["l1_hit"] >= 1
+        assert backend.stats["l2_hit"] == 0
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_write_invalidates_in_process_entries(
+        async_client: AsyncClient,
+        fake_redis: FakeAsyncRedis,
+    ) -> None:
+        url, params = test_cases.PARAMS_TEST_CACHED_HANDLERS[0]
+        await async_client.get(url, params=params)
+
+        await InstrumentService().delete_by_query(exchange_product_id="NONE")
+        response = await async_client.get(url, params=params)
+        assert response.headers["X-FastAPI-Cache"] == "MISS"
+
+    @staticmethod
+    def test_lru_eviction() -> None:
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set("a", b"a", 100)
+        cache.set("b", b"b", None)
+        cache.get_with_ttl("a")
+        cache.set("c", b"c", 100)
+        assert cache.get_with_ttl("a")[1] == b"a"
+        assert cache.get_with_ttl("b") == (0, None)
+        assert cache.get_with_ttl("c")[1] == b"c"
+
+    @staticmethod
+    def test_lru_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+        cache = LRUCache(maxsize=2, ttl=5)
+        cache.set("a", b"a", 100)
+        cache.set("b", b"b", 2)
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now + 3)
+        assert cache.get_with_ttl("a")[1] == b"a"
+        assert cache.get_with_ttl("b") == (0, None)
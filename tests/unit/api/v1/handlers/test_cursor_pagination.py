@@ -0,0 +1,41 @@
+import pytest
+from httpx import AsyncClient
+
+from tests.fixtures import test_cases
+
+
+class TestCursorPaginatedHandlers:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("url", "params", "expected_dates"),
+        test_cases.PARAMS_TEST_CURSOR_HANDLERS,
+    )
+    async def test_walk_all_pages(
+        url: str,
+        params: dict,
+        expected_dates: list[str],
+        async_client: AsyncClient,
+    ) -> None:
+        dates: list[str] = []
+        params = params.copy()
+        while True:
+            response = await async_client.get(url, params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page["items"]) <= params["size"]
+            dates.extend(item["date"] for item in page["items"])
+            if page["next_cursor"] is None:
+                break
+            params["cursor"] = page["next_cursor"]
+        assert dates == expected_dates
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(async_client: AsyncClient) -> None:
+        response = await async_client.get(
+            "v1/instrument/get_trading_results_by_cursor",
+            params={"cursor": "Zm9vYmFy"},
+        )
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Invalid cursor value"}
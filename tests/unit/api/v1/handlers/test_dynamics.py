@@ -3,6 +3,7 @@ from typing import Any
 import pytest
 from httpx import AsyncClient
 
+from app.core.config import settings
 from tests.fixtures import test_cases
 
 
@@ -22,3 +23,22 @@ class TestDynamicsHandler:
     ) -> None:
         response = await async_client.get(url, params=params)
         assert response.status_code == expected_status_code
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_dynamics_validated_rows_match_trusted(
+        async_client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        url, params, *_ = test_cases.PARAMS_TEST_DYNAMICS_HANDLER[0]
+        headers = {"Cache-Control": "no-cache"}
+        trusted = await async_client.get(url, params=params, headers=headers)
+        monkeypatch.setattr(settings, "validate_db_rows", True)
+        validated = await async_client.get(
+            url,
+            params=params,
+            headers=headers,
+        )
+        assert trusted.status_code == validated.status_code == 200
+        assert trusted.json()["items"]
+        assert trusted.json() == validated.json()
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.schemas.instrument import InstrumentOut
+from tests.fixtures import test_cases
+
+
+class TestExportHandler:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("params", "export_format", "media_type"),
+        test_cases.PARAMS_TEST_EXPORT_HANDLER,
+    )
+    async def test_export_matches_dynamics(
+        params: dict,
+        export_format: str,
+        media_type: str,
+        async_client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(settings, "export_chunk_size", 2)
+        dynamics = await async_client.get(
+            "v1/instrument/get_dynamics",
+            params={**params, "size": 100},
+            headers={"Cache-Control": "no-cache"},
+        )
+        expected = sorted(
+            dynamics.json()["items"],
+            key=lambda item: (item["date"], item["id"]),
+        )
+
+        response = await async_client.get(
+            "v1/instrument/export",
+            params={**params, "format": export_format},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == media_type
+        if export_format == "csv":
+            rows = list(csv.DictReader(io.StringIO(response.text)))
+            assert list(rows[0]) == list(InstrumentOut.model_fields)
+            assert [int(row["id"]) for row in rows] == [
+                item["id"] for item in expected
+            ]
+        else:
+            rows = [json.loads(line) for line in response.text.splitlines()]
+            assert rows == expected
+        assert expected
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_export_invalid_format(async_client: AsyncClient) -> None:
+        response = await async_client.get(
+            "v1/instrument/export",
+            params={
+                "start_date": "2024-02-10",
+                "end_date": "2024-02-20",
+                "format": "xml",
+            },
+        )
+        assert response.status_code == 422
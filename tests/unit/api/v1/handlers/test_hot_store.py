@@ -0,0 +1,107 @@
+import pytest
+from httpx import AsyncClient
+
+from app.cache.invalidation import data_version
+from app.core.config import settings
+from app.services.hot_store import hot_store
+from app.services.instrument import InstrumentService
+from app.services.trading_calendar import trading_calendar
+from tests.fixtures import collect_statements, test_cases
+from tests.fixtures.instruments import INSTRUMENTS_TEST_DATA
+
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+
+@pytest.fixture
+async def hot_window(fake_redis, monkeypatch: pytest.MonkeyPatch):
+    """Load the hot store with last trading days."""
+
+    async def load(days: int) -> None:
+        monkeypatch.setattr(settings, "hot_store_days", days)
+        trading_calendar.invalidate()
+        await InstrumentService().refresh_hot_store()
+
+    yield load
+    if hot_store.refreshing is not None:
+        await hot_store.refreshing
+    hot_store.invalidate()
+    trading_calendar.invalidate()
+
+
+async def get_counting_statements(
+    async_client: AsyncClient,
+    url: str,
+    params: dict,
+) -> tuple[dict, list[str]]:
+    """Get response, collecting statements executed for it."""
+    with collect_statements() as statements:
+        response = await async_client.get(url, params=params, headers=NO_CACHE)
+    assert response.status_code == 200
+    return response.json(), statements
+
+
+class TestHotStore:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("days", "url", "params", "served_from_memory"),
+        test_cases.PARAMS_TEST_HOT_STORE,
+    )
+    async def test_hot_store_matches_database(
+        days: int,
+        url: str,
+        params: dict,
+        served_from_memory: bool,
+        async_client: AsyncClient,
+        hot_window,
+    ) -> None:
+        expected, _ = await get_counting_statements(async_client, url, params)
+        await hot_window(days)
+        response, statements = await get_counting_statements(
+            async_client,
+            url,
+            params,
+        )
+        assert (statements == []) is served_from_memory
+        assert response["total"] == expected["total"]
+        assert response["items"] == expected["items"]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_stale_hot_store_falls_back(
+        async_client: AsyncClient,
+        hot_window,
+    ) -> None:
+        url, params, *_ = test_cases.PARAMS_TEST_HOT_STORE[0][1:]
+        await hot_window(3)
+        hot_store.invalidate()
+        response, statements = await get_counting_statements(
+            async_client,
+            url,
+            params,
+        )
+        assert statements
+        assert response["items"]
+        await hot_store.refreshing
+        assert hot_store.window is not None
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_write_refreshes_hot_store(
+        async_client: AsyncClient,
+        hot_window,
+    ) -> None:
+        await hot_window(30)
+        instrument = {
+            **INSTRUMENTS_TEST_DATA[0],
+            "exchange_product_id": "A10HOT",
+        }
+        await InstrumentService().add_one(**instrument)
+        try:
+            await hot_store.refreshing
+            assert not hot_store.is_stale(await data_version.get())
+            assert "A10HOT" in hot_store.window.codes["exchange_product_id"]
+        finally:
+            await InstrumentService().delete_by_query(
+                exchange_product_id="A10HOT",
+            )
@@ -0,0 +1,99 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from tests.fixtures import test_cases
+
+
+def period_start(day: date, period: str) -> date:
+    """Get start of the period, which the day belongs to."""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+class TestPriceSeriesHandler:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "params",
+        test_cases.PARAMS_TEST_PRICE_SERIES_HANDLER,
+    )
+    async def test_price_series_match_dynamics(
+        params: dict,
+        async_client: AsyncClient,
+    ) -> None:
+        dynamics = await async_client.get(
+            "v1/instrument/get_dynamics",
+            params={
+                name: value
+                for name, value in params.items()
+                if name not in ("period", "exchange_product_id")
+            } | {"size": 100},
+        )
+        buckets: dict[tuple, list[dict]] = defaultdict(list)
+        for item in sorted(
+            dynamics.json()["items"],
+            key=lambda item: (item["date"], item["id"]),
+        ):
+            if params.get("exchange_product_id") not in (
+                None,
+                item["exchange_product_id"],
+            ):
+                continue
+            start = period_start(
+                date.fromisoformat(item["date"]),
+                params.get("period", "day"),
+            )
+            buckets[(item["exchange_product_id"], str(start))].append(item)
+
+        response = await async_client.get(
+            "v1/instrument/get_price_series",
+            params=params,
+        )
+        assert response.status_code == 200
+        points = response.json()["items"]
+        assert [
+            (point["exchange_product_id"], point["period_start"])
+            for point in points
+        ] == sorted(buckets)
+        for point in points:
+            items = buckets[
+                (point["exchange_product_id"], point["period_start"])
+            ]
+            prices = [item["total"] / item["volume"] for item in items]
+            volume = sum(item["volume"] for item in items)
+            total = sum(item["total"] for item in items)
+            assert point == pytest.approx(
+                {
+                    "exchange_product_id": point["exchange_product_id"],
+                    "period_start": point["period_start"],
+                    "average_price": total / volume,
+                    "open": prices[0],
+                    "high": max(prices),
+                    "low": min(prices),
+                    "close": prices[-1],
+                    "volume": volume,
+                    "total": total,
+                },
+            )
+        assert points
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_price_series_invalid_period(
+        async_client: AsyncClient,
+    ) -> None:
+        response = await async_client.get(
+            "v1/instrument/get_price_series",
+            params={
+                "start_date": "2024-02-10",
+                "end_date": "2024-02-20",
+                "period": "year",
+            },
+        )
+        assert response.status_code == 422
@@ -0,0 +1,135 @@
+import csv
+import io
+
+import fastapi.routing
+import pytest
+from fakeredis import FakeAsyncRedis
+from fastapi.routing import serialize_response as fastapi_serialize_response
+from httpx import AsyncClient
+
+from tests.fixtures import test_cases
+
+
+class TestProjectedHandlers:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("url", "params", "expected_keys"),
+        test_cases.PARAMS_TEST_PROJECTION_HANDLERS,
+    )
+    async def test_items_projected_on_fields(
+        url: str,
+        params: dict,
+        expected_keys: list[str],
+        async_client: AsyncClient,
+    ) -> None:
+        full = await async_client.get(
+            url,
+            params={
+                name: value
+                for name, value in params.items()
+                if name != "fields"
+            },
+        )
+        params = params.copy()
+        items = []
+        while True:
+            response = await async_client.get(url, params=params)
+            assert response.status_code == 200
+            page = response.json()
+            items.extend(page["items"])
+            if not page.get("next_cursor"):
+                break
+            params["cursor"] = page["next_cursor"]
+        assert items
+        assert all(list(item) == expected_keys for item in items)
+        if "next_cursor" not in page:
+            assert items == [
+                {key: item[key] for key in expected_keys}
+                for item in full.json()["items"]
+            ]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_unknown_field(async_client: AsyncClient) -> None:
+        response = await async_client.get(
+            "v1/instrument/get_trading_results",
+            params={"fields": "date,password"},
+        )
+        assert response.status_code == 422
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_cache_key_accounts_for_projection(
+        async_client: AsyncClient,
+        fake_redis: FakeAsyncRedis,
+    ) -> None:
+        url = "v1/instrument/get_trading_results"
+        response = await async_client.get(url, params={"fields": "date"})
+        assert response.headers["X-FastAPI-Cache"] == "MISS"
+        response = await async_client.get(url, params={"fields": "volume"})
+        assert response.headers["X-FastAPI-Cache"] == "MISS"
+        assert list(response.json()["items"][0]) == ["volume"]
+        response = await async_client.get(
+            url,
+            params={"fields": "volume,date"},
+        )
+        assert response.headers["X-FastAPI-Cache"] == "MISS"
+        response = await async_client.get(
+            url,
+            params={"fields": "date,volume"},
+        )
+        assert response.headers["X-FastAPI-Cache"] == "HIT"
+        assert list(response.json()["items"][0]) == ["volume", "date"]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_export_projected(async_client: AsyncClient) -> None:
+        response = await async_client.get(
+            "v1/instrument/export",
+            params={
+                "start_date": "2024-02-10",
+                "end_date": "2024-02-20",
+                "fields": "total,date",
+                "format": "csv",
+            },
+        )
+        assert response.status_code == 200
+        rows = list(csv.reader(io.StringIO(response.text)))
+        assert rows[0] == ["total", "date"]
+        assert len(rows) > 1
+        assert all(len(row) == 2 for row in rows)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("url", "params", "expected_keys"),
+        test_cases.PARAMS_TEST_PROJECTION_HANDLERS,
+    )
+    async def test_page_rendered_without_response_model(
+        url: str,
+        params: dict,
+        expected_keys: list[str],
+        async_client: AsyncClient,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        serialized = []
+
+        async def serialize_response(**kwargs):
+            serialized.append(kwargs)
+            return await fastapi_serialize_response(**kwargs)
+
+        monkeypatch.setattr(
+            fastapi.routing,
+            "serialize_response",
+            serialize_response,
+        )
+        response = await async_client.get(
+            url,
+            params=params,
+            headers={"Cache-Control": "no-cache"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()["items"]
+        assert not serialized
@@ -0,0 +1,75 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from app.cache.invalidation import data_version
+from tests.conftest import engine
+from tests.fixtures import collect_statements, test_cases
+
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+
+def count_queries(statements: list[str]) -> list[str]:
+    """Get statements, which count rows of the query."""
+    return [statement for statement in statements if "count(*)" in statement]
+
+
+class TestCountedTotals:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("url", "params"),
+        test_cases.PARAMS_TEST_COUNTED_HANDLERS,
+    )
+    async def test_total_served_from_count_cache(
+        url: str,
+        params: dict,
+        async_client: AsyncClient,
+        fake_redis,
+    ) -> None:
+        response = await async_client.get(url, params=params, headers=NO_CACHE)
+        assert response.status_code == 200
+
+        with collect_statements() as statements:
+            next_page = await async_client.get(
+                url,
+                params={**params, "page": 2, "size": 1},
+                headers=NO_CACHE,
+            )
+        assert next_page.status_code == 200
+        assert next_page.json()["total"] == response.json()["total"]
+        assert count_queries(statements) == []
+
+        with collect_statements() as statements:
+            exact = await async_client.get(
+                url,
+                params={**params, "exact_total": True},
+                headers=NO_CACHE,
+            )
+        assert exact.json()["total"] == response.json()["total"]
+        assert len(count_queries(statements)) == 1
+
+        await data_version.bump()
+        with collect_statements() as statements:
+            await async_client.get(url, params=params, headers=NO_CACHE)
+        assert len(count_queries(statements)) == 1
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_unfiltered_total_estimated(
+        async_client: AsyncClient,
+        fake_redis,
+    ) -> None:
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE instrumentdb"))
+            expected = await conn.scalar(
+                text("SELECT count(*) FROM instrumentdb"),
+            )
+        with collect_statements() as statements:
+            response = await async_client.get(
+                "v1/instrument/get_trading_results",
+                headers=NO_CACHE,
+            )
+        assert response.json()["total"] == expected
+        assert count_queries(statements) == []
+        assert any("pg_class" in statement for statement in statements)
@@ -0,0 +1,168 @@
+from contextlib import ExitStack
+from datetime import date
+from typing import Any
+
+import pytest
+from fastapi_pagination import Page, Params
+from fastapi_pagination.api import set_page, set_params
+from fastapi_pagination.cursor import CursorParams
+from sqlalchemy import event, text
+
+from app.models.instrument import InstrumentDB
+from app.repositories.instrument import InstrumentRepository
+from app.schemas.instrument import InstrumentOut, PricePointOut
+from app.schemas.pagination import KeysetPage
+from tests.conftest import engine, TestAsyncSession
+from tests.fixtures import test_cases
+from tests.fixtures.instruments import make_instruments
+
+
+class TestInstrumentRepositoryQueryPlans:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("method", "kwargs", "expected_index"),
+        test_cases.PARAMS_TEST_REPOSITORY_QUERY_PLANS,
+    )
+    async def test_query_uses_index(
+        method: str,
+        kwargs: dict[str, Any],
+        expected_index: str,
+    ) -> None:
+        statements: list[tuple[str, Any]] = []
+
+        def capture_statement(conn, cursor, statement, parameters, *args):
+            if not statement.startswith("SET"):
+                statements.append((statement, parameters))
+
+        async with TestAsyncSession() as session:
+            # Test table is tiny, so sequential scan must be ruled out
+            # to see, whether the planner is able to use indexes at all.
+            await session.execute(text("SET enable_seqscan = off"))
+            repository = InstrumentRepository(session, InstrumentDB)
+            event.listen(
+                engine.sync_engine,
+                "before_cursor_execute",
+                capture_statement,
+            )
+            try:
+                with ExitStack() as stack:
+                    if method.endswith("_by_cursor"):
+                        stack.enter_context(set_page(KeysetPage[InstrumentOut]))
+                        stack.enter_context(set_params(CursorParams()))
+                    else:
+                        stack.enter_context(set_page(Page[InstrumentOut]))
+                        stack.enter_context(set_params(Params()))
+                    await getattr(repository, method)(**kwargs)
+            finally:
+                event.remove(
+                    engine.sync_engine,
+                    "before_cursor_execute",
+                    capture_statement,
+                )
+
+            assert statements
+            connection = await session.connection()
+            for statement, parameters in statements:
+                plan = "\n".join(
+                    row[0]
+                    for row in await connection.exec_driver_sql(
+                        f"EXPLAIN {statement}",
+                        parameters,
+                    )
+                )
+                assert "Seq Scan" not in plan
+                assert expected_index in plan
+            await session.rollback()
+
+
+class TestInstrumentRepositoryPriceSeries:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_price_series_ohlc() -> None:
+        # (date, volume, total) of a single product within one week
+        trades = [
+            (date(2023, 1, 2), 10.0, 100.0),
+            (date(2023, 1, 3), 10.0, 300.0),
+            (date(2023, 1, 4), 20.0, 100.0),
+            (date(2023, 1, 6), 10.0, 200.0),
+            (date(2023, 1, 9), 5.0, 50.0),
+        ]
+        row = make_instruments(1, "PRICE")[0]
+        async with TestAsyncSession() as session:
+            repository = InstrumentRepository(session, InstrumentDB)
+            await repository.add_many(
+                [
+                    {**row, "date": day, "volume": volume, "total": total}
+                    for day, volume, total in trades
+                ],
+                chunk_size=100,
+            )
+            with set_page(Page[PricePointOut]), set_params(Params()):
+                page = await repository.get_price_series(
+                    start_date=date(2023, 1, 1),
+                    end_date=date(2023, 1, 31),
+                    period="week",
+                    exchange_product_id=row["exchange_product_id"],
+                )
+            await session.rollback()
+
+        assert [point.model_dump() for point in page.items] == [
+            {
+                "exchange_product_id": row["exchange_product_id"],
+                "period_start": date(2023, 1, 2),
+                "average_price": 700.0 / 50.0,
+                "open": 10.0,
+                "high": 30.0,
+                "low": 5.0,
+                "close": 20.0,
+                "volume": 50.0,
+                "total": 700.0,
+            },
+            {
+                "exchange_product_id": row["exchange_product_id"],
+                "period_start": date(2023, 1, 9),
+                "average_price": 10.0,
+                "open": 10.0,
+                "high": 10.0,
+                "low": 10.0,
+                "close": 10.0,
+                "volume": 5.0,
+                "total": 50.0,
+            },
+        ]
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_price_series_skips_rows_without_volume() -> None:
+        # (date, volume, total), the first and the last week trades nothing
+        trades = [
+            (date(2023, 1, 2), 0.0, 0.0),
+            (date(2023, 1, 3), 10.0, 200.0),
+            (date(2023, 1, 4), 10.0, 100.0),
+            (date(2023, 1, 6), 0.0, 0.0),
+            (date(2023, 1, 9), 0.0, 0.0),
+        ]
+        row = make_instruments(1, "ZERO")[0]
+        async with TestAsyncSession() as session:
+            repository = InstrumentRepository(session, InstrumentDB)
+            await repository.add_many(
+                [
+                    {**row, "date": day, "volume": volume, "total": total}
+                    for day, volume, total in trades
+                ],
+                chunk_size=100,
+            )
+            with set_page(Page[PricePointOut]), set_params(Params()):
+                page = await repository.get_price_series(
+                    start_date=date(2023, 1, 1),
+                    end_date=date(2023, 1, 31),
+                    period="week",
+                    exchange_product_id=row["exchange_product_id"],
+                )
+            await session.rollback()
+
+        assert [
+            (point.open, point.close, point.average_price, point.low)
+            for point in page.items
+        ] == [(20.0, 10.0, 15.0, 10.0), (None, None, None, None)]
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app.models.aggregate import DailyInstrumentAggregateDB
+from tests.conftest import TestAsyncSession
+from tests.fixtures import FakeInstrumentService
+from tests.fixtures.instruments import make_instruments
+
+
+async def get_aggregates(session, day: date) -> list[tuple]:
+    """Get aggregated sums of the day."""
+    result = await session.execute(
+        select(
+            DailyInstrumentAggregateDB.oil_id,
+            DailyInstrumentAggregateDB.volume,
+            DailyInstrumentAggregateDB.count,
+        )
+        .filter_by(date=day)
+        .order_by(DailyInstrumentAggregateDB.oil_id),
+    )
+    return result.all()
+
+
+class TestDailyAggregatesRefresh:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_touched_dates_refreshed() -> None:
+        rows = make_instruments(3, "AGGREGATE")
+        day = rows[0]["date"]
+        async with TestAsyncSession() as session:
+            service = FakeInstrumentService(session)
+            untouched = await get_aggregates(session, date(2024, 2, 11))
+
+            await service.add_many(rows)
+            assert await get_aggregates(session, day) == [("A10K", 6.0, 6.0)]
+
+            await service.upsert_many(
+                [{**rows[0], "volume": 11.0, "oil_id": "A10M"}],
+            )
+            assert await get_aggregates(session, day) == [
+                ("A10K", 5.0, 4.0),
+                ("A10M", 11.0, 2.0),
+            ]
+
+            await service.delete_by_query(
+                exchange_product_id=rows[1]["exchange_product_id"],
+            )
+            await service.delete_by_query(
+                exchange_product_id=rows[2]["exchange_product_id"],
+            )
+            assert await get_aggregates(session, day) == [("A10M", 11.0, 2.0)]
+            assert await get_aggregates(
+                session,
+                date(2024, 2, 11),
+            ) == untouched
+            await session.rollback()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_concurrent_writers_of_day_summed() -> None:
+        rows = make_instruments(2, "CONCURRENT")
+        day = rows[0]["date"]
+        async with TestAsyncSession() as first, TestAsyncSession() as second:
+            await FakeInstrumentService(first).add_many(rows[:1])
+            blocked = asyncio.create_task(
+                FakeInstrumentService(second).add_many(rows[1:]),
+            )
+            await asyncio.sleep(0.2)
+            await first.commit()
+            await blocked
+            await second.commit()
+        async with TestAsyncSession() as session:
+            try:
+                assert await get_aggregates(session, day) == [
+                    ("A10K", 3.0, 4.0),
+                ]
+            finally:
+                for row in rows:
+                    await FakeInstrumentService(session).delete_by_query(
+                        exchange_product_id=row["exchange_product_id"],
+                    )
+                await session.commit()
+            assert await get_aggregates(session, day) == []
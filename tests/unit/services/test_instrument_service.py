@@ -0,0 +1,299 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event, func, make_url, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.cache.invalidation import data_version
+from app.core.config import settings
+from app.database.db import database
+from app.database.replicas import ReplicaRouter
+from app.models.instrument import InstrumentDB
+from app.models.trading_day import TradingDayDB
+from app.services.instrument import InstrumentService
+from app.services.trading_calendar import TradingCalendar, trading_calendar
+from app.units_of_work.base import UnitOfWork
+from tests.conftest import TestAsyncSession
+from tests.fixtures import FakeInstrumentService
+from tests.fixtures.instruments import make_instruments
+
+
+class TestInstrumentServiceAddMany:
+    @staticmethod
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("chunk_size", [1, 7, 100])
+    async def test_add_many(chunk_size: int) -> None:
+        rows = make_instruments(25, "BULK")
+        async with TestAsyncSession() as session:
+            service = FakeInstrumentService(session)
+            inserted = await service.add_many(iter(rows), chunk_size)
+            stored = await session.scalars(
+                select(InstrumentDB.volume)
+                .filter(InstrumentDB.exchange_product_id.startswith("BULK"))
+                .order_by(InstrumentDB.volume),
+            )
+            assert inserted == len(rows)
+            assert stored.all() == [row["volume"] for row in rows]
+            await session.rollback()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_add_many_empty() -> None:
+        async with TestAsyncSession() as session:
+            service = FakeInstrumentService(session)
+            assert await service.add_many([]) == 0
+            assert await session.scalar(
+                select(func.count()).select_from(InstrumentDB),
+            ) == 10
+            await session.rollback()
+
+
+class TestInstrumentServiceUpsertMany:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_upsert_many() -> None:
+        rows = make_instruments(5, "UPSERT")
+        async with TestAsyncSession() as session:
+            service = FakeInstrumentService(session)
+            assert await service.upsert_many(rows, 2) == 5
+            assert await service.upsert_many(rows, 2) == 0
+
+            changed = {**rows[0], "total": rows[0]["total"] + 1}
+            assert await service.upsert_many([changed, *rows[1:]], 2) == 1
+
+            stored = (
+                await session.scalars(
+                    select(InstrumentDB)
+                    .filter(
+                        InstrumentDB.exchange_product_id.startswith("UPSERT"),
+                    )
+                    .order_by(InstrumentDB.exchange_product_id)
+                    .execution_options(populate_existing=True),
+                )
+            ).all()
+            assert len(stored) == len(rows)
+            assert stored[0].total == changed["total"]
+            assert stored[0].updated_on != rows[0]["updated_on"]
+            assert all(
+                instrument.updated_on == row["updated_on"]
+                for instrument, row in zip(stored[1:], rows[1:], strict=True)
+            )
+            await session.rollback()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_upsert_many_duplicates_in_chunk() -> None:
+        row = make_instruments(1, "UPSERT")[0]
+        async with TestAsyncSession() as session:
+            service = FakeInstrumentService(session)
+            assert await service.upsert_many([row, {**row, "count": 5}]) == 1
+            stored = await session.scalar(
+                select(InstrumentDB.count).filter_by(
+                    exchange_product_id=row["exchange_product_id"],
+                ),
+            )
+            assert stored == 5
+            await session.rollback()
+
+
+class TestInstrumentServiceTradingDays:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_trading_days_follow_ingestion() -> None:
+        rows = make_instruments(3, "CALENDAR")
+        async with TestAsyncSession() as session:
+            service = FakeInstrumentService(session)
+            await service.add_many(rows)
+            await service.upsert_many(
+                [{**rows[0], "date": date(2024, 3, 1)}],
+            )
+            assert [
+                response.date
+                for response in await service.get_last_trading_days(2)
+            ] == [date(2024, 3, 1), date(2024, 2, 20)]
+
+            product_ids = [row["exchange_product_id"] for row in rows]
+            await service.delete_by_query(exchange_product_id=product_ids[1])
+            assert date(2023, 1, 1) in await session.scalars(
+                select(TradingDayDB.date),
+            )
+            for product_id in product_ids:
+                await service.delete_by_query(exchange_product_id=product_id)
+            assert date(2023, 1, 1) not in await session.scalars(
+                select(TradingDayDB.date),
+            )
+            await session.rollback()
+        trading_calendar.invalidate()
+
+    @staticmethod
+    def test_calendar_clamp() -> None:
+        calendar = TradingCalendar()
+        calendar.load(
+            [date(2024, 2, 14), date(2024, 2, 12), date(2024, 2, 16)],
+            version=0,
+        )
+        assert calendar.last(2) == [date(2024, 2, 16), date(2024, 2, 14)]
+        assert calendar.clamp(date(2024, 2, 1), date(2024, 2, 15)) == (
+            date(2024, 2, 12),
+            date(2024, 2, 14),
+        )
+        assert calendar.clamp(date(2024, 2, 13), date(2024, 2, 13)) == (
+            date(2024, 2, 13),
+            date(2024, 2, 13),
+        )
+
+
+class TestReadOnlyUnitOfWork:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_read_only_unit_not_committed() -> None:
+        commits: list[object] = []
+
+        def count_commit(conn) -> None:
+            commits.append(conn)
+
+        trading_calendar.invalidate()
+        event.listen(database.engine.sync_engine, "commit", count_commit)
+        try:
+            days = await InstrumentService().get_last_trading_days(2)
+        finally:
+            event.remove(database.engine.sync_engine, "commit", count_commit)
+            trading_calendar.invalidate()
+        assert days
+        assert commits == []
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_read_only_unit_rejects_writes() -> None:
+        uow = UnitOfWork()
+        async with uow(readonly=True):
+            assert await uow.session.scalar(
+                text("SHOW transaction_read_only"),
+            ) == "on"
+            with pytest.raises(DBAPIError):
+                await uow.instruments.add_one(
+                    **make_instruments(1, "READONLY")[0],
+                )
+        async with uow:
+            assert await uow.session.scalar(
+                text("SHOW transaction_read_only"),
+            ) == "off"
+
+
+class TestReplicaRouting:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_read_only_units_routed_to_healthy_replicas() -> None:
+        # The test database stands in for a replica.
+        replica = create_async_engine(settings.postgres_db_url)
+        broken = create_async_engine(
+            make_url(settings.postgres_db_url).set(port=1),
+        )
+        uow = UnitOfWork()
+        uow.replicas = ReplicaRouter(
+            [async_sessionmaker(replica), async_sessionmaker(broken)],
+            retry_interval=60,
+        )
+
+        async def get_pool(readonly: bool) -> object:
+            async with uow(readonly=readonly):
+                await uow.session.execute(text("SELECT 1"))
+                return uow.session.bind.sync_engine.pool
+
+        try:
+            assert [await get_pool(True) for _ in range(3)] == [
+                replica.sync_engine.pool,
+            ] * 3
+            assert uow.replicas.candidates() == [
+                uow.replicas.session_factories[0],
+            ]
+            assert await get_pool(False) is database.engine.sync_engine.pool
+
+            uow.replicas.mark_unhealthy(uow.replicas.session_factories[0])
+            assert await get_pool(True) is database.engine.sync_engine.pool
+        finally:
+            await replica.dispose()
+            await broken.dispose()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_lagging_replica_skipped(
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        replica = create_async_engine(settings.postgres_db_url)
+        uow = UnitOfWork()
+        uow.replicas = ReplicaRouter([async_sessionmaker(replica)], 60)
+        monkeypatch.setattr(data_version, "write_lsn", 0)
+        try:
+            async with uow:
+                pass
+            assert data_version.write_lsn > 0
+
+            async with uow(readonly=True):
+                assert uow.session.bind is replica
+            # Caught up replica is not asked again, nor connected eagerly.
+            async with uow(readonly=True):
+                assert uow.session.bind is replica
+                assert replica.sync_engine.pool.checkedout() == 0
+
+            data_version.observe_write(2**62)
+            async with uow(readonly=True):
+                assert uow.session.bind is not replica
+        finally:
+            await replica.dispose()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_replica_losing_connection_marked_unhealthy() -> None:
+        broken = create_async_engine(
+            make_url(settings.postgres_db_url).set(port=1),
+        )
+        uow = UnitOfWork()
+        uow.replicas = ReplicaRouter([async_sessionmaker(broken)], 60)
+        uow.replicas.observe(uow.replicas.session_factories[0], 2**62)
+        try:
+            with pytest.raises(OSError):
+                async with uow(readonly=True):
+                    await uow.session.execute(text("SELECT 1"))
+            assert uow.replicas.candidates() == []
+        finally:
+            await broken.dispose()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_read_retried_on_primary_after_replica_lost() -> None:
+        broken = create_async_engine(
+            make_url(settings.postgres_db_url).set(port=1),
+        )
+        service = InstrumentService()
+        service.uow.replicas = ReplicaRouter([async_sessionmaker(broken)], 60)
+        service.uow.replicas.observe(
+            service.uow.replicas.session_factories[0],
+            2**62,
+        )
+        try:
+            instruments = await service.get_by_query_all(oil_id="A10K")
+            assert instruments
+            assert service.uow.replicas.candidates() == []
+        finally:
+            await broken.dispose()
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_write_position_read_without_transaction(
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        replica = create_async_engine(settings.postgres_db_url)
+        uow = UnitOfWork()
+        uow.replicas = ReplicaRouter([async_sessionmaker(replica)], 60)
+        monkeypatch.setattr(data_version, "write_lsn", 0)
+        try:
+            async with uow:
+                await uow.commit()
+                connection = await uow.session.connection()
+                raw = await connection.get_raw_connection()
+                assert not raw.driver_connection.is_in_transaction()
+            assert data_version.write_lsn > 0
+        finally:
+            await replica.dispose()
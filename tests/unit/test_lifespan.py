@@ -0,0 +1,33 @@
+import pytest
+from asgi_lifespan import LifespanManager
+from fastapi_cache import FastAPICache
+
+from app.cache.invalidation import data_version
+from app.database.db import database
+from app.main import app
+
+
+class TestLifespan:
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_engine_created_and_disposed_per_lifespan() -> None:
+        await database.dispose()
+        async with LifespanManager(app):
+            engine = database._engine
+            assert engine is not None
+        assert database._engine is None
+        async with LifespanManager(app):
+            assert database._engine not in (None, engine)
+
+    @staticmethod
+    @pytest.mark.asyncio
+    async def test_cache_detached_from_closed_redis() -> None:
+        FastAPICache.reset()
+        async with LifespanManager(app):
+            redis = data_version.redis
+            assert FastAPICache.get_backend() is not None
+        assert data_version.redis is None
+        with pytest.raises(AssertionError):
+            FastAPICache.get_backend()
+        async with LifespanManager(app):
+            assert data_version.redis not in (None, redis)